@@ -0,0 +1,1138 @@
+#!/usr/bin/env python3
+"""Offline benchmarks for the Kick chat translator.
+
+    python benchmark.py replay --rate 500 --duration 10
+    python benchmark.py replay --frames frames.jsonl --transport websocket --engine async
+    python benchmark.py record --chatroom-id 123456 --count 2000 --output frames.jsonl
+    python benchmark.py filters --messages 20000
+    python benchmark.py frames --frames 50000
+    python benchmark.py quality --log quality.jsonl
+    python benchmark.py shard --workers 4 --channels 200
+
+`replay` feeds recorded or synthetic App\\Events\\ChatMessageEvent frames into the bot at a fixed
+rate, with local stand-ins for the Pusher websocket, Azure /translate and Kick messages/send.
+`filters` times the per-message filter chain against the uncompiled checks it replaced.
+`frames` times websocket frame handling (routing, decoding, pongs) against the decode-everything path.
+`quality` sweeps QUALITY_MIN_SCORE over a QUALITY_LOG_FILE recording (or a labelled synthetic set).
+`shard` runs sharded-mode coordinators through joins, graceful leaves and crashes, checking chatroom ownership.
+Bot settings (PIPELINE_*, SEND_*, TRANSLATION_*, LANGUAGE_DETECTOR, ...) come from the
+environment exactly as they do for the bot itself.
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import importlib.util
+import json
+import os
+import random
+import re
+import socketserver
+import struct
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import zlib
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+CHAT_EVENT = "App\\Events\\ChatMessageEvent"
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+# Synthetic chat: phrases are paired at random so most messages are new to the translation cache
+SAMPLE_PHRASES = {
+    'en': ["that was an insane play", "what game is this", "lol", "gg", "no way he hit that",
+           "chat is so fast today", "can you play the next map", "this song goes hard"],
+    'es': ["hola a todos", "que buena jugada", "no puedo creer lo que pasó", "saludos desde México",
+           "vamos con todo", "eso estuvo increíble"],
+    'pt': ["boa noite galera", "que jogada linda", "alguém do Brasil aqui", "muito bom esse jogo"],
+    'fr': ["salut tout le monde", "c'était incroyable", "quelle partie", "bonne soirée à tous"],
+    'de': ["hallo zusammen", "was für ein Spiel", "das war unglaublich", "grüße aus Berlin"],
+    'tr': ["herkese merhaba", "çok iyi oynadın", "bu oyun harika", "Türkiye'den selamlar"],
+    'ru': ["привет всем", "какая игра", "это было невероятно", "привет из Москвы"],
+    'ar': ["مرحبا بالجميع", "لعبة رائعة", "تحية من مصر", "هذا لا يصدق"],
+    'ja': ["こんにちは", "すごいプレイ", "日本から見ています", "このゲーム面白い"],
+    'ko': ["안녕하세요", "대박 플레이", "한국에서 보고 있어요", "이 게임 재밌다"],
+    'zh': ["大家好", "这个操作太强了", "来自中国的问候", "这游戏真好玩"],
+    'th': ["สวัสดีทุกคน", "เล่นเก่งมาก", "เกมนี้สนุกมาก"],
+    'vi': ["xin chào mọi người", "chơi hay quá", "trận này đỉnh thật"],
+    'hi': ["सभी को नमस्ते", "क्या शानदार खेल है", "भारत से नमस्ते"],
+}
+# Chat that isn't worth an Azure call: names, emote text, laughter and English slang
+SAMPLE_LOW_VALUE = ["Pepega", "xQc", "jajaja", "kkkkkk", "KEKW", "LUL LUL Sadge", "ez clap noob", "aimbot",
+                    "sheesh", "gg wp", "pog", "W streamer", "omegalul", "Adin Ross", "monkaS", "poggers chat"]
+# Words with emoji attached or joined by punctuation - the filter chain must split them like \b\w+\b did
+SAMPLE_TOKEN_EDGES = ["lol😂", "ok👍", "gg,wp", "gg/wp", "no-no", "gg!!", "thanks!!!", "ok ok 😂😂", "lol.xd",
+                      "hola😂", "gg/amigo", "wow-ok", "“thanks”", "yes…", "ez_clap", "привет👍"]
+SAMPLE_EMOTES = ["[emote:37226:KEKW]", "[emote:39261:kkHuh]", "[emote:37230:POLICE]"]
+SAMPLE_BADGES = [
+    [],
+    [],
+    [{"type": "subscriber", "text": "Subscriber", "count": 3}],
+    [{"type": "moderator", "text": "Moderator"}],
+    [{"type": "vip", "text": "VIP"}, {"type": "subscriber", "text": "Subscriber", "count": 12}],
+]
+
+
+def load_translator_module():
+    """Import kick-chat-translator.py (its file name is not a valid module name)."""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'kick-chat-translator.py')
+    spec = importlib.util.spec_from_file_location('kick_chat_translator', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def percentiles(values: List[float]) -> dict:
+    """p50/p95/p99/max of a list of seconds, in milliseconds."""
+    if not values:
+        return {'count': 0, 'p50_ms': 0.0, 'p95_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0}
+    ordered = sorted(values)
+
+    def at(p):
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000, 2)
+
+    return {'count': len(ordered), 'p50_ms': at(0.50), 'p95_ms': at(0.95), 'p99_ms': at(0.99),
+            'max_ms': round(ordered[-1] * 1000, 2)}
+
+
+# ─── FRAME SOURCES ─────────────────────────────────────────────────────────────
+def chat_frame(chatroom_id: int, username: str, content: str, badges: list) -> str:
+    """A ChatMessageEvent frame shaped like the ones Kick's Pusher channel delivers."""
+    data = {
+        "id": str(uuid.uuid4()),
+        "chatroom_id": chatroom_id,
+        "content": content,
+        "type": "message",
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime()),
+        "sender": {
+            "id": zlib.crc32(username.encode()) % 10_000_000,
+            "username": username,
+            "slug": username.lower(),
+            "identity": {"color": "#75FD46", "badges": badges},
+        },
+    }
+    return json.dumps({"event": CHAT_EVENT, "data": json.dumps(data), "channel": f"chatrooms.{chatroom_id}.v2"})
+
+
+def synthetic_frames(count: int, chatroom_ids: List[int], english_ratio: float, duplicate_ratio: float,
+                     seed: int) -> List[str]:
+    """Multi-language chat with a share of English and of exact repeats (copy-pasta, spam)."""
+    rng = random.Random(seed)
+    foreign = [lang for lang in SAMPLE_PHRASES if lang != 'en']
+    users = [f"viewer{i}" for i in range(max(50, count // 20))]
+    recent: List[str] = []
+    frames = []
+    for _ in range(count):
+        if recent and rng.random() < duplicate_ratio:
+            content = rng.choice(recent)
+        else:
+            phrases = SAMPLE_PHRASES['en' if rng.random() < english_ratio else rng.choice(foreign)]
+            content = rng.choice(phrases)
+            if rng.random() < 0.7:
+                content += " " + rng.choice(phrases)
+            if rng.random() < 0.2:
+                content += " " + rng.choice(SAMPLE_EMOTES)
+            recent = (recent + [content])[-50:]
+        frames.append(chat_frame(rng.choice(chatroom_ids), rng.choice(users), content, rng.choice(SAMPLE_BADGES)))
+    return frames
+
+
+def recorded_frames(path: str, chatroom_ids: List[int]) -> List[str]:
+    """ChatMessageEvent frames from a JSONL recording, re-addressed to the benchmark chatrooms."""
+    frames = []
+    rooms: Dict[str, int] = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            msg = json.loads(line)
+            if msg.get("event") != CHAT_EVENT:
+                continue
+            # Keep the recording's per-room split, mapped onto however many channels are benchmarked
+            room = rooms.setdefault(msg.get("channel", ""), chatroom_ids[len(rooms) % len(chatroom_ids)])
+            msg["channel"] = f"chatrooms.{room}.v2"
+            frames.append(json.dumps(msg))
+    return frames
+
+
+# ─── STAND-IN SERVERS ──────────────────────────────────────────────────────────
+class StandInServer(ThreadingHTTPServer):
+    """Threaded HTTP stand-in with configurable latency and error rate."""
+    daemon_threads = True
+
+    def __init__(self, handler, latency_ms: float, error_rate: float, retry_after: float):
+        super().__init__(('127.0.0.1', 0), handler)
+        self.latency = latency_ms / 1000.0
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        self.counters = Counter()
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self, name: str, amount: int = 1):
+        with self.lock:
+            self.counters[name] += amount
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real APIs
+
+    def log_message(self, format, *args):
+        pass
+
+    def read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'null')
+
+    def reply(self, status: int, body, headers: Optional[dict] = None):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def simulate(self) -> bool:
+        """Apply latency; answer with an injected 429/503 and return False for the error share."""
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if self.server.error_rate and random.random() < self.server.error_rate:
+            status = random.choice((429, 503))
+            self.server.count(f"http_{status}")
+            self.reply(status, {"error": "injected"}, {"Retry-After": str(self.server.retry_after)})
+            return False
+        return True
+
+
+class AzureHandler(StandInHandler):
+    """Azure Translator /translate: each text comes back tagged with the target language, its words reversed.
+
+    Reversing keeps the length (and so Azure's character count) realistic while making the "translation"
+    differ from the original, so QUALITY_MAX_SIMILARITY doesn't discard it as redundant.
+    """
+
+    def do_POST(self):
+        body = self.read_json()
+        if not self.simulate():
+            return
+        query = parse_qs(urlparse(self.path).query)
+        targets = query.get('to', ['en'])
+        source = query.get('from', [None])[0]
+        self.server.count('requests')
+        self.server.count('texts', len(body))
+        self.server.count('chars', sum(len(item['text']) for item in body))
+        results = []
+        for item in body:
+            translated = ' '.join(word[::-1] for word in item['text'].split())
+            result = {'translations': [{'text': f"<{target}> {translated}", 'to': target} for target in targets]}
+            if not source:
+                lang, _ = self.server.classifier.classify(item['text'])
+                result['detectedLanguage'] = {'language': lang or 'es', 'score': 1.0}
+            results.append(result)
+        self.reply(200, results)
+
+
+class KickHandler(StandInHandler):
+    """Kick /api/v2/messages/send/{chatroom_id}."""
+
+    def do_POST(self):
+        self.read_json()
+        if not self.simulate():
+            return
+        self.server.count('posts')
+        self.reply(200, {"status": {"error": False, "code": 200, "message": "SUCCESS"}})
+
+
+def ws_frame(payload: bytes, opcode: int = 0x1) -> bytes:
+    """One unmasked, unfragmented server-to-client websocket frame."""
+    length = len(payload)
+    if length < 126:
+        header = struct.pack('!BB', 0x80 | opcode, length)
+    elif length < 65536:
+        header = struct.pack('!BBH', 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack('!BBQ', 0x80 | opcode, 127, length)
+    return header + payload
+
+
+def read_ws_frame(rfile):
+    """Read one (masked) client frame; returns (opcode, payload) or (None, None) on EOF."""
+    head = rfile.read(2)
+    if len(head) < 2:
+        return None, None
+    opcode, length = head[0] & 0x0F, head[1] & 0x7F
+    if length == 126:
+        length = struct.unpack('!H', rfile.read(2))[0]
+    elif length == 127:
+        length = struct.unpack('!Q', rfile.read(8))[0]
+    mask = rfile.read(4) if head[1] & 0x80 else None
+    payload = rfile.read(length)
+    if mask:
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return opcode, payload
+
+
+class PusherHandler(socketserver.StreamRequestHandler):
+    """Just enough of Pusher protocol 7: handshake, subscriptions, ping/pong, then the replayed frames."""
+
+    def handle(self):
+        key = None
+        while True:
+            line = self.rfile.readline()
+            if not line or line in (b'\r\n', b'\n'):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            if name.strip().lower() == 'sec-websocket-key':
+                key = value.strip()
+        if not key:
+            return
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        self.wfile.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                          f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+
+        self.send_lock = threading.Lock()
+        self.subscribed = set()
+        self.ready = threading.Condition()
+        self.send_text(json.dumps({
+            "event": "pusher:connection_established",
+            "data": json.dumps({"socket_id": f"{random.randint(1, 99999)}.{random.randint(1, 99999)}",
+                                "activity_timeout": 120})
+        }))
+        reader = threading.Thread(target=self.read_loop, daemon=True)
+        reader.start()
+
+        # Start the replay once the bot subscribed to every benchmark chatroom
+        with self.ready:
+            self.ready.wait_for(lambda: self.subscribed >= self.server.channels, timeout=10)
+        self.server.feed(self.send_text)
+        self.server.done.wait()
+        self.send(ws_frame(struct.pack('!H', 1000) + b'replay finished', 0x8))
+        reader.join(timeout=5)
+
+    def send(self, data: bytes):
+        with self.send_lock:
+            try:
+                self.wfile.write(data)
+            except OSError:
+                pass
+
+    def send_text(self, text: str):
+        self.send(ws_frame(text.encode('utf-8')))
+
+    def read_loop(self):
+        while True:
+            opcode, payload = read_ws_frame(self.rfile)
+            if opcode is None or opcode == 0x8:
+                return
+            if opcode == 0x9:
+                self.send(ws_frame(payload, 0xA))
+            elif opcode == 0x1:
+                msg = json.loads(payload)
+                if msg.get("event") == "pusher:subscribe":
+                    channel = msg.get("data", {}).get("channel")
+                    self.send_text(json.dumps({"event": "pusher_internal:subscription_succeeded",
+                                               "data": "{}", "channel": channel}))
+                    with self.ready:
+                        self.subscribed.add(channel)
+                        self.ready.notify_all()
+                elif msg.get("event") == "pusher:ping":
+                    self.send_text(json.dumps({"event": "pusher:pong", "data": {}}))
+
+
+class PusherStandIn(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, channels: set, feed: Callable[[Callable[[str], None]], None]):
+        super().__init__(('127.0.0.1', 0), PusherHandler)
+        self.channels = channels
+        self.feed = feed
+        self.done = threading.Event()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url_template(self) -> str:
+        # Same placeholders as the bot's WS_URL_TEMPLATE
+        return f"ws://127.0.0.1:{self.server_address[1]}/app/{{key}}?protocol=7&client=js&version=7.6.0&flash=false"
+
+
+# ─── REPLAY ────────────────────────────────────────────────────────────────────
+def instrumented(engine: type) -> type:
+    """Subclass a translator engine to collect per-message outcomes and stage latencies."""
+
+    class BenchmarkTranslator(engine):
+        def __init__(self, *args, **kwargs):
+            self.outcome_lock = threading.Lock()
+            self.outcomes = Counter()
+            self.latencies = defaultdict(list)
+            super().__init__(*args, **kwargs)
+
+        @property
+        def finished(self) -> int:
+            return sum(self.outcomes.values())
+
+        def message_finished(self, chat, outcome: str):
+            super().message_finished(chat, outcome)
+            now = time.monotonic()
+            with self.outcome_lock:
+                self.outcomes[outcome] += 1
+                previous = chat.received_at
+                for stage in ('detected', 'translated', 'sent'):
+                    if stage in chat.marks:
+                        self.latencies[stage].append(chat.marks[stage] - previous)
+                        previous = chat.marks[stage]
+                self.latencies['finished'].append(now - chat.received_at)
+                if outcome == 'sent':
+                    self.latencies['end_to_end'].append(now - chat.received_at)
+
+        def accounted(self) -> int:
+            """Messages that finished (overflow drops included) plus frames shed before they became messages."""
+            # The async engine only builds its stages once its event loop runs
+            parse_stage = getattr(self, 'parse_stage', None)
+            return self.finished + (parse_stage.stats.dropped if parse_stage else 0)
+
+    return BenchmarkTranslator
+
+
+def paced(frames: List[str], rate: float, send: Callable[[str], None], counter: Counter):
+    """Send frames at a fixed rate (0 = as fast as possible)."""
+    start = time.monotonic()
+    for i, frame in enumerate(frames):
+        if rate > 0:
+            delay = start + i / rate - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        send(frame)
+        counter['fed'] += 1
+
+
+async def paced_async(frames: List[str], rate: float, send: Callable[[str], None], counter: Counter):
+    start = time.monotonic()
+    for i, frame in enumerate(frames):
+        delay = start + i / rate - time.monotonic() if rate > 0 else 0
+        # Always yield so the pipeline tasks run alongside the feed
+        await asyncio.sleep(max(0.0, delay))
+        send(frame)
+        counter['fed'] += 1
+
+
+def wait_for_drain(translator, counter: Counter, feeding: threading.Event, timeout: float):
+    """Block until every fed frame is accounted for, or nothing moved for `timeout` seconds."""
+    last, last_change = -1, time.monotonic()
+    while True:
+        done = translator.accounted()
+        if feeding.is_set() and done >= counter['fed']:
+            return
+        if done != last:
+            last, last_change = done, time.monotonic()
+        elif time.monotonic() - last_change > timeout:
+            return
+        time.sleep(0.02)
+
+
+def run_replay(args) -> dict:
+    os.environ['TRANSLATION_CACHE_DB'] = args.cache_db or ''
+    os.environ['PIPELINE_STATS_INTERVAL'] = '0'
+    if args.deadline is not None:
+        os.environ['DELIVERY_DEADLINE'] = str(args.deadline)
+    if args.slo is not None:
+        os.environ['DELIVERY_SLO'] = str(args.slo)
+    kct = load_translator_module()
+    kct.setup_logging('INFO' if args.verbose else 'ERROR')
+
+    chatroom_ids = [100000 + i for i in range(args.channels)]
+    if args.frames:
+        frames = recorded_frames(args.frames, chatroom_ids)
+        if args.count:
+            frames = (frames * (args.count // max(1, len(frames)) + 1))[:args.count]
+    else:
+        count = args.count or int(args.rate * args.duration)
+        frames = synthetic_frames(count, chatroom_ids, args.english_ratio, args.duplicate_ratio, args.seed)
+    if not frames:
+        sys.exit("No ChatMessageEvent frames to replay")
+
+    azure = StandInServer(AzureHandler, args.azure_latency_ms, args.azure_error_rate, args.retry_after)
+    azure.classifier = kct.FastLanguageClassifier([])
+    kick = StandInServer(KickHandler, args.kick_latency_ms, args.kick_error_rate, args.retry_after)
+    kct.CHAT_API_URL_TEMPLATE = kick.url + "/api/v2/messages/send/{chatroom_id}"
+
+    engine = kct.AsyncKickChatTranslator if args.engine == 'async' else kct.KickChatTranslator
+    targets = tuple(args.targets.split(',')) if args.targets else tuple(kct.TARGET_LANGUAGES)
+    channels = [kct.ChannelConfig(f"bench{i}", chatroom_id=room, target_languages=targets, output=args.output)
+                for i, room in enumerate(chatroom_ids)]
+    counter = Counter()
+    feeding = threading.Event()  # set once the last frame went out
+
+    translator = instrumented(engine)(channels[0].slug, 'benchmark-token', channels)
+    translator.azure_translator_key = 'benchmark-key'
+    translator.azure_translator_endpoint = azure.url
+
+    def feed(send):
+        paced(frames, args.rate, send, counter)
+        feeding.set()
+
+    started = time.monotonic()
+    if args.transport == 'websocket':
+        pusher = PusherStandIn({channel.subscription for channel in channels}, feed)
+        kct.WS_URL_TEMPLATE = pusher.url_template
+        bot = threading.Thread(target=translator.start, daemon=True)
+        bot.start()
+        wait_for_drain(translator, counter, feeding, args.drain_timeout)
+        pusher.done.set()
+        bot.join(timeout=10)
+    elif args.engine == 'async':
+        async def replay():
+            groups = translator._prepare_start()
+            translator._build_async_pipeline()
+            translator.connections = [kct.PusherConnection(translator, group) for group in groups]
+            try:
+                await paced_async(frames, args.rate, lambda raw: translator.on_message(None, raw), counter)
+                feeding.set()
+                await asyncio.get_running_loop().run_in_executor(
+                    None, wait_for_drain, translator, counter, feeding, args.drain_timeout
+                )
+            finally:
+                await translator.http.close()
+        asyncio.run(replay())
+    else:
+        translator._prepare_start()
+        feed(lambda raw: translator.on_message(None, raw))
+        wait_for_drain(translator, counter, feeding, args.drain_timeout)
+    elapsed = time.monotonic() - started
+
+    stages = translator.pipeline_stats()
+    cache = translator.cache.stats()
+    return {
+        'engine': args.engine,
+        'transport': args.transport,
+        'channels': args.channels,
+        'frames': counter['fed'],
+        'offered_rate': args.rate,
+        'elapsed_s': round(elapsed, 2),
+        'messages_per_s': round(translator.finished / elapsed, 1) if elapsed else 0.0,
+        'outcomes': dict(translator.outcomes.most_common()),
+        'unaccounted': counter['fed'] - translator.accounted(),
+        'latency': {stage: percentiles(translator.latencies[stage])
+                    for stage in ('detected', 'translated', 'sent', 'end_to_end', 'finished')},
+        'dropped': {name: stats['dropped'] for name, stats in stages.items()},
+        'azure': dict(azure.counters, avg_batch=round(azure.counters['texts'] / azure.counters['requests'], 1)
+                      if azure.counters['requests'] else 0.0),
+        'kick': dict(kick.counters),
+        'cache_hit_rate': round(cache['hit_rate'], 3),
+        'delivery': dict(translator.scheduler.stats(), deadline_s=kct.DELIVERY_DEADLINE, slo_s=kct.DELIVERY_SLO),
+    }
+
+
+def print_replay_report(report: dict):
+    print(f"🏁 {report['frames']} frames over {report['elapsed_s']}s "
+          f"({report['engine']} engine, {report['transport']} transport, {report['channels']} channel(s))")
+    print(f"   throughput: {report['messages_per_s']} msg/s (offered {report['offered_rate'] or 'max'})")
+    print("   outcomes:   " + ", ".join(f"{name} {count}" for name, count in report['outcomes'].items()))
+    if report['unaccounted']:
+        print(f"   ⚠️ {report['unaccounted']} frame(s) never finished before the drain timeout")
+    labels = {'detected': 'detect', 'translated': 'translate', 'sent': 'send',
+              'end_to_end': 'end-to-end', 'finished': 'any outcome'}
+    print(f"   {'stage':<12} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for stage, label in labels.items():
+        lat = report['latency'][stage]
+        print(f"   {label:<12} {lat['count']:>7} {lat['p50_ms']:>9} {lat['p95_ms']:>9} {lat['p99_ms']:>9} {lat['max_ms']:>9}")
+    print("   dropped:    " + ", ".join(f"{name} {count}" for name, count in report['dropped'].items()))
+    azure = report['azure']
+    print(f"   azure:      {azure.get('requests', 0)} requests, avg batch {azure['avg_batch']}, "
+          f"{azure.get('chars', 0)} chars, {azure.get('http_429', 0)}×429, {azure.get('http_503', 0)}×503")
+    kick = report['kick']
+    print(f"   kick:       {kick.get('posts', 0)} posts, {kick.get('http_429', 0)}×429, {kick.get('http_503', 0)}×503")
+    print(f"   cache:      hit rate {report['cache_hit_rate']:.0%}")
+    delivery = report['delivery']
+    print(f"   delivery:   {delivery['slo_ratio']:.1%} within the {delivery['slo_s']:g}s SLO, {delivery['late']} late, "
+          f"{delivery['stale']} dropped past the {delivery['deadline_s']:g}s deadline")
+
+
+# ─── FILTERS ───────────────────────────────────────────────────────────────────
+LEGACY_EMOTE_PATTERN = r'\[emote:\d+:[^\]]+\]'
+
+
+def legacy_filters(kct, username: str, message: str, channel, lang: str) -> Optional[str]:
+    """The filters as process_message/should_translate ran them before MessageFilter (the baseline)."""
+    if channel.bot_username and username.lower() == channel.bot_username:
+        return 'own_message'
+    if len(message.strip()) < kct.MIN_MESSAGE_LENGTH:
+        return 'too_short'
+    cleaned = re.sub(LEGACY_EMOTE_PATTERN, '', message)
+    cleaned = ' '.join(cleaned.split()).strip()
+    if not cleaned:
+        return 'empty'
+    words = re.findall(r"\b\w+\b", cleaned.lower())
+    if words and sum(word in kct.COMMON_ENGLISH_PHRASES for word in words) >= len(words):
+        return 'common_english'
+    if cleaned.startswith('!'):
+        return 'command'
+    if not any(lang == allowed or lang.startswith(f"{allowed}-") for allowed in channel.allowed_languages):
+        return 'language_not_allowed'
+    if len(cleaned.strip()) < kct.MIN_MESSAGE_LENGTH:
+        return 'too_short'
+    if cleaned.strip().startswith(kct.TRANSLATION_PREFIX):
+        return 'translation_prefix'
+    bot_names = ['chattranslator', 'aitranslatorbot', 'translator', 'translate_bot', 'kickbot']
+    if username.lower() in bot_names:
+        return 'known_bot'
+    return None
+
+
+def compiled_filters(kct, filters, username: str, message: str, channel, lang: str) -> Optional[str]:
+    """The same decisions through MessageFilter and the prefix-indexed language lookup."""
+    view = filters.view(username, message)
+    reason = filters.check(view, channel)
+    if reason:
+        return reason
+    if not kct.is_allowed_language(lang, channel.allowed_languages):
+        return 'language_not_allowed'
+    return None
+
+
+def run_filters(args) -> dict:
+    kct = load_translator_module()
+    channel = kct.ChannelConfig('bench', chatroom_id=1, bot_username='benchbot')
+    rng = random.Random(args.seed)
+    samples = []
+    for frame in synthetic_frames(args.messages, [1], args.english_ratio, args.duplicate_ratio, args.seed):
+        payload = json.loads(json.loads(frame)['data'])
+        username, content = payload['sender']['username'], payload['content']
+        roll = rng.random()
+        if roll < 0.05:
+            content = '!' + content
+        elif roll < 0.07:
+            username = 'kickbot'
+        elif roll < 0.12:
+            content = rng.choice(SAMPLE_TOKEN_EDGES)
+        # Languages as detection would report them, regional variants included
+        lang = rng.choice(('es', 'ru', 'ja', 'zh-cn', 'zh-tw', 'pt', 'pt-BR', 'fr', 'id', 'ko', 'en'))
+        samples.append((username, content, lang))
+    samples += [(f"edge{i}", content, 'es') for i, content in enumerate(SAMPLE_TOKEN_EDGES)]
+
+    filters = kct.MessageFilter()
+    candidates = {
+        'legacy': lambda user, text, lang: legacy_filters(kct, user, text, channel, lang),
+        'compiled': lambda user, text, lang: compiled_filters(kct, filters, user, text, channel, lang),
+    }
+    # Reason labels differ in order (bot checks used to run after detection), the skip decision must not
+    mismatches = sum(
+        (candidates['legacy'](*sample) is None) != (candidates['compiled'](*sample) is None) for sample in samples
+    )
+
+    timings = {}
+    for name, candidate in candidates.items():
+        best = float('inf')
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            for sample in samples:
+                candidate(*sample)
+            best = min(best, time.perf_counter() - started)
+        timings[name] = round(best / len(samples) * 1e9, 1)
+    return {
+        'messages': len(samples),
+        'ns_per_message': timings,
+        'speedup': round(timings['legacy'] / timings['compiled'], 2) if timings['compiled'] else 0.0,
+        'decision_mismatches': mismatches,
+    }
+
+
+def print_filters_report(report: dict):
+    print(f"🧪 filter chain over {report['messages']} messages (best of runs)")
+    for name, ns in report['ns_per_message'].items():
+        print(f"   {name:<9} {ns:>9} ns/message")
+    print(f"   speedup:  {report['speedup']}×, decision mismatches: {report['decision_mismatches']}")
+
+
+# ─── FRAMES ────────────────────────────────────────────────────────────────────
+# Kick events that arrive on a chatroom channel without being chat messages
+OTHER_EVENTS = ("App\\Events\\MessageDeletedEvent", "App\\Events\\UserBannedEvent",
+                "App\\Events\\PinnedMessageCreatedEvent", "App\\Events\\ChatroomUpdatedEvent",
+                "App\\Events\\SubscriptionEvent", "App\\Events\\StreamHostEvent")
+
+
+def frame_mix(count: int, chat_ratio: float, ping_ratio: float, seed: int) -> List[str]:
+    """Chat frames mixed with other chatroom events and Pusher pings, as a busy channel delivers them."""
+    rng = random.Random(seed)
+    chats = synthetic_frames(count, [100000], 0.6, 0.15, seed)
+    frames = []
+    for chat in chats:
+        roll = rng.random()
+        if roll < ping_ratio:
+            frames.append(json.dumps({"event": "pusher:ping", "data": {}}))
+        elif roll < ping_ratio + chat_ratio:
+            frames.append(chat)
+        else:
+            data = {"id": str(uuid.uuid4()), "chatroom_id": 100000, "message": {"id": str(uuid.uuid4())}}
+            frames.append(json.dumps({"event": rng.choice(OTHER_EVENTS), "data": json.dumps(data),
+                                      "channel": "chatrooms.100000.v2"}))
+    return frames
+
+
+def legacy_frame_handler(kct, sent: list, chats: list) -> Callable[[str], None]:
+    """Frame handling before the event router (the baseline): every frame queued and decoded, pongs re-serialized."""
+    channel = kct.ChannelConfig('bench', chatroom_id=100000)
+    subscriptions = {channel.subscription: channel}
+
+    def handle(raw: str):
+        if '"pusher' in raw:
+            msg = json.loads(raw)
+            if msg.get("event", "").startswith("pusher"):
+                if msg.get("event") == "pusher:ping":
+                    sent.append(json.dumps({"event": "pusher:pong", "data": {}}))
+                return
+        raw, received_at = raw, time.monotonic()  # the parse-stage hand-off
+        msg = json.loads(raw)
+        if msg.get("event") == CHAT_EVENT:
+            channel_config = subscriptions.get(msg.get("channel"), channel)
+            payload = json.loads(msg["data"])
+            chat = kct.ChatMessage(payload["sender"]["username"], payload["content"], channel_config, received_at)
+            chats.append((chat.username, chat.content))
+    return handle
+
+
+class Collector(list):
+    """Stands in for a pipeline stage or websocket: keeps what was handed to it."""
+    put = list.append
+    send = list.append
+
+
+def routed_frame_handler(kct, chats: list) -> Callable[[str], None]:
+    """The bot's own PusherConnection/translator path, with the parse stage run inline."""
+    channel = kct.ChannelConfig('bench', chatroom_id=100000)
+    translator = kct.KickChatTranslator(channel.slug, None, [channel])
+    translator.subscriptions = {channel.subscription: channel}
+    translator.parse_stage, translator.detect_stage = Collector(), Collector()
+    connection = kct.PusherConnection(translator, [channel])
+    ws = Collector()
+
+    def handle(raw: str):
+        connection.on_message(ws, raw)
+        while translator.parse_stage:
+            translator.handle_frame(translator.parse_stage.pop())
+        while translator.detect_stage:
+            chat = translator.detect_stage.pop()
+            chats.append((chat.username, chat.content))
+    return handle
+
+
+def run_frames(args) -> dict:
+    os.environ['PIPELINE_STATS_INTERVAL'] = '0'
+    kct = load_translator_module()
+    kct.setup_logging('ERROR')
+    frames = frame_mix(args.frames, args.chat_ratio, args.ping_ratio, args.seed)
+
+    outputs = {name: [] for name in ('legacy', 'routed', 'routed-stdlib')}
+    candidates = {
+        'legacy': legacy_frame_handler(kct, Collector(), outputs['legacy']),
+        'routed': routed_frame_handler(kct, outputs['routed']),
+    }
+    if kct.JSON_BACKEND != 'json':
+        # Same router with the decoder a default install gets, to separate routing gains from the JSON backend
+        stdlib = routed_frame_handler(kct, outputs['routed-stdlib'])
+
+        def routed_stdlib(raw: str, fast=kct.json_loads):
+            kct.json_loads = kct.stdlib_json_loads
+            try:
+                stdlib(raw)
+            finally:
+                kct.json_loads = fast
+        candidates['routed-stdlib'] = routed_stdlib
+
+    timings = {}
+    for name, candidate in candidates.items():
+        best = float('inf')
+        for _ in range(args.repeat):
+            outputs[name].clear()
+            started = time.perf_counter()
+            for frame in frames:
+                candidate(frame)
+            best = min(best, time.perf_counter() - started)
+        timings[name] = round(best / len(frames) * 1e9, 1)
+    return {
+        'frames': len(frames),
+        'chat_frames': len(outputs['legacy']),
+        'json_backend': kct.JSON_BACKEND,
+        'ns_per_frame': timings,
+        'max_frames_per_second': {name: int(1e9 / ns) for name, ns in timings.items() if ns},
+        'speedup': round(timings['legacy'] / timings['routed'], 2) if timings['routed'] else 0.0,
+        'chat_mismatches': sum(a != b for a, b in zip(outputs['legacy'], outputs['routed']))
+                           + abs(len(outputs['legacy']) - len(outputs['routed'])),
+    }
+
+
+def print_frames_report(report: dict):
+    print(f"🧪 frame handling over {report['frames']} frames ({report['chat_frames']} chat), "
+          f"JSON backend {report['json_backend']} (best of runs)")
+    for name, ns in report['ns_per_frame'].items():
+        print(f"   {name:<14} {ns:>9} ns/frame  {report['max_frames_per_second'][name]:>9} frames/s on one core")
+    print(f"   speedup:  {report['speedup']}×, chat mismatches: {report['chat_mismatches']}")
+
+
+# ─── QUALITY ───────────────────────────────────────────────────────────────────
+QUALITY_THRESHOLDS = [round(0.05 * i, 2) for i in range(13)]
+
+
+def sweep_quality_log(path: str) -> dict:
+    """What each threshold would have skipped in a QUALITY_LOG_FILE recording, by messages and characters."""
+    scored, similarities = [], []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            entry = json.loads(line)
+            if entry['stage'] == 'detect':
+                scored.append((entry['score'], len(entry['text']), entry['text'], entry['lang']))
+            else:
+                similarities.append(entry['similarity'])
+    total_chars = sum(chars for _, chars, _, _ in scored) or 1
+    sweep = []
+    for threshold in QUALITY_THRESHOLDS:
+        skipped = [(score, chars) for score, chars, _, _ in scored if score < threshold]
+        sweep.append({'threshold': threshold, 'skipped': len(skipped),
+                      'skipped_share': round(len(skipped) / len(scored), 3) if scored else 0.0,
+                      'chars_saved_share': round(sum(chars for _, chars in skipped) / total_chars, 3)})
+    scored.sort()
+    return {
+        'messages': len(scored),
+        'translations': len(similarities),
+        'sweep': sweep,
+        # Translations QUALITY_MAX_SIMILARITY would have kept out of chat
+        'similar': {limit: sum(similarity >= limit for similarity in similarities) for limit in (0.7, 0.8, 0.9, 0.95)},
+        'lowest': [{'score': score, 'lang': lang, 'text': text} for score, _, text, lang in scored[:10]],
+    }
+
+
+def run_quality(args) -> dict:
+    os.environ['PIPELINE_STATS_INTERVAL'] = '0'
+    if args.log:
+        return sweep_quality_log(args.log)
+
+    kct = load_translator_module()
+    kct.setup_logging('ERROR')
+    channel = kct.ChannelConfig('bench', chatroom_id=1)
+    translator = kct.KickChatTranslator(channel.slug, None, [channel])
+    samples = [(phrase, True) for lang, phrases in SAMPLE_PHRASES.items() if lang != 'en' for phrase in phrases]
+    samples += [(text, False) for text in SAMPLE_LOW_VALUE]
+
+    scores, elapsed = [], 0.0
+    for text, worth in samples:
+        view = translator.filters.view('viewer', text)
+        lang, confidence = translator.detect_language_scored(view.clean)
+        if not lang or lang.startswith('en'):
+            scores.append((0.0, worth, text, lang))
+            continue
+        started = time.perf_counter()
+        score, _ = translator.quality.score(view.clean, view.words, lang, confidence)
+        elapsed += time.perf_counter() - started
+        scores.append((round(score, 3), worth, text, lang))
+
+    sweep = []
+    for threshold in QUALITY_THRESHOLDS:
+        kept = [worth for score, worth, _, _ in scores if score >= threshold]
+        wanted = sum(worth for _, worth, _, _ in scores)
+        sweep.append({'threshold': threshold,
+                      'precision': round(sum(kept) / len(kept), 3) if kept else 1.0,
+                      'recall': round(sum(kept) / wanted, 3) if wanted else 1.0})
+    threshold = args.threshold if args.threshold is not None else kct.QUALITY_MIN_SCORE or 0.3
+    return {
+        'messages': len(scores),
+        'us_per_score': round(elapsed / len(scores) * 1e6, 2),
+        'sweep': sweep,
+        'threshold': threshold,
+        'misjudged': [{'score': score, 'lang': lang, 'text': text} for score, worth, text, lang in scores
+                      if worth != (score >= threshold)],
+    }
+
+
+def print_quality_report(report: dict):
+    if 'translations' in report:
+        print(f"🧪 quality log: {report['messages']} scored messages, {report['translations']} translations")
+        for row in report['sweep']:
+            print(f"   score < {row['threshold']:<5} skips {row['skipped']:>7} ({row['skipped_share']:.1%} of messages, "
+                  f"{row['chars_saved_share']:.1%} of characters)")
+        print("   translations at least this similar to the original: "
+              + ", ".join(f"{limit}: {count}" for limit, count in report['similar'].items()))
+        print("   lowest scores:")
+        for entry in report['lowest']:
+            print(f"      {entry['score']:.3f} [{entry['lang']}] {entry['text']}")
+        return
+    print(f"🧪 quality scoring over {report['messages']} labelled messages, {report['us_per_score']} µs/score")
+    for row in report['sweep']:
+        print(f"   score < {row['threshold']:<5} skipped: precision {row['precision']:.2f}, recall {row['recall']:.2f}")
+    for entry in report['misjudged']:
+        print(f"   misjudged at {report['threshold']:g}: {entry['score']:.3f} [{entry['lang']}] {entry['text']}")
+
+
+# ─── SHARD ─────────────────────────────────────────────────────────────────────
+class ShardWorker:
+    """One sharded-mode worker's coordinator, ticking on its own thread the way follow_shard does."""
+
+    def __init__(self, kct, backend: str, name: str, slugs: List[str], heartbeat: float, lease_ttl: float):
+        self.coordinator = kct.ShardCoordinator(kct.create_shard_backend(backend), name, slugs,
+                                                heartbeat=heartbeat, lease_ttl=lease_ttl)
+        self.running = threading.Event()
+        self.running.set()
+        self.ticks: List[float] = []
+        self.thread = threading.Thread(target=self._run, name=f'shard-{name}', daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        heartbeat = self.coordinator.heartbeat
+        while self.running.is_set():
+            started = time.monotonic()
+            self.coordinator.tick()
+            self.ticks.append(time.monotonic() - started)
+            time.sleep(max(0.0, heartbeat - (time.monotonic() - started)))
+
+    def leave(self):
+        self.running.clear()
+        self.thread.join()
+        self.coordinator.stop()
+
+    def crash(self):
+        """Stop ticking without releasing anything, like a killed process."""
+        self.running.clear()
+        self.thread.join()
+
+
+def run_shard(args) -> dict:
+    kct = load_translator_module()
+    kct.setup_logging('INFO' if args.verbose else 'ERROR')
+    backend = args.backend or os.path.join(tempfile.mkdtemp(prefix='kct-shard-'), 'shard.db')
+    slugs = [f"channel{i}" for i in range(args.channels)]
+    workers: Dict[str, ShardWorker] = {}
+    stop = threading.Event()
+    checks = Counter()
+
+    def check_ownership():
+        # Sample every worker's view continuously: a chatroom must never have two workers allowed to post
+        while not stop.is_set():
+            live = [worker for worker in list(workers.values())]
+            owners = Counter(slug for worker in live for slug in slugs if worker.coordinator.owns(slug))
+            checks['samples'] += 1
+            checks['double_owner'] += sum(count > 1 for count in owners.values())
+            checks['unowned'] += len(slugs) - len(owners)
+            time.sleep(0.005)
+
+    def converge(phase: str, expected_workers: int) -> dict:
+        """Wait until every channel is owned by the worker the hash ring over the running workers picks."""
+        started = time.monotonic()
+        deadline = started + args.lease_ttl * 4 + 5
+        live = sorted(name for name, worker in workers.items() if worker.running.is_set())
+        ring = kct.HashRing(live)
+        wanted = {name: {slug for slug in slugs if ring.owner(slug) == name} for name in live}
+        while time.monotonic() < deadline:
+            owned = {name: {slug for slug in slugs if workers[name].coordinator.owns(slug)} for name in live}
+            if len(live) == expected_workers and owned == wanted:
+                counts = [len(mine) for mine in owned.values()]
+                return {'phase': phase, 'converged_s': round(time.monotonic() - started, 2),
+                        'per_worker_min': min(counts), 'per_worker_max': max(counts), 'owned': owned}
+            time.sleep(0.01)
+        return {'phase': phase, 'converged_s': None}
+
+    def add(name: str):
+        workers[name] = ShardWorker(kct, backend, name, slugs, args.heartbeat, args.lease_ttl)
+
+    checker = threading.Thread(target=check_ownership, daemon=True)
+    checker.start()
+    phases = []
+    for i in range(args.workers):
+        add(f"worker{i}")
+    phases.append(converge('start', args.workers))
+    add(f"worker{args.workers}")
+    phases.append(converge('join', args.workers + 1))
+    workers['worker0'].leave()
+    phases.append(converge('leave', args.workers))
+    workers['worker1'].crash()
+    phases.append(converge('crash', args.workers - 1))
+    stop.set()
+    checker.join()
+    for worker in workers.values():
+        if worker.running.is_set():
+            worker.leave()
+
+    # Channels that changed owner between consecutive phases (consistent hashing should move about 1/N)
+    for previous, phase in zip(phases, phases[1:]):
+        if 'owned' in previous and 'owned' in phase:
+            before = {slug: name for name, mine in previous['owned'].items() for slug in mine}
+            after = {slug: name for name, mine in phase['owned'].items() for slug in mine}
+            phase['moved'] = sum(before.get(slug) != after.get(slug) for slug in slugs)
+    for phase in phases:
+        phase.pop('owned', None)
+    ticks = [tick for worker in workers.values() for tick in worker.ticks]
+    return {
+        'backend': backend,
+        'channels': len(slugs),
+        'workers': args.workers,
+        'heartbeat_s': args.heartbeat,
+        'lease_ttl_s': args.lease_ttl,
+        'phases': phases,
+        'tick': percentiles(ticks),
+        'ownership_samples': checks['samples'],
+        'double_owner_samples': checks['double_owner'],
+        'unowned_channel_samples': checks['unowned'],
+    }
+
+
+def print_shard_report(report: dict):
+    print(f"🧪 {report['channels']} channels over {report['workers']} worker(s), heartbeat {report['heartbeat_s']}s, "
+          f"lease {report['lease_ttl_s']}s ({report['backend']})")
+    for phase in report['phases']:
+        if phase['converged_s'] is None:
+            print(f"   {phase['phase']:<6} ⚠️ did not converge")
+            continue
+        moved = f", {phase['moved']} moved" if 'moved' in phase else ''
+        print(f"   {phase['phase']:<6} converged in {phase['converged_s']:>5}s, "
+              f"{phase['per_worker_min']}-{phase['per_worker_max']} channels per worker{moved}")
+    tick = report['tick']
+    print(f"   tick:  p50 {tick['p50_ms']}ms, p95 {tick['p95_ms']}ms, max {tick['max_ms']}ms")
+    print(f"   ownership: {report['double_owner_samples']} double-owner samples in {report['ownership_samples']}, "
+          f"{report['unowned_channel_samples']} unowned channel samples (handovers)")
+
+
+# ─── RECORD ────────────────────────────────────────────────────────────────────
+def run_record(args):
+    """Save live ChatMessageEvent frames from one chatroom for later replay."""
+    import websocket
+    kct = load_translator_module()
+    ws = websocket.create_connection(kct.WS_URL_TEMPLATE.format(cluster=kct.CLUSTER, key=kct.APP_KEY))
+    ws.send(json.dumps({"event": "pusher:subscribe",
+                        "data": {"auth": "", "channel": f"chatrooms.{args.chatroom_id}.v2"}}))
+    saved = 0
+    with open(args.output, 'a', encoding='utf-8') as out:
+        while saved < args.count:
+            raw = ws.recv()
+            msg = json.loads(raw)
+            if msg.get("event") == "pusher:ping":
+                ws.send(json.dumps({"event": "pusher:pong", "data": {}}))
+            elif msg.get("event") == CHAT_EVENT:
+                out.write(raw + "\n")
+                saved += 1
+                if saved % 100 == 0:
+                    print(f"💾 {saved}/{args.count} frames")
+    ws.close()
+    print(f"✅ Saved {saved} frames to {args.output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the Kick chat translator")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    replay = commands.add_parser('replay', help="replay chat frames through the bot against local stand-ins")
+    replay.add_argument('--frames', help="JSONL file of recorded Pusher frames (default: synthetic chat)")
+    replay.add_argument('--rate', type=float, default=100, help="frames per second (0 = as fast as possible)")
+    replay.add_argument('--duration', type=float, default=10, help="seconds of synthetic chat")
+    replay.add_argument('--count', type=int, default=0, help="number of frames (overrides --duration)")
+    replay.add_argument('--channels', type=int, default=1, help="chatrooms to spread the frames over")
+    replay.add_argument('--engine', choices=('threaded', 'async'), default='threaded')
+    replay.add_argument('--targets', help="comma-separated target languages (default: TARGET_LANGUAGE)")
+    replay.add_argument('--output', choices=('separate', 'combined'), default='separate',
+                        help="one chat line per target or a combined line")
+    replay.add_argument('--transport', choices=('direct', 'websocket'), default='direct',
+                        help="call on_message directly or go through the Pusher stand-in")
+    replay.add_argument('--english-ratio', type=float, default=0.6, help="share of synthetic English messages")
+    replay.add_argument('--duplicate-ratio', type=float, default=0.15, help="share of repeated messages")
+    replay.add_argument('--seed', type=int, default=1)
+    replay.add_argument('--azure-latency-ms', type=float, default=80)
+    replay.add_argument('--azure-error-rate', type=float, default=0.0)
+    replay.add_argument('--kick-latency-ms', type=float, default=60)
+    replay.add_argument('--kick-error-rate', type=float, default=0.0)
+    replay.add_argument('--retry-after', type=float, default=0.2, help="Retry-After seconds on injected errors")
+    replay.add_argument('--cache-db', help="use a TRANSLATION_CACHE_DB file during the run")
+    replay.add_argument('--deadline', type=float, help="DELIVERY_DEADLINE seconds for the run (0 = off)")
+    replay.add_argument('--slo', type=float, help="DELIVERY_SLO seconds for the run")
+    replay.add_argument('--drain-timeout', type=float, default=15, help="give up once nothing finished for this long")
+    replay.add_argument('--json', action='store_true', help="print the report as JSON")
+    replay.add_argument('--verbose', action='store_true', help="keep the bot's own log output")
+
+    filters = commands.add_parser('filters', help="microbenchmark the per-message filter chain")
+    filters.add_argument('--messages', type=int, default=20000)
+    filters.add_argument('--repeat', type=int, default=5)
+    filters.add_argument('--english-ratio', type=float, default=0.6)
+    filters.add_argument('--duplicate-ratio', type=float, default=0.15)
+    filters.add_argument('--seed', type=int, default=1)
+    filters.add_argument('--json', action='store_true', help="print the report as JSON")
+
+    frames = commands.add_parser('frames', help="microbenchmark websocket frame routing and decoding")
+    frames.add_argument('--frames', type=int, default=50000)
+    frames.add_argument('--chat-ratio', type=float, default=0.6, help="share of chat message frames")
+    frames.add_argument('--ping-ratio', type=float, default=0.02, help="share of Pusher pings")
+    frames.add_argument('--repeat', type=int, default=5)
+    frames.add_argument('--seed', type=int, default=1)
+    frames.add_argument('--json', action='store_true', help="print the report as JSON")
+
+    quality = commands.add_parser('quality', help="sweep quality score thresholds for QUALITY_MIN_SCORE")
+    quality.add_argument('--log', help="QUALITY_LOG_FILE recording (default: labelled synthetic messages)")
+    quality.add_argument('--threshold', type=float,
+                         help="score to list misjudged messages at (default QUALITY_MIN_SCORE, or 0.3 while it is off)")
+    quality.add_argument('--json', action='store_true', help="print the report as JSON")
+
+    shard = commands.add_parser('shard', help="simulate sharded-mode workers joining, leaving and crashing")
+    shard.add_argument('--workers', type=int, default=4, help="workers at the start (one more joins, two go away)")
+    shard.add_argument('--channels', type=int, default=200)
+    shard.add_argument('--backend', help="SHARD_BACKEND to use (default: a temporary SQLite file)")
+    shard.add_argument('--heartbeat', type=float, default=0.2, help="seconds between heartbeats")
+    shard.add_argument('--lease-ttl', type=float, default=1.0, help="seconds before a silent worker's leases expire")
+    shard.add_argument('--json', action='store_true', help="print the report as JSON")
+    shard.add_argument('--verbose', action='store_true', help="keep the coordinators' log output")
+
+    record = commands.add_parser('record', help="save live chat frames from a chatroom for replay")
+    record.add_argument('--chatroom-id', type=int, required=True)
+    record.add_argument('--count', type=int, default=1000)
+    record.add_argument('--output', default='frames.jsonl')
+
+    args = parser.parse_args()
+    if args.command == 'replay':
+        if args.engine == 'async' and importlib.util.find_spec('aiohttp') is None:
+            sys.exit("--engine async needs aiohttp - install it with: pip install aiohttp")
+        report = run_replay(args)
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print_replay_report(report)
+    elif args.command == 'filters':
+        report = run_filters(args)
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print_filters_report(report)
+        if report['decision_mismatches']:
+            sys.exit(f"❌ {report['decision_mismatches']} skip decision(s) differ from the legacy filters")
+    elif args.command == 'frames':
+        report = run_frames(args)
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print_frames_report(report)
+    elif args.command == 'quality':
+        report = run_quality(args)
+        if args.json:
+            print(json.dumps(report, indent=2, ensure_ascii=False))
+        else:
+            print_quality_report(report)
+    elif args.command == 'shard':
+        if args.workers < 2:
+            sys.exit("--workers must be at least 2 (the run removes two of them)")
+        report = run_shard(args)
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print_shard_report(report)
+    elif args.command == 'record':
+        run_record(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,63 @@
-import requests
+import argparse
+import json
+import sys
+
+from kick_channel_resolver import ChannelResolver
+
+
+def read_slugs(args) -> list:
+    """Slugs from the command line and/or a file (one per line or comma-separated); otherwise ask."""
+    slugs = []
+    for value in args.slugs:
+        slugs += value.split(',')
+    if args.file:
+        with open(args.file, encoding='utf-8') as f:
+            for line in f:
+                line = line.split('#', 1)[0]
+                slugs += line.split(',')
+    if not slugs and not args.file:
+        slugs = input("Enter Kick channel name (slug): ").split(',')
+    return [slug.strip() for slug in slugs if slug.strip()]
 
-CHANNEL_INFO_URL = "https://kick.com/api/v2/channels/{slug}"
 
 def main():
-    channel_slug = input("Enter Kick channel name (slug): ").strip()
-    if not channel_slug:
+    parser = argparse.ArgumentParser(description="Look up Kick chatroom and broadcaster IDs")
+    parser.add_argument('slugs', nargs='*', help="channel slugs (comma-separated lists work too)")
+    parser.add_argument('--file', help="file with one slug per line")
+    parser.add_argument('--cache', default='kick_channels.json',
+                        help="channel cache shared with the bot (CHANNEL_CACHE_FILE; empty = off)")
+    parser.add_argument('--workers', type=int, default=4, help="concurrent lookups")
+    parser.add_argument('--json', action='store_true', help="print the results as JSON")
+    args = parser.parse_args()
+
+    slugs = read_slugs(args)
+    if not slugs:
         print("No channel name entered.")
         return
-    url = CHANNEL_INFO_URL.format(slug=channel_slug)
-    headers = {
-        "User-Agent": "Mozilla/5.0 (compatible)",
-        "Accept": "application/json",
-        "Referer": "https://kick.com/",
-        "Origin": "https://kick.com"
-    }
-    try:
-        resp = requests.get(url, headers=headers, timeout=10)
-        if resp.status_code == 403:
-            print("Access forbidden or blocked by security policy. Try running this script from your local machine.")
-            return
-        elif resp.status_code == 404:
-            print(f"Channel '{channel_slug}' not found.")
-            return
-        resp.raise_for_status()
-        data = resp.json()
-        chatroom_id = data.get("chatroom", {}).get("id")
-        broadcaster_id = data.get("user", {}).get("id")
-        if chatroom_id and broadcaster_id:
-            print(f"\nChannel: {channel_slug}")
-            print(f"Chatroom ID: {chatroom_id}")
-            print(f"Broadcaster/User ID: {broadcaster_id}")
-        else:
-            print("Could not find chatroom or broadcaster ID in API response.")
-    except Exception as e:
-        print(f"Error: {e}")
+
+    resolver = ChannelResolver(args.cache, workers=args.workers)
+    results = resolver.resolve_many(slugs)
+
+    if args.json:
+        print(json.dumps({slug: {'chatroom_id': info.chatroom_id, 'broadcaster_id': info.broadcaster_id,
+                                 'error': info.error} for slug, info in results.items()}, indent=2))
+    else:
+        for slug, info in results.items():
+            if info.found:
+                print(f"\nChannel: {slug}{' (cached)' if info.cached else ''}")
+                print(f"Chatroom ID: {info.chatroom_id}")
+                print(f"Broadcaster/User ID: {info.broadcaster_id}")
+            elif info.error == 'not_found':
+                print(f"\nChannel '{slug}' not found.")
+            elif info.error == 'forbidden':
+                print(f"\nChannel '{slug}': access forbidden or blocked by security policy. "
+                      "Try running this script from your local machine.")
+            else:
+                print(f"\nChannel '{slug}': {info.error}")
+
+    if not all(info.found for info in results.values()):
+        sys.exit(1)
+
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
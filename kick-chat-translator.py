@@ -1,4 +1,6 @@
 #!/usr/bin/env python3
+import time
+STARTED_AT = time.monotonic()  # Taken before the heavy imports so the startup report includes them
 import sys
 import json
 import requests
@@ -6,24 +8,82 @@ import websocket
 import os
 import html
 import uuid
-from langdetect import detect
-import time
+import socket
+import signal
+import hashlib
+from langdetect import DetectorFactory, detect, detect_langs
+from langdetect.detector_factory import init_factory
 import threading
-from typing import Optional
+import queue
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
 from dotenv import load_dotenv
+from kick_channel_resolver import ChannelInfo, ChannelResolver, parse_retry_after
+try:
+    import aiohttp  # Optional: only needed for ENGINE=async
+except ImportError:
+    aiohttp = None
+try:
+    import redis  # Optional: only needed for SHARD_BACKEND=redis://...
+except ImportError:
+    redis = None
+_scan_json = json.JSONDecoder().scan_once
+
+
+def stdlib_json_loads(s: str):
+    """json.loads without its per-call wrapper: the same C scanner, falling back to json.loads (and its errors)
+    for anything but one JSON value spanning the whole string."""
+    try:
+        value, end = _scan_json(s, 0)
+    except StopIteration:
+        return json.loads(s)
+    return value if end == len(s) else json.loads(s)
+
+
+try:
+    import orjson  # Optional: faster decoding of websocket frames
+    json_loads, JSON_BACKEND = orjson.loads, 'orjson'
+except ImportError:
+    try:
+        import ujson
+        json_loads, JSON_BACKEND = ujson.loads, 'ujson'
+    except ImportError:
+        json_loads, JSON_BACKEND = stdlib_json_loads, 'json'
 import re
 import unicodedata
+import difflib
+import sqlite3
+import bisect
+import asyncio
+import random
+import logging
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
 
 # Load environment variables from .env file
 load_dotenv()
 
+log = logging.getLogger('kick-chat-translator')
+
 # ─── CONFIG ────────────────────────────────────────────────────────────────────
 APP_KEY          = "32cbd69e4b950bf97679"          # Kick's public Pusher key
 CLUSTER          = "us2"                          # Kick's Pusher cluster (us2 = Ohio)
 WS_URL_TEMPLATE  = "wss://ws-{cluster}.pusher.com/app/{key}?protocol=7&client=js&version=7.6.0&flash=false"
-CHANNEL_INFO_URL = "https://kick.com/api/v2/channels/{slug}"
 CHAT_API_URL_TEMPLATE = "https://kick.com/api/v2/messages/send/{chatroom_id}"
 
+# Default headers for the pooled HTTP session (Kick rejects requests that don't look like a browser)
+SESSION_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
+    "Accept": "application/json",
+    "Content-Type": "application/json",
+    "Origin": "https://kick.com",
+    "Sec-Fetch-Dest": "empty",
+    "Sec-Fetch-Mode": "cors",
+    "Sec-Fetch-Site": "same-origin"
+}
+
 # Azure Translator API setup
 AZURE_TRANSLATOR_KEY = os.getenv('AZURE_TRANSLATOR_KEY')  # Your Azure Translator subscription key
 AZURE_TRANSLATOR_ENDPOINT = os.getenv('AZURE_TRANSLATOR_ENDPOINT', 'https://api.cognitive.microsofttranslator.com')  # Your Azure Translator endpoint
@@ -31,12 +91,106 @@ AZURE_TRANSLATOR_REGION = os.getenv('AZURE_TRANSLATOR_REGION')  # Your Azure Tra
 
 # Bot configuration - Load from environment variables
 KICK_AUTH_TOKEN = os.getenv('KICK_AUTH_TOKEN')  # Load from .env file
-TARGET_LANGUAGE = os.getenv('TARGET_LANGUAGE', 'en')  # Translate to English
+TARGET_LANGUAGES = [lang.strip() for lang in os.getenv('TARGET_LANGUAGE', 'en').split(',') if lang.strip()] or ['en']  # e.g. en,es,pt
+TARGET_LANGUAGE = TARGET_LANGUAGES[0]  # Primary (first) target language
+TRANSLATION_OUTPUT = os.getenv('TRANSLATION_OUTPUT', 'separate')  # Several targets: 'separate' chat lines or one 'combined' line
+TRANSLATION_FORMAT = os.getenv('TRANSLATION_FORMAT', '[by {username}] {translation} ({source} > {target})')
+TRANSLATION_FORMATS = json.loads(os.getenv('TRANSLATION_FORMATS', '{}'))  # Per target language, e.g. {"es": "[{username}] {translation}"}
+TRANSLATION_COMBINED_FORMAT = os.getenv('TRANSLATION_COMBINED_FORMAT', '[by {username}] {translations} ({source} > {targets})')
+TRANSLATION_COMBINED_SEPARATOR = ' | '
 MIN_MESSAGE_LENGTH = int(os.getenv('MIN_MESSAGE_LENGTH', '2'))  # Allow very short messages
 TRANSLATION_PREFIX = os.getenv('TRANSLATION_PREFIX', '🌐 ')  # Prefix for translated messages
-RATE_LIMIT_DELAY = int(os.getenv('RATE_LIMIT_DELAY', '0'))  # No rate limiting
+RATE_LIMIT_DELAY = float(os.getenv('RATE_LIMIT_DELAY', '0'))  # Minimum seconds between posts (superseded by SEND_RATE_PER_SEC)
 BOT_USERNAME = os.getenv('BOT_USERNAME', '').lower()  # Your bot's username to avoid self-translation
 
+# Warm start - load detector profiles and open Azure/Kick connections while the websocket handshakes
+WARM_START = os.getenv('WARM_START', 'true').lower() == 'true'
+
+# Channel lookups - concurrent, cached in a file and backing off together when Kick answers 429/403
+CHANNEL_CACHE_FILE = os.getenv('CHANNEL_CACHE_FILE', 'kick_channels.json')  # Chatroom IDs from earlier runs (empty = off)
+CHANNEL_CACHE_TTL = float(os.getenv('CHANNEL_CACHE_TTL', str(7 * 86400)))  # Seconds a found channel is trusted
+CHANNEL_NOT_FOUND_TTL = float(os.getenv('CHANNEL_NOT_FOUND_TTL', '600'))  # Seconds a 404 is remembered
+CHANNEL_FORBIDDEN_TTL = float(os.getenv('CHANNEL_FORBIDDEN_TTL', '60'))  # Seconds a 403 (blocked by Kick's security policy) is remembered
+CHANNEL_LOOKUP_WORKERS = int(os.getenv('CHANNEL_LOOKUP_WORKERS', '4'))  # Concurrent Kick API lookups
+
+# Reconnects - exponential back-off with jitter; chatroom IDs are resolved once and reused
+RECONNECT_BASE_DELAY = float(os.getenv('RECONNECT_BASE_DELAY', '1'))  # First reconnect delay in seconds
+RECONNECT_MAX_DELAY = float(os.getenv('RECONNECT_MAX_DELAY', '60'))  # Cap for the reconnect delay
+RECONNECT_HEALTHY_AFTER = float(os.getenv('RECONNECT_HEALTHY_AFTER', '60'))  # Uptime that resets the back-off
+PUSHER_PING_INTERVAL = int(os.getenv('PUSHER_PING_INTERVAL', '60'))  # Websocket ping to detect dead connections (0 = off)
+
+# Observability - leveled logging and a Prometheus-style /metrics endpoint
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()  # DEBUG also shows every skip decision
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text').lower()  # text, or json for one structured object per line
+LOG_RATE_LIMIT = float(os.getenv('LOG_RATE_LIMIT', '20'))  # Max lines per second for each kind of log line (0 = unlimited)
+METRICS_PORT = int(os.getenv('METRICS_PORT', '0'))  # Serve /metrics on this port (0 = off)
+METRICS_HOST = os.getenv('METRICS_HOST', '0.0.0.0')
+
+# Engine: threaded (worker threads + requests/websocket-client) or async (one asyncio loop + aiohttp)
+ENGINE = os.getenv('ENGINE', 'threaded').lower()
+ASYNC_HTTP_POOL_SIZE = int(os.getenv('ASYNC_HTTP_POOL_SIZE', '100'))  # Keep-alive connections shared by Azure and Kick
+
+# Translation batching - pending messages are coalesced into one multi-element Azure request
+TRANSLATION_BATCH_WINDOW_MS = int(os.getenv('TRANSLATION_BATCH_WINDOW_MS', '150'))  # How long to collect messages before sending
+TRANSLATION_BATCH_MAX_ITEMS = int(os.getenv('TRANSLATION_BATCH_MAX_ITEMS', '100'))  # Azure allows up to 1000 elements per request
+TRANSLATION_BATCH_MAX_CHARS = int(os.getenv('TRANSLATION_BATCH_MAX_CHARS', '10000'))  # Azure allows up to 50000 characters per request
+TRANSLATION_AUTO_DETECT = os.getenv('TRANSLATION_AUTO_DETECT', 'false').lower() == 'true'  # Let Azure detect the source language
+
+# Azure quota governor - character budgets that shed load before they run out (0 = unlimited)
+AZURE_CHARS_PER_SECOND = int(os.getenv('AZURE_CHARS_PER_SECOND', '0'))  # Short-term throttle limit of your tier
+AZURE_CHARS_PER_HOUR = int(os.getenv('AZURE_CHARS_PER_HOUR', '0'))  # Keeps one spike from eating the month
+AZURE_CHARS_PER_MONTH = int(os.getenv('AZURE_CHARS_PER_MONTH', '0'))  # e.g. 2000000 on the free F0 tier
+CHANNEL_CHARS_PER_HOUR = int(os.getenv('CHANNEL_CHARS_PER_HOUR', '0'))  # Per-channel share in multi-channel mode
+QUOTA_SHED_AT = float(os.getenv('QUOTA_SHED_AT', '0.8'))  # Budget fraction where shedding starts
+QUOTA_SHED_MAX_CHARS = int(os.getenv('QUOTA_SHED_MAX_CHARS', '80'))  # While shedding only messages up to this long are translated
+QUOTA_LOW_PRIORITY_LANGUAGES = [l.strip() for l in os.getenv('QUOTA_LOW_PRIORITY_LANGUAGES', '').split(',') if l.strip()]  # Skipped first while shedding
+QUOTA_SHED_BATCH_FACTOR = float(os.getenv('QUOTA_SHED_BATCH_FACTOR', '4'))  # Batch window multiplier while shedding
+QUOTA_STATE_FILE = os.getenv('QUOTA_STATE_FILE', '')  # JSON file keeping this month's usage across restarts
+AZURE_THROTTLE_DELAY = 1.0  # Pause after a 429 without a Retry-After header
+
+# Delivery deadline and priorities - both opt-in; by default translations are posted in arrival order, however late
+DELIVERY_DEADLINE = float(os.getenv('DELIVERY_DEADLINE', '0'))  # Seconds after receipt a translation is still worth posting (0 = off)
+DELIVERY_SLO = float(os.getenv('DELIVERY_SLO', '5'))  # Target receipt-to-chat latency; work past it goes behind fresh messages (0 = off)
+PRIORITY_BADGES = json.loads(os.getenv('PRIORITY_BADGES', '{}'))  # Sender's best badge counts, e.g. {"moderator": 3, "vip": 2}
+PRIORITY_LANGUAGES = json.loads(os.getenv('PRIORITY_LANGUAGES', '{}'))  # Per source language, e.g. {"es": 1, "ru": -1}
+PRIORITY_SHORT_MESSAGE = int(os.getenv('PRIORITY_SHORT_MESSAGE', '0'))  # Messages up to this many characters get +1 (0 = off)
+
+# Message pipeline - each stage has its own bounded queue and worker pool (the sender is always one thread)
+# (override per stage with PIPELINE_<PARSE|DETECT|TRANSLATE>_WORKERS, PIPELINE_<PARSE|DETECT|TRANSLATE|SEND>_QUEUE_SIZE / _OVERFLOW)
+PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', '1000'))  # Max pending items per stage
+PIPELINE_OVERFLOW_POLICY = os.getenv('PIPELINE_OVERFLOW_POLICY', 'drop_oldest').lower()  # drop_oldest, drop_newest or block
+PIPELINE_STATS_INTERVAL = int(os.getenv('PIPELINE_STATS_INTERVAL', '0'))  # Seconds between queue stats reports (0 = off)
+
+# Outbound chat sender - token bucket, retries with back-off and merging when backed up
+SEND_RATE_PER_SEC = float(os.getenv('SEND_RATE_PER_SEC') or 0) or (1 / RATE_LIMIT_DELAY if RATE_LIMIT_DELAY > 0 else 0)  # 0 = 1/RATE_LIMIT_DELAY, else unlimited
+SEND_BURST = int(os.getenv('SEND_BURST', '3'))  # Posts allowed back-to-back before the rate applies
+SEND_MAX_RETRIES = int(os.getenv('SEND_MAX_RETRIES', '4'))  # Retries on 429/5xx/connection errors
+SEND_BASE_BACKOFF = float(os.getenv('SEND_BASE_BACKOFF', '1'))  # First retry delay in seconds, doubled each attempt
+SEND_MAX_BACKOFF = float(os.getenv('SEND_MAX_BACKOFF', '30'))  # Cap for the retry delay
+SEND_MERGE_BACKLOG = int(os.getenv('SEND_MERGE_BACKLOG', '3'))  # Merge queued translations once this many are waiting (0 = never)
+SEND_MAX_MESSAGE_LENGTH = int(os.getenv('SEND_MAX_MESSAGE_LENGTH', '500'))  # Kick's chat message length limit
+MERGE_SEPARATOR = " | "
+
+# Translation cache - repeated phrases skip the Azure call entirely
+TRANSLATION_CACHE_SIZE = int(os.getenv('TRANSLATION_CACHE_SIZE', '5000'))  # Max cached translations (0 = off)
+TRANSLATION_CACHE_TTL = int(os.getenv('TRANSLATION_CACHE_TTL', '86400'))  # Seconds before a cached translation expires
+
+# Persistent translation store - survives restarts and is shared by translator processes on the host
+TRANSLATION_CACHE_DB = os.getenv('TRANSLATION_CACHE_DB', '')  # SQLite file path, e.g. /data/translations.db (empty = off)
+TRANSLATION_CACHE_DB_MAX_ENTRIES = int(os.getenv('TRANSLATION_CACHE_DB_MAX_ENTRIES', '200000'))  # Rows kept after compaction
+TRANSLATION_CACHE_DB_TTL = int(os.getenv('TRANSLATION_CACHE_DB_TTL', str(30 * 86400)))  # Seconds before a stored translation expires
+TRANSLATION_CACHE_DB_COMPACT_INTERVAL = int(os.getenv('TRANSLATION_CACHE_DB_COMPACT_INTERVAL', '600'))  # Seconds between compactions
+
+# Duplicate suppression - one translation per distinct message per channel and window (raids, copy-pasta)
+DEDUP_WINDOW = float(os.getenv('DEDUP_WINDOW', '30'))  # Seconds a message counts as a duplicate of the first copy (0 = off)
+DEDUP_MAX_ENTRIES = int(os.getenv('DEDUP_MAX_ENTRIES', '5000'))  # Distinct messages tracked at once (memory bound)
+DEDUP_SHOW_COUNT = os.getenv('DEDUP_SHOW_COUNT', 'true').lower() == 'true'  # Append (×N) when copies arrived before posting
+
+# Translation quality scoring - low-value messages (names, emote text, English slang) are skipped before Azure
+QUALITY_MIN_SCORE = float(os.getenv('QUALITY_MIN_SCORE', '0'))  # Minimum score in [0, 1] to translate, e.g. 0.3 (0 = off)
+QUALITY_MAX_SIMILARITY = float(os.getenv('QUALITY_MAX_SIMILARITY', '0.9'))  # Translations this close to the original aren't posted
+QUALITY_LOG_FILE = os.getenv('QUALITY_LOG_FILE', '')  # JSONL of every scoring decision, for tuning thresholds offline
+
 # Languages to allow translating (top 20 most spoken, one per country)
 ALLOWED_LANGUAGES = {
     'zh',   # Chinese (Mandarin)
@@ -62,144 +216,2547 @@ COMMON_ENGLISH_PHRASES = {
     'yo', 'sup', 'yes', 'yea', 'yeah', 'hii', 'hiii','bye',
 }
 
+# Other translation bots whose messages are never translated
+TRANSLATION_BOT_NAMES = frozenset({'chattranslator', 'aitranslatorbot', 'translator', 'translate_bot', 'kickbot'})
+
+# Compiled once for the per-message filter chain
+EMOTE_PATTERN = re.compile(r'\[emote:\d+:[^\]]+\]')  # Kick emotes [emote:id:name]
+TOKEN_PUNCTUATION = "!\"#$%&'()*+,-./:;<=>?@[\\]^_`{|}~¡¿…“”‘’"
+WORD_PATTERN = re.compile(r'\w+')  # Word characters only, so emoji and inner punctuation split words (gg/wp, lol😂)
+
+# Frequent English words for the pure-ASCII fast path (words shared with other Latin-script
+# languages such as 'a', 'no', 'me', 'die', 'son' are left out on purpose)
+COMMON_ENGLISH_WORDS = frozenset({
+    'the', 'and', 'you', 'your', 'are', 'is', 'it', "it's", 'its', 'this', 'that', 'what', 'why', 'how',
+    'who', 'when', 'where', 'with', 'for', 'from', 'of', 'to', 'at', 'be', 'been', 'was', 'were', 'have',
+    'has', 'had', 'do', 'does', 'did', "don't", 'dont', 'not', 'just', 'like', 'love', 'get', 'got', 'going',
+    'gonna', 'wanna', 'know', 'think', 'see', 'look', 'watch', 'play', 'game', 'stream', 'chat', 'he',
+    'she', 'they', 'we', 'my', 'his', 'her', 'their', 'our', 'him', 'them', 'us', 'all', 'can', "can't",
+    'cant', 'will', 'would', 'should', 'could', 'about', 'out', 'up', 'down', 'now', 'then', 'there',
+    'here', 'some', 'more', 'very', 'really', 'too', 'much', 'many', 'one', 'two', 'first', 'last',
+    'guys', 'bro', 'dude', 'man', 'lets', "let's", 'go', 'win', 'lose', 'lost', 'won', 'again', 'time',
+    'day', 'today', 'night', 'right', 'wrong', 'best', 'worst', 'funny', 'crazy', 'insane', 'please',
+    'thank', 'sorry', 'welcome', 'everyone', 'anyone', 'someone', 'nothing', 'something', 'everything',
+    'im', "i'm", 'ive', "i've", 'youre', "you're", 'thats', "that's", 'u', 'ur', 'r', 'pls', 'plz', 'ty',
+    'np', 'idk', 'imo', 'tbh', 'omg', 'lmfao', 'haha', 'hahaha', 'fr', 'ngl', 'w', 'l', 'clip',
+})
+
+# Unicode ranges for scripts the fast classifier recognises, sorted by start code point
+SCRIPT_RANGES = [
+    (0x0400, 0x052F, 'cyrillic'),
+    (0x0600, 0x06FF, 'arabic'),
+    (0x0750, 0x077F, 'arabic'),
+    (0x08A0, 0x08FF, 'arabic'),
+    (0x0900, 0x097F, 'devanagari'),
+    (0x0E00, 0x0E7F, 'thai'),
+    (0x1100, 0x11FF, 'hangul'),
+    (0x3040, 0x30FF, 'kana'),
+    (0x3130, 0x318F, 'hangul'),
+    (0x31F0, 0x31FF, 'kana'),
+    (0x3400, 0x4DBF, 'han'),
+    (0x4E00, 0x9FFF, 'han'),
+    (0xAC00, 0xD7AF, 'hangul'),
+    (0xF900, 0xFAFF, 'han'),
+    (0xFB50, 0xFDFF, 'arabic'),
+    (0xFE70, 0xFEFF, 'arabic'),
+    (0xFF66, 0xFF9F, 'kana'),
+    (0x20000, 0x2A6DF, 'han'),
+]
+
+# Dominant script → language code (as langdetect reports it); kana is handled separately as 'ja'
+SCRIPT_LANGUAGES = {
+    'hangul': 'ko',
+    'thai': 'th',
+    'han': 'zh-cn',
+    'cyrillic': 'ru',
+    'arabic': 'ar',
+    'devanagari': 'hi',
+}
+
+# Letters that belong to sibling languages sharing the script - the ngram detector's script guess defers on them
+SCRIPT_AMBIGUITY_MARKERS = {
+    'cyrillic': 'іїєґўђћџљњјѓќѕәғқңөұүһ',   # Ukrainian, Belarusian, Serbian, Macedonian, Kazakh
+    'arabic': 'پچژگکیےٹڈڑںھ',             # Persian, Urdu
+    'devanagari': 'ळ',                     # Marathi
+}
+
+# Language → scripts its letters are expected in (anything not listed is Latin); used by quality scoring
+LANGUAGE_SCRIPTS = {
+    'ja': {'kana', 'han'}, 'zh': {'han'}, 'ko': {'hangul'}, 'th': {'thai'}, 'hi': {'devanagari'},
+    'mr': {'devanagari'}, 'ne': {'devanagari'}, 'ar': {'arabic'}, 'fa': {'arabic'}, 'ur': {'arabic'},
+    'ru': {'cyrillic'}, 'uk': {'cyrillic'}, 'bg': {'cyrillic'}, 'sr': {'cyrillic'}, 'mk': {'cyrillic'},
+    'be': {'cyrillic'}, 'kk': {'cyrillic'},
+}
+
+# Script → languages written in it; a script shared by several only settles the language when none of them is allowed
+SCRIPT_FAMILIES: Dict[str, Set[str]] = {}
+for _lang, _scripts in LANGUAGE_SCRIPTS.items():
+    for _script in _scripts:
+        SCRIPT_FAMILIES.setdefault(_script, set()).add(_lang)
+
+# Extra English slang for the fast path: comma-separated and/or a file with one entry per line
+ENGLISH_SLANG = [w.strip().lower() for w in os.getenv('ENGLISH_SLANG', '').split(',') if w.strip()]
+ENGLISH_SLANG_FILE = os.getenv('ENGLISH_SLANG_FILE', '')
+# Multi-channel mode - many chatrooms served by one process over a few shared Pusher connections
+KICK_CHANNELS = [c.strip() for c in os.getenv('KICK_CHANNELS', '').split(',') if c.strip()]  # Comma-separated channel slugs
+CHANNELS_CONFIG = os.getenv('CHANNELS_CONFIG', '')  # JSON file with per-channel overrides (see README)
+CHANNELS_PER_CONNECTION = int(os.getenv('CHANNELS_PER_CONNECTION', '100'))  # Subscriptions per Pusher websocket
+
+# Sharded mode - several worker processes split the channel list, with exactly one poster per chatroom
+SHARD_BACKEND = os.getenv('SHARD_BACKEND', '')  # SQLite file shared by the workers, or redis://host:6379/0 (empty = off)
+SHARD_WORKER_ID = os.getenv('SHARD_WORKER_ID', '') or f"{socket.gethostname()}-{os.getpid()}"  # Unique per worker
+SHARD_HEARTBEAT = float(os.getenv('SHARD_HEARTBEAT', '2'))  # Seconds between heartbeats and lease renewals
+SHARD_LEASE_TTL = float(os.getenv('SHARD_LEASE_TTL', '10'))  # A silent worker loses its chatrooms after this long
+SHARD_VNODES = int(os.getenv('SHARD_VNODES', '64'))  # Points per worker on the consistent-hash ring
+
+FAST_DETECT = os.getenv('FAST_DETECT', 'true').lower() == 'true'  # Resolve obvious messages without langdetect
+
+# Language detection backend: langdetect (seeded), ngram (lightweight script/word profiles) or azure (detect while translating)
+LANGUAGE_DETECTOR = os.getenv('LANGUAGE_DETECTOR', 'langdetect').lower()
+LANGDETECT_SEED = int(os.getenv('LANGDETECT_SEED', '0'))  # Fixed seed makes langdetect deterministic
+DETECTOR_CACHE_SIZE = int(os.getenv('DETECTOR_CACHE_SIZE', '10000'))  # Memoized per-text detection results (0 = off)
+DETECTOR_SHADOW = [b.strip().lower() for b in os.getenv('DETECTOR_SHADOW', '').split(',') if b.strip()]  # Backends timed alongside for comparison
+AUTO_DETECT = 'auto'  # Placeholder language: let Azure detect the source while translating
+
+# Word profiles for the lightweight ngram detector (Latin-script languages)
+LATIN_STOPWORDS = {
+    'en': "the and you is are what this that with have for not",
+    'es': "el la los las que de y en es por para con una un pero muy como porque hola gracias buenas buenos noches todos está qué",
+    'pt': "o os as que de e em um uma para com não muito obrigado voce você isso",
+    'fr': "le la les des est et en un une que pas pour avec mais je tu il nous vous c'est merci bonjour",
+    'de': "der die das und ist nicht ich du ein eine mit auf für was wie aber auch danke",
+    'it': "il lo la gli che di e è un una per non con ma sono ciao grazie",
+    'tr': "ve bir bu da de ne için çok ama ben sen mi mı nasıl merhaba teşekkürler",
+    'vi': "và là có không của một người này được cho với anh em chào",
+    'id': "yang dan di ini itu tidak ada dengan untuk aku kamu saya apa",
+    'jv': "lan ing iki kuwi ora ana karo aku kowe apa piye wis arep",
+    'nl': "de het een en van is niet ik je dat wat met",
+    'pl': "nie jest to że się na co jak ale tak dzięki",
+}
+
+# Letters that strongly suggest particular Latin-script languages
+LATIN_DIACRITIC_HINTS = {
+    'ñ': ('es',), '¿': ('es',), '¡': ('es',),
+    'ã': ('pt',), 'õ': ('pt',),
+    'ç': ('fr', 'pt', 'tr'),
+    'ß': ('de',), 'ä': ('de',), 'ö': ('de', 'tr'), 'ü': ('de', 'tr'),
+    'ğ': ('tr',), 'ş': ('tr',), 'ı': ('tr',),
+    'ơ': ('vi',), 'ư': ('vi',), 'đ': ('vi',), 'ă': ('vi',), 'ạ': ('vi',), 'ế': ('vi',), 'ộ': ('vi',),
+    'ł': ('pl',), 'ą': ('pl',), 'ę': ('pl',), 'ż': ('pl',), 'ś': ('pl',),
+    'è': ('fr', 'it'), 'ê': ('fr', 'vi'), 'à': ('fr', 'it'),
+}
+
 # ────────────────────────────────────────────────────────────────────────────────
 
+# (translated text, source language reported by Azure) for one element of a batch
+TranslationResult = Tuple[str, str]
+# Translations of one text keyed by target language
+Translations = Dict[str, TranslationResult]
+
+OVERFLOW_POLICIES = ('drop_oldest', 'drop_newest', 'block')
+
+# Pusher events as they appear (JSON-escaped) in raw frames, so routing needs no decoding
+CHAT_MESSAGE_EVENT = json.dumps("App\\Events\\ChatMessageEvent")[1:-1]
+PING_EVENT = "pusher:ping"
+# Constant frames are serialized once
+PONG_FRAME = json.dumps({"event": "pusher:pong", "data": {}})
+SUBSCRIBE_FRAME_TEMPLATE = '{"event": "pusher:subscribe", "data": {"auth": "", "channel": %s}}'
+UNSUBSCRIBE_FRAME_TEMPLATE = '{"event": "pusher:unsubscribe", "data": {"channel": %s}}'
+
+# Metrics recorded as events happen; gauges such as queue depth are collected at scrape time
+METRIC_DEFINITIONS = {
+    'messages_total': ('counter', 'Chat messages by channel and outcome (sent, or the reason they were skipped)'),
+    'detected_language_total': ('counter', 'Chat messages by detected source language'),
+    'stage_seconds': ('histogram', 'Time a message spent in each pipeline stage, and end to end until posted'),
+    'azure_request_seconds': ('histogram', 'Azure /translate request latency'),
+    'azure_requests_total': ('counter', 'Azure /translate requests by HTTP status'),
+    'azure_characters_total': ('counter', 'Characters translated by Azure (billed per target language)'),
+    'kick_request_seconds': ('histogram', 'Kick chat message POST latency'),
+    'kick_requests_total': ('counter', 'Kick chat message POSTs by HTTP status'),
+}
+METRIC_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def stage_config(name: str, workers: Optional[int] = None, queue_size: int = PIPELINE_QUEUE_SIZE) -> dict:
+    """Read PIPELINE_<NAME>_WORKERS / _QUEUE_SIZE / _OVERFLOW overrides for one pipeline stage.
+
+    Stages without a worker pool (the single-threaded sender) pass no workers and get no WORKERS override.
+    """
+    prefix = f"PIPELINE_{name.upper()}_"
+    overflow = os.getenv(prefix + 'OVERFLOW', PIPELINE_OVERFLOW_POLICY).lower()
+    if overflow not in OVERFLOW_POLICIES:
+        log.warning("⚠️ Unknown overflow policy '%s' for %s stage - using drop_oldest", overflow, name)
+        overflow = 'drop_oldest'
+    config = {
+        'queue_size': max(1, int(os.getenv(prefix + 'QUEUE_SIZE', str(queue_size)))),
+        'overflow': overflow,
+    }
+    if workers is not None:
+        config['workers'] = max(1, int(os.getenv(prefix + 'WORKERS', str(workers))))
+    return config
+
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket per message template, so a flood of the same log line prints a trickle plus a count."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None, max_keys: int = 1024):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self.max_keys = max_keys
+        self.lock = threading.Lock()
+        self.buckets: Dict[tuple, List[float]] = {}  # (level, template) -> [tokens, last refill, suppressed]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.levelno, record.msg)
+        now = time.monotonic()
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                if len(self.buckets) >= self.max_keys:
+                    # Forget idle templates first; a pending suppressed count would otherwise never be reported
+                    for stale in [k for k, b in self.buckets.items() if not b[2]]:
+                        del self.buckets[stale]
+                    if len(self.buckets) >= self.max_keys:
+                        self.buckets.clear()
+                bucket = self.buckets[key] = [self.burst, now, 0]
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                return False
+            bucket[0] -= 1
+            record.suppressed, bucket[2] = bucket[2], 0
+        return True
+
+
+class TextLogFormatter(logging.Formatter):
+    """Plain log lines, noting how many similar lines the rate limit swallowed."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        suppressed = getattr(record, 'suppressed', 0)
+        return f"{line} (+{suppressed} similar suppressed)" if suppressed else line
+
+
+class JsonLogFormatter(logging.Formatter):
+    """One JSON object per line for log shippers."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname.lower(),
+            'thread': record.threadName,
+            'msg': record.getMessage(),
+        }
+        if getattr(record, 'suppressed', 0):
+            entry['suppressed'] = record.suppressed
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class Metrics:
+    """Thread-safe labelled counters and histograms, rendered in the Prometheus text format."""
+
+    def __init__(self, definitions: Dict[str, Tuple[str, str]] = METRIC_DEFINITIONS, prefix: str = 'kick_translator'):
+        self.definitions = definitions
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.series: Dict[str, Dict[tuple, object]] = {name: {} for name in definitions}
+        # Callables returning [(name, type, help, labels, value)] at scrape time
+        self.collectors: List[Callable[[], List[Tuple[str, str, str, dict, float]]]] = []
+
+    def inc(self, name: str, labels: Optional[dict] = None, amount: float = 1.0):
+        key = tuple(sorted(labels.items())) if labels else ()
+        with self.lock:
+            series = self.series[name]
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, labels: Optional[dict] = None):
+        key = tuple(sorted(labels.items())) if labels else ()
+        with self.lock:
+            counts = self.series[name].get(key)
+            if counts is None:
+                # One count per bucket plus +Inf, then the running sum
+                counts = self.series[name][key] = [0] * (len(METRIC_BUCKETS) + 1) + [0.0]
+            counts[bisect.bisect_left(METRIC_BUCKETS, value)] += 1
+            counts[-1] += value
+
+    def render(self) -> str:
+        with self.lock:
+            snapshot = {name: {key: list(value) if isinstance(value, list) else value for key, value in series.items()}
+                        for name, series in self.series.items()}
+
+        lines = []
+        for name, (kind, help_text) in self.definitions.items():
+            full_name = f"{self.prefix}_{name}"
+            lines += [f"# HELP {full_name} {help_text}", f"# TYPE {full_name} {kind}"]
+            for key, value in snapshot[name].items():
+                if kind != 'histogram':
+                    lines.append(f"{full_name}{format_labels(key)} {format_metric_value(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(METRIC_BUCKETS + ('+Inf',), value[:-1]):
+                    cumulative += count
+                    lines.append(f"{full_name}_bucket{format_labels(key + (('le', str(bound)),))} {cumulative}")
+                lines.append(f"{full_name}_sum{format_labels(key)} {format_metric_value(value[-1])}")
+                lines.append(f"{full_name}_count{format_labels(key)} {cumulative}")
+
+        # Samples of one metric must be contiguous, whatever order the collectors return them in
+        families: Dict[str, list] = {}
+        for collector in self.collectors:
+            try:
+                samples = collector()
+            except Exception as e:
+                log.warning("⚠️ Metrics collector error: %s", e)
+                continue
+            for name, kind, help_text, labels, value in samples:
+                families.setdefault(name, [kind, help_text]).append((labels, value))
+        for name, (kind, help_text, *samples) in families.items():
+            full_name = f"{self.prefix}_{name}"
+            lines += [f"# HELP {full_name} {help_text}", f"# TYPE {full_name} {kind}"]
+            for labels, value in samples:
+                lines.append(f"{full_name}{format_labels(tuple(sorted(labels.items())))} {format_metric_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """GET /metrics from the server's Metrics registry."""
+
+    def do_GET(self):
+        if urlparse(self.path).path != '/metrics':
+            self.send_error(404)
+            return
+        body = self.server.metrics.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        log.debug("📈 metrics: " + format, *args)
+
+
+class StageStats:
+    """Thread-safe throughput, drop and latency counters for one pipeline stage."""
+
+    def __init__(self, window: int = 512):
+        self.lock = threading.Lock()
+        self.processed = 0
+        self.dropped = 0
+        self.latencies = deque(maxlen=window)  # most recent latencies in seconds
+
+    def record(self, latency: float):
+        with self.lock:
+            self.processed += 1
+            self.latencies.append(latency)
+
+    def drop(self, count: int = 1):
+        with self.lock:
+            self.dropped += count
+
+    def snapshot(self, depth: int, capacity: int) -> dict:
+        with self.lock:
+            recent = sorted(self.latencies)
+            processed, dropped = self.processed, self.dropped
+
+        def percentile(p):
+            return round(recent[min(len(recent) - 1, int(len(recent) * p))] * 1000, 2) if recent else 0.0
+
+        return {
+            'depth': depth,
+            'capacity': capacity,
+            'processed': processed,
+            'dropped': dropped,
+            'latency_ms_p50': percentile(0.50),
+            'latency_ms_p95': percentile(0.95),
+            'latency_ms_max': round(recent[-1] * 1000, 2) if recent else 0.0,
+        }
+
+
+class PipelineStage:
+    """A bounded queue drained by a pool of worker threads."""
+
+    def __init__(self, name: str, handler: Callable, workers: int = 1, queue_size: int = 1000,
+                 overflow: str = 'drop_oldest', on_drop: Optional[Callable] = None):
+        self.name = name
+        self.handler = handler
+        self.overflow = overflow
+        self.on_drop = on_drop  # Called with every item shed on overflow, so its message can still be finished
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.stats = StageStats()
+
+        for i in range(workers):
+            threading.Thread(target=self._worker, name=f"{name}-{i}", daemon=True).start()
+
+    def put(self, item) -> bool:
+        """Enqueue an item, applying the overflow policy when the queue is full."""
+        entry = (time.monotonic(), item)
+        if self.overflow == 'block':
+            self.queue.put(entry)
+            return True
+
+        try:
+            self.queue.put_nowait(entry)
+            return True
+        except queue.Full:
+            pass
+
+        if self.overflow == 'drop_oldest':
+            try:
+                self._dropped(self.queue.get_nowait()[1])
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(entry)
+                return True
+            except queue.Full:
+                pass
+
+        self._dropped(item)
+        return False
+
+    def _dropped(self, item):
+        self.stats.drop()
+        if self.on_drop:
+            self.on_drop(item)
+
+    def _worker(self):
+        while True:
+            queued_at, item = self.queue.get()
+            try:
+                self.handler(item)
+            except Exception as e:
+                log.warning("⚠️ %s stage error: %s", self.name, e)
+            self.stats.record(time.monotonic() - queued_at)
+
+    def snapshot(self) -> dict:
+        """Current queue depth plus throughput, drop and latency counters."""
+        return self.stats.snapshot(self.queue.qsize(), self.queue.maxsize)
+
+
+class CharWindow:
+    """Characters used over a sliding window, counted in fixed time slots (constant memory)."""
+
+    def __init__(self, seconds: float, limit: int, slots: int = 60):
+        self.limit = limit
+        self.slot_length = seconds / slots
+        self.counts = [0] * slots
+        self.slot_ids = [0] * slots
+
+    def add(self, chars: int, now: float):
+        slot_id = int(now / self.slot_length)
+        i = slot_id % len(self.counts)
+        if self.slot_ids[i] != slot_id:
+            self.slot_ids[i], self.counts[i] = slot_id, 0
+        self.counts[i] += chars
+
+    def used(self, now: float) -> int:
+        oldest = int(now / self.slot_length) - len(self.counts)
+        return sum(count for count, slot_id in zip(self.counts, self.slot_ids) if slot_id > oldest)
+
+
+class QuotaGovernor:
+    """Azure character accounting against per-window and per-channel budgets, shedding load as they run low."""
+
+    def __init__(self, per_second: int = 0, per_hour: int = 0, per_month: int = 0, channel_per_hour: int = 0,
+                 shed_at: float = 0.8, shed_max_chars: int = 80, low_priority_languages=(),
+                 shed_batch_factor: float = 4.0, state_file: str = ''):
+        self.windows = {name: CharWindow(seconds, limit) for name, seconds, limit in
+                        (('second', 1, per_second), ('hour', 3600, per_hour)) if limit > 0}
+        self.per_month = per_month
+        self.channel_per_hour = channel_per_hour
+        self.channel_windows: Dict[str, CharWindow] = {}
+        self.shed_at = shed_at
+        self.shed_max_chars = shed_max_chars
+        self.low_priority = frozenset(low_priority_languages)
+        self.shed_batch_factor = max(1.0, shed_batch_factor)
+        self.state_file = state_file
+
+        self.lock = threading.Lock()
+        self.month, self.month_chars = self._load_month()
+        self.saved_chars = self.month_chars
+        self.blocked_until = 0.0
+        self.pressure = 0.0
+        self.admitted_chars = 0
+        self.shed: Dict[str, int] = {}
+        self.throttles = 0
+
+    @staticmethod
+    def current_month() -> str:
+        return time.strftime('%Y-%m', time.gmtime())
+
+    def _load_month(self) -> Tuple[str, int]:
+        month = self.current_month()
+        if self.state_file and os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, encoding='utf-8') as f:
+                    state = json.load(f)
+                if state.get('month') == month:
+                    return month, int(state.get('chars', 0))
+            except (OSError, ValueError) as e:
+                log.warning("⚠️ Could not read quota state %s: %s", self.state_file, e)
+        return month, 0
+
+    def _save_month(self):
+        tmp = self.state_file + '.tmp'
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'month': self.month, 'chars': self.month_chars}, f)
+            os.replace(tmp, self.state_file)
+        except OSError as e:
+            log.warning("⚠️ Could not save quota state %s: %s", self.state_file, e)
+
+    def _pressure(self, now: float, chars: int) -> float:
+        """Highest budget fraction in use, counting chars about to be sent (caller holds the lock)."""
+        pressure = max((window.used(now) + chars) / window.limit for window in self.windows.values()) if self.windows else 0.0
+        if self.per_month:
+            pressure = max(pressure, (self.month_chars + chars) / self.per_month)
+        return pressure
+
+    def admit(self, chars: int, channel: str, source_lang: Optional[str]) -> Optional[str]:
+        """Account for chars about to be translated, or return why the message is shed instead."""
+        now = time.monotonic()
+        with self.lock:
+            month = self.current_month()
+            if month != self.month:
+                self.month, self.month_chars = month, 0
+
+            self.pressure = self._pressure(now, chars)
+            channel_window = None
+            if self.channel_per_hour:
+                channel_window = self.channel_windows.setdefault(channel, CharWindow(3600, self.channel_per_hour))
+
+            reason = None
+            if self.pressure > 1.0:
+                reason = 'quota_exceeded'
+            elif channel_window and channel_window.used(now) + chars > channel_window.limit:
+                reason = 'channel_quota'
+            elif self.pressure >= self.shed_at:
+                # Close to a limit: lower-priority languages go first, then anything long
+                if source_lang in self.low_priority:
+                    reason = 'quota_low_priority'
+                elif chars > self.shed_max_chars:
+                    reason = 'quota_long_message'
+            if reason:
+                self.shed[reason] = self.shed.get(reason, 0) + 1
+                return reason
+
+            for window in self.windows.values():
+                window.add(chars, now)
+            if channel_window:
+                channel_window.add(chars, now)
+            self.month_chars += chars
+            self.admitted_chars += chars
+            save = self.state_file and self.month_chars - self.saved_chars >= 1000
+            if save:
+                self.saved_chars = self.month_chars
+        if save:
+            self._save_month()
+        return None
+
+    def throttle(self, retry_after: Optional[float]):
+        """Azure answered 429: hold every batch until Retry-After has passed."""
+        with self.lock:
+            self.throttles += 1
+            delay = AZURE_THROTTLE_DELAY if retry_after is None else retry_after
+            self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+        log.warning("⏱️ Azure throttled - holding translations for %.1fs", delay)
+
+    def hold_for(self) -> float:
+        """Seconds until Azure may be called again."""
+        return max(0.0, self.blocked_until - time.monotonic())
+
+    def window_factor(self) -> float:
+        """Batch window multiplier: wider windows while shedding let duplicates and cache hits catch up."""
+        return self.shed_batch_factor if self.pressure >= self.shed_at else 1.0
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self.lock:
+            return {
+                'pressure': round(self._pressure(now, 0), 3),
+                'windows': {name: window.used(now) for name, window in self.windows.items()},
+                'month_chars': self.month_chars,
+                'admitted_chars': self.admitted_chars,
+                'shed': dict(self.shed),
+                'throttles': self.throttles,
+                'held_s': round(max(0.0, self.blocked_until - now), 1),
+            }
+
+
+class DeliveryScheduler:
+    """Deadlines and priorities for translation delivery, measured from when the websocket frame arrived.
+
+    Past the deadline a message is dropped wherever it is (waiting for detection, back from Azure, or in the
+    send queue), so stale chat costs neither Azure characters nor send slots. The send queue is ordered by
+    priority - the sender's best badge, the source language, short messages - except that work which already
+    missed the SLO is downgraded behind everything that can still make it. With no priorities configured the
+    queue keeps arrival order.
+    """
+
+    def __init__(self, deadline: float = 0.0, slo: float = 5.0, badge_weights: Optional[Dict[str, int]] = None,
+                 language_weights: Optional[Dict[str, int]] = None, short_message: int = 0):
+        self.deadline = deadline
+        self.slo = slo
+        self.badge_weights = badge_weights or {}
+        self.language_weights = language_weights or {}
+        self.short_message = short_message
+        self.lock = threading.Lock()
+        self.within_slo = 0
+        self.late = 0
+        self.stale = 0
+
+    def priority(self, badges: Tuple[str, ...], lang: Optional[str], length: int) -> int:
+        score = max((self.badge_weights.get(badge, 0) for badge in badges), default=0)
+        if lang:
+            score += self.language_weights.get(lang, self.language_weights.get(lang.split('-')[0], 0))
+        if self.short_message and length <= self.short_message:
+            score += 1
+        return score
+
+    def expired(self, chat: 'ChatMessage', now: Optional[float] = None) -> bool:
+        return self.deadline > 0 and (now or time.monotonic()) - chat.received_at > self.deadline
+
+    def reorder(self, pending: deque) -> List[Tuple]:
+        """Remove expired sender items and sort the rest in place; returns the removed ones.
+
+        Items are (chatroom_id, channel_slug, message, queued_at, chat); the sort is stable, so equal
+        ranks keep their queue order.
+        """
+        now = time.monotonic()
+        keep, expired = [], []
+        for item in pending:
+            chat = item[4]
+            (expired if chat is not None and self.expired(chat, now) else keep).append(item)
+        if self.badge_weights or self.language_weights or self.short_message:
+            keep.sort(key=lambda item: (0, 0) if item[4] is None else
+                      (self.slo > 0 and now - item[4].received_at > self.slo, -item[4].priority))
+        pending.clear()
+        pending.extend(keep)
+        return expired
+
+    def record(self, chat: 'ChatMessage', outcome: str):
+        """Count a finished message towards the SLO: delivered in time, delivered late, or dropped as stale."""
+        if outcome in ('sent', 'read_only'):
+            latency = chat.marks.get('sent', time.monotonic()) - chat.received_at
+            with self.lock:
+                if self.slo <= 0 or latency <= self.slo:
+                    self.within_slo += 1
+                else:
+                    self.late += 1
+        elif outcome == 'stale':
+            with self.lock:
+                self.stale += 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            total = self.within_slo + self.late + self.stale
+            return {
+                'within_slo': self.within_slo,
+                'late': self.late,
+                'stale': self.stale,
+                'slo_ratio': round(self.within_slo / total, 4) if total else 1.0,
+            }
+
+
+class TranslationBatcher:
+    """Coalesce pending translations into multi-element Azure /translate requests."""
+
+    def __init__(self, translate_batch: Callable[[List[str], Optional[str], Tuple[str, ...]], List[Optional[Translations]]],
+                 window: float, max_items: int, max_chars: int, auto_detect: bool = False,
+                 workers: int = 1, queue_size: int = 1000, overflow: str = 'drop_oldest',
+                 governor: Optional[QuotaGovernor] = None, on_drop: Optional[Callable] = None):
+        self.translate_batch = translate_batch
+        self.window = window
+        self.governor = governor  # Widens the window while shedding and holds batches while Azure throttles
+        self.on_drop = on_drop  # Called with the context of an item evicted on overflow (instead of its callback)
+        self.max_items = max(1, max_items)
+        self.max_chars = max(1, max_chars)
+        self.auto_detect = auto_detect
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.stats = StageStats()
+
+        # Pending work grouped by (source language, target languages); source None = let Azure auto-detect
+        self.pending: Dict[Tuple[Optional[str], Tuple[str, ...]], List[Tuple[str, Callable, float, object]]] = {}
+        self.pending_chars: Dict[Tuple[Optional[str], Tuple[str, ...]], int] = {}
+        self.first_queued: Dict[Tuple[Optional[str], Tuple[str, ...]], float] = {}
+        self.pending_count = 0
+        self.condition = threading.Condition()
+
+        # Each worker slot is one in-flight Azure request; while all are busy, batches keep growing
+        self.slots = threading.Semaphore(workers)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='translate')
+
+        self.thread = threading.Thread(target=self._run, name='translate-batcher', daemon=True)
+        self.thread.start()
+
+    def submit(self, text: str, source_lang: Optional[str], targets: Tuple[str, ...],
+               callback: Callable[[Optional[Translations]], None], context=None) -> bool:
+        """Queue text for translation; callback receives the result (or None) once its batch returns.
+
+        Returns False when a full queue rejects the text; an item evicted later goes to on_drop(context).
+        """
+        key = (None if self.auto_detect else source_lang, targets)
+        evicted = None
+        with self.condition:
+            if self.pending_count >= self.queue_size:
+                if self.overflow == 'block':
+                    while self.pending_count >= self.queue_size:
+                        self.condition.wait()
+                elif self.overflow == 'drop_oldest':
+                    evicted = self._evict_oldest()
+                else:
+                    self.stats.drop()
+                    return False
+
+            items = self.pending.setdefault(key, [])
+            if not items:
+                self.first_queued[key] = time.monotonic()
+                self.pending_chars[key] = 0
+            items.append((text, callback, time.monotonic(), context))
+            self.pending_chars[key] += len(text)
+            self.pending_count += 1
+            self.condition.notify_all()
+
+        if evicted:
+            self._evicted(evicted)
+        return True
+
+    def _evicted(self, item: Tuple[str, Callable, float, object]):
+        self.stats.drop()
+        if self.on_drop and item[3] is not None:
+            self.on_drop(item[3])
+        else:
+            self._deliver(item, None)
+
+    def _evict_oldest(self) -> Optional[Tuple[str, Callable, float, object]]:
+        """Remove the longest-waiting item (caller holds the condition)."""
+        if not self.pending:
+            return None
+        key = min(self.first_queued, key=self.first_queued.get)
+        item = self.pending[key].pop(0)
+        self.pending_chars[key] -= len(item[0])
+        self.pending_count -= 1
+        self._forget_if_empty(key)
+        return item
+
+    def _forget_if_empty(self, key: Tuple[Optional[str], Tuple[str, ...]]):
+        if not self.pending[key]:
+            del self.pending[key]
+            del self.pending_chars[key]
+            del self.first_queued[key]
+
+    def _take_batch(self) -> Tuple[Optional[Tuple[Tuple[Optional[str], Tuple[str, ...]], list]], Optional[float]]:
+        """Pop one group that is full or whose window elapsed; otherwise return the next deadline."""
+        now = time.monotonic()
+        next_deadline = None
+        window = self.window * (self.governor.window_factor() if self.governor else 1.0)
+        for key in list(self.pending):
+            items = self.pending[key]
+            deadline = self.first_queued[key] + window
+            if len(items) < self.max_items and self.pending_chars[key] < self.max_chars and now < deadline:
+                next_deadline = deadline if next_deadline is None else min(next_deadline, deadline)
+                continue
+
+            # Take as many items as fit in one request; the rest stays due for the next round
+            batch, chars = [], 0
+            while items and len(batch) < self.max_items:
+                if batch and chars + len(items[0][0]) > self.max_chars:
+                    break
+                item = items.pop(0)
+                batch.append(item)
+                chars += len(item[0])
+            self.pending_chars[key] -= chars
+            self.pending_count -= len(batch)
+            self._forget_if_empty(key)
+            self.condition.notify_all()
+            return (key, batch), None
+        return None, next_deadline
+
+    def _run(self):
+        while True:
+            self.slots.acquire()
+            hold = self.governor.hold_for() if self.governor else 0.0
+            if hold > 0:
+                time.sleep(hold)
+            with self.condition:
+                ready, next_deadline = self._take_batch()
+                while not ready:
+                    timeout = None if next_deadline is None else max(0.0, next_deadline - time.monotonic())
+                    self.condition.wait(timeout)
+                    ready, next_deadline = self._take_batch()
+
+            self.executor.submit(self._dispatch, *ready)
+
+    def _dispatch(self, key: Tuple[Optional[str], Tuple[str, ...]], batch: List[Tuple[str, Callable, float, object]]):
+        """Send one batch to Azure and hand each result back to its originating message."""
+        try:
+            try:
+                results = self.translate_batch([item[0] for item in batch], *key)
+            except Exception as e:
+                log.warning("⚠️ Batch translation error: %s", e)
+                results = []
+        finally:
+            self.slots.release()
+
+        for i, item in enumerate(batch):
+            self._deliver(item, results[i] if i < len(results) else None)
+
+    def _deliver(self, item: Tuple[str, Callable, float, object], result: Optional[Translations]):
+        _, callback, queued_at, _ = item
+        try:
+            callback(result)
+        except Exception as e:
+            log.warning("⚠️ Translation callback error: %s", e)
+        self.stats.record(time.monotonic() - queued_at)
+
+    def snapshot(self) -> dict:
+        """Current pending depth plus throughput, drop and latency counters."""
+        with self.condition:
+            depth = self.pending_count
+        return self.stats.snapshot(depth, self.queue_size)
+
+
+class FastLanguageClassifier:
+    """Cheap first-stage language classifier that only defers ambiguous text to langdetect."""
+
+    def __init__(self, slang=(), script_min_ratio: float = 0.6, english_min_ratio: float = 0.8,
+                 allowed_languages=ALLOWED_LANGUAGES):
+        self.script_min_ratio = script_min_ratio
+        self.english_min_ratio = english_min_ratio
+        # Tier 1 may only answer where a wrong sibling label can't change the outcome: the script is one
+        # language's own (Hangul, Thai), or none of its languages are allowed, so the message is skipped anyway
+        self.conclusive_scripts = frozenset(
+            script for script, langs in SCRIPT_FAMILIES.items()
+            if len(langs) == 1 or not any(is_allowed_language(lang, allowed_languages) for lang in langs)
+        )
+        self.script_starts = [start for start, _, _ in SCRIPT_RANGES]
+        self.english_words = frozenset(COMMON_ENGLISH_WORDS | {w for w in COMMON_ENGLISH_PHRASES if ' ' not in w}
+                                       | {w.lower() for w in slang if ' ' not in w})
+
+        # One compiled alternation over every known phrase (longest first so 'thank you' beats 'thank')
+        phrases = sorted({p.lower() for p in COMMON_ENGLISH_PHRASES | set(slang) if p.strip()}, key=len, reverse=True)
+        self.phrase_pattern = re.compile(r"\b(?:" + "|".join(re.escape(p) for p in phrases) + r")\b")
+
+        self.lock = threading.Lock()
+        self.resolved = {'memo': 0, 'script': 0, 'english': 0}
+
+    def script_of(self, char: str) -> Optional[str]:
+        """Map a letter to one of the scripts in SCRIPT_RANGES (or 'latin' / 'other')."""
+        cp = ord(char)
+        if cp < 0x250:
+            return 'latin'
+        i = bisect.bisect_right(self.script_starts, cp) - 1
+        if i >= 0 and cp <= SCRIPT_RANGES[i][1]:
+            return SCRIPT_RANGES[i][2]
+        return 'other'
+
+    def script_language(self, text: str) -> Tuple[Optional[str], Optional[str]]:
+        """(dominant script, its most likely language) - the language is None when sibling letters show up."""
+        counts: Dict[str, int] = {}
+        letters = 0
+        for char in text:
+            if char.isalpha():
+                letters += 1
+                script = self.script_of(char)
+                counts[script] = counts.get(script, 0) + 1
+        if not letters:
+            return None, None
+        if counts.get('kana') and counts['kana'] + counts.get('han', 0) >= letters * self.script_min_ratio:
+            return 'kana', 'ja'
+        for script, lang in SCRIPT_LANGUAGES.items():
+            if counts.get(script, 0) >= letters * self.script_min_ratio:
+                # Letters only used by sibling languages (Persian, Ukrainian, Marathi, ...)
+                if any(c in SCRIPT_AMBIGUITY_MARKERS.get(script, '') for c in text):
+                    return script, None
+                return script, lang
+        return 'latin', None
+
+    def classify(self, text: str) -> Tuple[Optional[str], Optional[str]]:
+        """Return (language, tier) when a cheap rule is conclusive, else (None, None)."""
+        script, lang = self.script_language(text)
+        if script is None:
+            return None, None
+
+        # Tier 1: scripts that settle the language, or at least the skip decision (see conclusive_scripts)
+        if script != 'latin':
+            if lang and script in self.conclusive_scripts:
+                return lang, 'script'
+            return None, None
+
+        # Tier 2: pure-ASCII text made (mostly) of known English words, phrases and slang
+        if text.isascii():
+            lowered = text.lower()
+            phrase_hits = len(self.phrase_pattern.findall(lowered))
+            words = re.findall(r"[a-z']+", self.phrase_pattern.sub(' ', lowered))
+            total = phrase_hits + len(words)
+            known = phrase_hits + sum(word in self.english_words for word in words)
+            if total and (known == total or (total >= 2 and known >= total * self.english_min_ratio)):
+                return 'en', 'english'
+
+        return None, None
+
+    def record(self, tier: str):
+        with self.lock:
+            self.resolved[tier] = self.resolved.get(tier, 0) + 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            return dict(self.resolved)
+
+
+class LanguageDetector:
+    """Base class for language detection backends; subclasses implement _detect."""
+
+    name = 'base'
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.init_lock = threading.Lock()
+        self.ready = threading.Event()
+        self.calls = 0
+        self.total_time = 0.0
+
+    def initialize(self):
+        """Load the backend's state once; concurrent callers wait for the first one instead of racing it."""
+        if self.ready.is_set():
+            return
+        with self.init_lock:
+            if not self.ready.is_set():
+                self._initialize()
+                self.ready.set()
+
+    def _initialize(self):
+        pass
+
+    def detect(self, text: str) -> Optional[str]:
+        """Detect the language of text."""
+        return self.detect_scored(text)[0]
+
+    def detect_scored(self, text: str) -> Tuple[Optional[str], float]:
+        """Detect the language of text with the backend's confidence (0-1), timing the call for side-by-side comparison."""
+        self.initialize()
+        start = time.perf_counter()
+        try:
+            return self._detect_scored(text)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.calls += 1
+                self.total_time += elapsed
+
+    def _detect(self, text: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def _detect_scored(self, text: str) -> Tuple[Optional[str], float]:
+        lang = self._detect(text)
+        return lang, 1.0 if lang else 0.0
+
+    def warm_up(self):
+        """Load any lazily-initialised state now instead of on the first chat message.
+
+        Safe to run on a thread while the detect stage takes messages: they wait for it in initialize()
+        (the async engine waits on a thread of its own, so the event loop keeps running).
+        """
+        self.initialize()
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'calls': self.calls,
+                'avg_ms': round(self.total_time / self.calls * 1000, 3) if self.calls else 0.0,
+            }
+
+
+class LangdetectDetector(LanguageDetector):
+    """The langdetect library, seeded so the same text always gets the same answer."""
+
+    name = 'langdetect'
+
+    def __init__(self, seed: int = 0):
+        super().__init__()
+        DetectorFactory.seed = seed
+
+    def _initialize(self):
+        # init_factory publishes the factory before its profiles are loaded, so an unguarded
+        # concurrent first call can detect against a half-loaded profile set
+        init_factory()
+
+    def _detect(self, text: str) -> Optional[str]:
+        return detect(text)
+
+    def _detect_scored(self, text: str) -> Tuple[Optional[str], float]:
+        # detect() is the top entry of detect_langs(), so the probability comes at no extra cost
+        best = detect_langs(text)[0]
+        return best.lang, best.prob
+
+
+class NgramDetector(LanguageDetector):
+    """Lightweight detector: script ranges plus stopword and diacritic profiles for Latin-script languages."""
+
+    name = 'ngram'
+
+    def __init__(self, classifier: 'FastLanguageClassifier'):
+        super().__init__()
+        self.classifier = classifier
+        self.word_index: Dict[str, List[str]] = {}
+        for lang, words in LATIN_STOPWORDS.items():
+            for word in words.split():
+                self.word_index.setdefault(word, []).append(lang)
+
+    def _detect(self, text: str) -> Optional[str]:
+        return self._detect_scored(text)[0]
+
+    def _detect_scored(self, text: str) -> Tuple[Optional[str], float]:
+        lang, _ = self.classifier.classify(text)
+        if lang:
+            return lang, 1.0
+        # Shared scripts: the script's main language is this detector's best guess
+        _, lang = self.classifier.script_language(text)
+        if lang:
+            return lang, 1.0
+
+        scores: Dict[str, float] = {}
+        for word in re.findall(r"\w+", text.lower()):
+            for candidate in self.word_index.get(word, ()):
+                scores[candidate] = scores.get(candidate, 0) + 1
+        for char in text.lower():
+            for candidate in LATIN_DIACRITIC_HINTS.get(char, ()):
+                scores[candidate] = scores.get(candidate, 0) + 2
+        if not scores:
+            return None, 0.0
+        best = max(scores, key=scores.get)
+        return best, scores[best] / sum(scores.values())
+
+
+class AzureDetector(LanguageDetector):
+    """Defer detection to Azure: the message is translated with auto-detect and checked afterwards."""
+
+    name = 'azure'
+
+    def _detect(self, text: str) -> Optional[str]:
+        return AUTO_DETECT
+
+
+def create_detector(name: str, classifier: 'FastLanguageClassifier') -> LanguageDetector:
+    """Build a detection backend by name (langdetect, ngram or azure)."""
+    if name == 'ngram':
+        return NgramDetector(classifier)
+    if name == 'azure':
+        return AzureDetector()
+    if name != 'langdetect':
+        log.warning("⚠️ Unknown language detector '%s' - using langdetect", name)
+    return LangdetectDetector(LANGDETECT_SEED)
+
+
+class QualityScorer:
+    """Decides whether a message is worth translating, and whether its translation is worth posting.
+
+    Before Azure: detector confidence × share of letters in the language's own script × share of words
+    that aren't common English × lexical support (stopwords or letters of the language; otherwise only
+    longer messages get the benefit of the doubt). After Azure: similarity between original and translation.
+    """
+
+    # Words without any stopword or telltale letter count as full support from this many words on
+    SUPPORT_WORDS = 4
+
+    def __init__(self, classifier: 'FastLanguageClassifier', min_score: float = 0.0, max_similarity: float = 0.9,
+                 log_file: str = ''):
+        self.classifier = classifier
+        self.stopwords = {lang: frozenset(words.split()) for lang, words in LATIN_STOPWORDS.items()}
+        self.min_score = min_score
+        self.max_similarity = max_similarity
+        self.decisions = None
+        if log_file:
+            # A logger of its own: one JSON object per line, written under the handler's lock
+            self.decisions = logging.getLogger('kick-chat-translator.quality')
+            self.decisions.propagate = False
+            self.decisions.setLevel(logging.INFO)
+            handler = logging.FileHandler(log_file, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            self.decisions.addHandler(handler)
+
+    def score(self, text: str, words: List[str], lang: str, confidence: float) -> Tuple[float, dict]:
+        """Quality score in [0, 1] plus the features it was computed from."""
+        expected = LANGUAGE_SCRIPTS.get(lang.split('-')[0], {'latin'})
+        letters = native = 0
+        for char in text:
+            if char.isalpha():
+                letters += 1
+                native += self.classifier.script_of(char) in expected
+        script_ratio = native / letters if letters else 0.0
+        tokens = [word.strip(TOKEN_PUNCTUATION) for word in words]
+        english = self.classifier.english_words
+        english_share = sum(token in english for token in tokens) / len(tokens) if tokens else 0.0
+
+        # Langdetect is confident about almost any single token (names, emote text, 'kkkkk'), so Latin
+        # text also needs evidence of the language itself
+        support = 1.0
+        if expected == {'latin'}:
+            base = lang.split('-')[0]
+            stopwords = self.stopwords.get(base, ())
+            if not (any(token in stopwords for token in tokens) or not text.isascii()
+                    or any(base in LATIN_DIACRITIC_HINTS.get(char, ()) for char in text.lower())):
+                support = min(1.0, len(tokens) / self.SUPPORT_WORDS)
+
+        score = confidence * script_ratio * (1.0 - english_share) * support
+        return score, {'confidence': round(confidence, 3), 'script_ratio': round(script_ratio, 3),
+                       'english_share': round(english_share, 3), 'support': round(support, 3)}
+
+    def similarity(self, original: str, translated: str) -> float:
+        """0 (nothing in common) to 1 (same text, ignoring case and accents)."""
+        return difflib.SequenceMatcher(None, normalize_for_comparison(original),
+                                       normalize_for_comparison(translated)).ratio()
+
+    def record(self, stage: str, channel: str, text: str, lang: str, decision: str, **features):
+        if self.decisions:
+            entry = {'ts': round(time.time(), 3), 'stage': stage, 'channel': channel, 'text': text, 'lang': lang,
+                     'decision': decision, **features}
+            self.decisions.info(json.dumps(entry, ensure_ascii=False))
+
+
+class TranslationStore:
+    """SQLite-backed translation store shared across restarts and processes on the same host."""
+
+    # Only refresh last_used once per interval so cache hits don't turn into writes
+    TOUCH_INTERVAL = 3600
+
+    def __init__(self, path: str, max_entries: int, ttl: float, compact_interval: float):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.compact_interval = compact_interval
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.last_compaction = time.time()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.compactions = 0
+
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                " text TEXT NOT NULL, source TEXT NOT NULL, target TEXT NOT NULL,"
+                " translation TEXT NOT NULL, detected TEXT NOT NULL,"
+                " created_at REAL NOT NULL, last_used REAL NOT NULL,"
+                " PRIMARY KEY (text, source, target))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used)")
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread."""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = self.local.conn = connect_sqlite(self.path)
+        return conn
+
+    @staticmethod
+    def _row_key(key: tuple) -> Tuple[str, str, str]:
+        text, source, target = key
+        return text, source or '', target
+
+    def get(self, key: tuple) -> Optional[TranslationResult]:
+        """Return a stored, unexpired translation for key, or None."""
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT translation, detected, created_at, last_used FROM translations"
+                " WHERE text = ? AND source = ? AND target = ?",
+                self._row_key(key)
+            ).fetchone()
+            now = time.time()
+            if row and self.ttl > 0 and row[2] + self.ttl < now:
+                row = None
+            if row and row[3] + self.TOUCH_INTERVAL < now:
+                conn.execute(
+                    "UPDATE translations SET last_used = ? WHERE text = ? AND source = ? AND target = ?",
+                    (now,) + self._row_key(key)
+                )
+        except sqlite3.Error as e:
+            log.warning("⚠️ Translation store read error: %s", e)
+            row = None
+
+        with self.lock:
+            if row:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return (row[0], row[1]) if row else None
+
+    def put(self, key: tuple, value: TranslationResult):
+        """Write a translation through to disk and compact when due."""
+        now = time.time()
+        try:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO translations"
+                " (text, source, target, translation, detected, created_at, last_used)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                self._row_key(key) + (value[0], value[1] or '', now, now)
+            )
+        except sqlite3.Error as e:
+            log.warning("⚠️ Translation store write error: %s", e)
+            return
+
+        with self.lock:
+            self.writes += 1
+            due = now - self.last_compaction >= self.compact_interval
+            if due:
+                self.last_compaction = now
+        if due:
+            self.compact()
+
+    def compact(self):
+        """Drop expired rows, trim to max_entries by least recent use and checkpoint the WAL."""
+        now = time.time()
+        try:
+            conn = self._connection()
+            # IMMEDIATE takes the write lock up front so concurrent compactions serialize cleanly
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self.ttl > 0:
+                    conn.execute("DELETE FROM translations WHERE created_at < ?", (now - self.ttl,))
+                count = conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+                if count > self.max_entries:
+                    conn.execute(
+                        "DELETE FROM translations WHERE rowid IN"
+                        " (SELECT rowid FROM translations ORDER BY last_used LIMIT ?)",
+                        (count - self.max_entries,)
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error as e:
+            log.warning("⚠️ Translation store compaction error: %s", e)
+            return
+        with self.lock:
+            self.compactions += 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'writes': self.writes,
+                'compactions': self.compactions,
+            }
+
+
+class RedisTranslationStore:
+    """TranslationStore counterpart in Redis, shared by sharded workers on different hosts.
+
+    Entries expire with the store TTL; size is bounded by the server's maxmemory policy instead of compaction.
+    """
+
+    def __init__(self, client, ttl: float, prefix: str = 'kick-translator:translation'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def _key(self, key: tuple) -> str:
+        text, source, target = key
+        digest = hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+        return f"{self.prefix}:{source or ''}:{target}:{digest}"
+
+    def get(self, key: tuple) -> Optional[TranslationResult]:
+        try:
+            raw = self.client.get(self._key(key))
+        except redis.RedisError as e:
+            log.warning("⚠️ Translation store read error: %s", e)
+            raw = None
+        with self.lock:
+            if raw:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return tuple(json.loads(raw)) if raw else None
+
+    def put(self, key: tuple, value: TranslationResult):
+        try:
+            self.client.set(self._key(key), json.dumps(value), ex=int(self.ttl) if self.ttl > 0 else None)
+        except redis.RedisError as e:
+            log.warning("⚠️ Translation store write error: %s", e)
+            return
+        with self.lock:
+            self.writes += 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'writes': self.writes, 'compactions': 0}
+
+
+class TranslationCache:
+    """Size-bounded LRU cache of translations with per-entry TTL, optionally backed by a TranslationStore."""
+
+    def __init__(self, max_size: int, ttl: float, store: Optional[TranslationStore] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.store = store
+        self.entries: "OrderedDict[tuple, Tuple[TranslationResult, float]]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: tuple) -> Optional[TranslationResult]:
+        """Return the cached translation for key, or None on a miss."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and self.ttl > 0 and entry[1] < time.monotonic():
+                del self.entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Fall back to the on-disk store and promote hits into memory
+        if self.store:
+            value = self.store.get(key)
+            if value is not None:
+                self._remember(key, value)
+                return value
+        return None
+
+    def put(self, key: tuple, value: TranslationResult):
+        """Store a translation in memory (and on disk), evicting the least recently used entries past max_size."""
+        self._remember(key, value)
+        if self.store:
+            self.store.put(key, value)
+
+    def _remember(self, key: tuple, value: TranslationResult):
+        if self.max_size <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + self.ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            stats = {
+                'size': len(self.entries),
+                'capacity': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+        if self.store:
+            stats['store'] = self.store.stats()
+        return stats
+
+
+class DedupWindow:
+    """Time-windowed duplicate counter with constant memory: a FIFO ring of keys plus a dict of counts."""
+
+    def __init__(self, window: float, max_entries: int):
+        self.window = window
+        self.max_entries = max(1, max_entries)
+        self.lock = threading.Lock()
+        self.order = deque()  # (expires_at, key) in first-seen order, so expiry only ever pops the left end
+        self.counts: Dict[tuple, int] = {}
+        self.suppressed = 0
+
+    def seen(self, key: tuple) -> int:
+        """Count one copy of a message; 1 means it is the first copy in the window."""
+        now = time.monotonic()
+        with self.lock:
+            self._expire(now)
+            count = self.counts.get(key, 0) + 1
+            if count == 1:
+                if len(self.order) >= self.max_entries:
+                    del self.counts[self.order.popleft()[1]]
+                self.order.append((now + self.window, key))
+            else:
+                self.suppressed += 1
+            self.counts[key] = count
+            return count
+
+    def count(self, key: tuple) -> int:
+        """Copies seen so far in the current window (0 once it expired)."""
+        with self.lock:
+            self._expire(time.monotonic())
+            return self.counts.get(key, 0)
+
+    def _expire(self, now: float):
+        while self.order and self.order[0][0] <= now:
+            del self.counts[self.order.popleft()[1]]
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {'entries': len(self.counts), 'capacity': self.max_entries, 'suppressed': self.suppressed}
+
+
+class HashRing:
+    """Consistent hashing of channel slugs onto workers: a worker joining or leaving moves about 1/N of them."""
+
+    def __init__(self, workers: Iterable[str], vnodes: int = 64):
+        points = sorted((ring_hash(f"{worker}#{i}"), worker) for worker in workers for i in range(max(1, vnodes)))
+        self.hashes = [point for point, _ in points]
+        self.workers = [worker for _, worker in points]
+
+    def owner(self, key: str) -> Optional[str]:
+        if not self.hashes:
+            return None
+        return self.workers[bisect.bisect(self.hashes, ring_hash(key)) % len(self.hashes)]
+
+
+class SqliteShardBackend:
+    """Shard coordination state in a SQLite file shared by the workers (one host, or a shared volume)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.local = threading.local()
+        conn = self._connection()
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS shard_workers (worker TEXT PRIMARY KEY, expires_at REAL NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS shard_leases ("
+                         " name TEXT PRIMARY KEY, worker TEXT NOT NULL, expires_at REAL NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS shard_assignments (slug TEXT PRIMARY KEY, worker TEXT NOT NULL)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = self.local.conn = connect_sqlite(self.path)
+        return conn
+
+    def _write(self, work: Callable[[sqlite3.Connection], object]):
+        """Run work in one IMMEDIATE transaction, so workers serialize on the write lock."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = work(conn)
+            conn.execute("COMMIT")
+            return result
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def heartbeat(self, worker: str, ttl: float) -> List[str]:
+        """Renew worker's membership and return all live workers, sorted."""
+        def work(conn):
+            now = time.time()
+            conn.execute("INSERT OR REPLACE INTO shard_workers (worker, expires_at) VALUES (?, ?)", (worker, now + ttl))
+            conn.execute("DELETE FROM shard_workers WHERE expires_at < ?", (now,))
+            return [row[0] for row in conn.execute("SELECT worker FROM shard_workers ORDER BY worker")]
+        return self._write(work)
+
+    def acquire(self, names: List[str], worker: str, ttl: float) -> List[str]:
+        """Take or renew leases; returns the names worker now holds (the rest are held by someone else)."""
+        def work(conn):
+            now = time.time()
+            held = []
+            for name in names:
+                row = conn.execute("SELECT worker, expires_at FROM shard_leases WHERE name = ?", (name,)).fetchone()
+                if row and row[0] != worker and row[1] > now:
+                    continue
+                conn.execute("INSERT OR REPLACE INTO shard_leases (name, worker, expires_at) VALUES (?, ?, ?)",
+                             (name, worker, now + ttl))
+                held.append(name)
+            return held
+        return self._write(work) if names else []
+
+    def release(self, name: str, worker: str):
+        self._connection().execute("DELETE FROM shard_leases WHERE name = ? AND worker = ?", (name, worker))
+
+    def publish(self, assignment: Dict[str, str]):
+        def work(conn):
+            conn.execute("DELETE FROM shard_assignments")
+            conn.executemany("INSERT INTO shard_assignments (slug, worker) VALUES (?, ?)", assignment.items())
+        self._write(work)
+
+    def assignment(self) -> Dict[str, str]:
+        return dict(self._connection().execute("SELECT slug, worker FROM shard_assignments"))
+
+    def leave(self, worker: str):
+        self._connection().execute("DELETE FROM shard_workers WHERE worker = ?", (worker,))
+
+    def translation_store(self, max_entries: int, ttl: float, compact_interval: float) -> TranslationStore:
+        """The workers' shared translation store, kept in the same file."""
+        return TranslationStore(self.path, max_entries=max_entries, ttl=ttl, compact_interval=compact_interval)
+
+
+class RedisShardBackend:
+    """Shard coordination state in Redis, for workers on different hosts. Leases expire on the server's clock."""
+
+    # Take or renew a lease unless another worker holds it / drop it only if it is still ours
+    ACQUIRE_SCRIPT = """
+local owner = redis.call('GET', KEYS[1])
+if owner and owner ~= ARGV[1] then return 0 end
+redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+return 1
+"""
+    RELEASE_SCRIPT = "if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) end return 0"
+
+    def __init__(self, url: str, prefix: str = 'kick-translator:shard'):
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self.acquire_script = self.client.register_script(self.ACQUIRE_SCRIPT)
+        self.release_script = self.client.register_script(self.RELEASE_SCRIPT)
+
+    def heartbeat(self, worker: str, ttl: float) -> List[str]:
+        now = time.time()
+        key = f"{self.prefix}:workers"
+        pipe = self.client.pipeline()
+        pipe.zadd(key, {worker: now + ttl})
+        pipe.zremrangebyscore(key, '-inf', now)
+        pipe.zrange(key, 0, -1)
+        return sorted(pipe.execute()[2])
+
+    def acquire(self, names: List[str], worker: str, ttl: float) -> List[str]:
+        if not names:
+            return []
+        pipe = self.client.pipeline()
+        for name in names:
+            self.acquire_script(keys=[f"{self.prefix}:lease:{name}"], args=[worker, int(ttl * 1000)], client=pipe)
+        return [name for name, held in zip(names, pipe.execute()) if held]
+
+    def release(self, name: str, worker: str):
+        self.release_script(keys=[f"{self.prefix}:lease:{name}"], args=[worker])
+
+    def publish(self, assignment: Dict[str, str]):
+        key = f"{self.prefix}:assignment"
+        pipe = self.client.pipeline()
+        pipe.delete(key)
+        if assignment:
+            pipe.hset(key, mapping=assignment)
+        pipe.execute()
+
+    def assignment(self) -> Dict[str, str]:
+        return self.client.hgetall(f"{self.prefix}:assignment")
+
+    def leave(self, worker: str):
+        self.client.zrem(f"{self.prefix}:workers", worker)
+
+    def translation_store(self, max_entries: int, ttl: float, compact_interval: float) -> RedisTranslationStore:
+        return RedisTranslationStore(self.client, ttl)
+
+
+class ShardCoordinator:
+    """Splits the channel list between worker processes through a shared backend.
+
+    Every worker heartbeats. Whoever holds the 'leader' lease maps the channels onto the live workers with a
+    consistent-hash ring and publishes that assignment. Each worker then holds a lease per assigned chatroom
+    and only posts while it does, so a chatroom never has two posters - not even during a rebalance.
+    """
+
+    LEADER = 'leader'
+
+    def __init__(self, backend, worker_id: str, slugs: Iterable[str], heartbeat: float = 2.0,
+                 lease_ttl: float = 10.0, vnodes: int = 64):
+        self.backend = backend
+        self.worker_id = worker_id
+        self.slugs = list(slugs)
+        self.heartbeat = heartbeat
+        self.lease_ttl = max(lease_ttl, 2 * heartbeat)
+        self.vnodes = vnodes
+        self.lock = threading.Lock()
+        self.owned: Dict[str, float] = {}  # slug -> monotonic time until which this worker may post
+        self.workers: List[str] = []
+        self.leader = False
+        self.rebalances = 0
+        self.acquired = 0
+        self.released = 0
+        self.errors = 0
+
+    def tick(self) -> Set[str]:
+        """One heartbeat: renew membership and leases, rebalance if leader. Returns the chatrooms held."""
+        # Trust a lease locally until one heartbeat before the backend lets anyone else take it
+        valid_until = time.monotonic() + self.lease_ttl - self.heartbeat
+        try:
+            workers = self.backend.heartbeat(self.worker_id, self.lease_ttl)
+            if workers != self.workers:
+                log.info("🧩 Shard workers: %s (%s)", len(workers), ', '.join(workers))
+                self.workers = workers
+            leader = bool(self.backend.acquire([self.LEADER], self.worker_id, self.lease_ttl))
+            if leader and not self.leader:
+                log.info("👑 %s is now the shard leader", self.worker_id)
+            self.leader = leader
+
+            assignment = self.backend.assignment()
+            if leader:
+                ring = HashRing(workers, self.vnodes)
+                wanted = {slug: ring.owner(slug) for slug in self.slugs}
+                if wanted != assignment:
+                    moved = sum(assignment.get(slug) != worker for slug, worker in wanted.items())
+                    self.backend.publish(wanted)
+                    self.rebalances += 1
+                    log.info("🧩 Rebalanced %s channel(s) over %s worker(s), %s moved", len(wanted), len(workers), moved)
+                    assignment = wanted
+
+            mine = {slug for slug, worker in assignment.items() if worker == self.worker_id and slug in self.slugs}
+            # Chatrooms moving away are released before new ones are claimed, so a handover takes one heartbeat
+            for slug in set(self.owned) - mine:
+                self._drop(slug)
+                self.backend.release(f"chatroom:{slug}", self.worker_id)
+            held = set(self.backend.acquire([f"chatroom:{slug}" for slug in sorted(mine)], self.worker_id, self.lease_ttl))
+            for slug in mine:
+                if f"chatroom:{slug}" in held:
+                    with self.lock:
+                        self.acquired += slug not in self.owned
+                        self.owned[slug] = valid_until
+                elif slug in self.owned:
+                    # Another worker took it over while this one was stalled
+                    self._drop(slug)
+        except Exception as e:
+            self.errors += 1
+            log.warning("⚠️ Shard backend error: %s", e)
+
+        # Leases that couldn't be renewed run out here too
+        now = time.monotonic()
+        for slug, until in list(self.owned.items()):
+            if until <= now:
+                self._drop(slug)
+        return set(self.owned)
+
+    def _drop(self, slug: str):
+        with self.lock:
+            if self.owned.pop(slug, None) is not None:
+                self.released += 1
+
+    def owns(self, slug: str) -> bool:
+        """Whether this worker may post to the channel right now."""
+        until = self.owned.get(slug)
+        return until is not None and until > time.monotonic()
+
+    def stop(self):
+        """Leave at once: release every chatroom and the leadership so the other workers take over now."""
+        slugs = list(self.owned)
+        for slug in slugs:
+            self._drop(slug)
+        try:
+            for slug in slugs:
+                self.backend.release(f"chatroom:{slug}", self.worker_id)
+            if self.leader:
+                self.backend.release(self.LEADER, self.worker_id)
+            self.backend.leave(self.worker_id)
+        except Exception as e:
+            log.warning("⚠️ Shard backend error while leaving: %s", e)
+        log.info("👋 %s left the shard and released %s chatroom(s)", self.worker_id, len(slugs))
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'worker': self.worker_id,
+                'leader': self.leader,
+                'workers': len(self.workers),
+                'owned': len(self.owned),
+                'rebalances': self.rebalances,
+                'acquired': self.acquired,
+                'released': self.released,
+                'errors': self.errors,
+            }
+
+
+def create_shard_backend(url: str):
+    """SHARD_BACKEND: a redis:// URL, or the path of a SQLite file all workers can reach."""
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        if redis is None:
+            log.error("❌ A Redis SHARD_BACKEND needs the redis package - install it with: pip install redis")
+            sys.exit(1)
+        return RedisShardBackend(url)
+    return SqliteShardBackend(url)
+
+
+class ChatSender:
+    """Single outbound chat sender with a token-bucket rate limit, retries and ordered delivery."""
+
+    def __init__(self, post: Callable, rate: float, burst: int, max_retries: int, merge_backlog: int,
+                 max_message_length: int, queue_size: int = 1000, overflow: str = 'drop_oldest',
+                 on_result: Optional[Callable] = None, may_post: Optional[Callable[[str], bool]] = None,
+                 schedule: Optional[Callable[[deque], List[Tuple]]] = None, on_drop: Optional[Callable] = None):
+        # One sender thread keeps posts in order
+        self.post = post
+        self.on_result = on_result
+        self.may_post = may_post
+        self.schedule = schedule  # Reorders the backlog before each post and returns expired items
+        self.on_drop = on_drop  # Called with the context of a message shed on overflow (instead of on_result)
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_retries = max_retries
+        self.merge_backlog = merge_backlog
+        self.max_message_length = max_message_length
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.stats = StageStats()
+
+        self.pending = deque()  # (chatroom_id, channel_slug, message, queued_at, context)
+        self.condition = threading.Condition()
+        self.tokens = float(self.burst)
+        self.last_refill = time.monotonic()
+
+        self.thread = threading.Thread(target=self._run, name='chat-sender', daemon=True)
+        self.thread.start()
+
+    def enqueue(self, chatroom_id, channel_slug: str, message: str, context=None) -> bool:
+        """Queue a message for posting; messages go out in the order they were queued (or the schedule's order).
+
+        context is handed back to on_result(context, sent) once the message is posted or given up on.
+        """
+        dropped = None
+        with self.condition:
+            if len(self.pending) >= self.queue_size:
+                if self.overflow == 'block':
+                    while len(self.pending) >= self.queue_size:
+                        self.condition.wait()
+                elif self.overflow == 'drop_oldest':
+                    dropped = self.pending.popleft()
+                else:
+                    self._dropped((chatroom_id, channel_slug, message, 0, context))
+                    return False
+            self.pending.append((chatroom_id, channel_slug, message, time.monotonic(), context))
+            self.condition.notify_all()
+        if dropped:
+            self._dropped(dropped)
+        return True
+
+    def _report(self, items: List[Tuple], sent: bool):
+        if self.on_result:
+            for item in items:
+                self.on_result(item[4], sent)
+
+    def _dropped(self, item: Tuple):
+        self.stats.drop()
+        if self.on_drop:
+            self.on_drop(item[4])
+        else:
+            self._report([item], False)
+
+    def _take(self) -> Tuple[List[Tuple], List[Tuple]]:
+        """Pop the next message, merging consecutive ones for the same chatroom when backed up.
+
+        Also returns the items the schedule expired, which leave the queue without being posted.
+        """
+        with self.condition:
+            while not self.pending:
+                self.condition.wait()
+            expired = self.schedule(self.pending) if self.schedule else []
+            items = take_mergeable(self.pending, self.merge_backlog, self.max_message_length) if self.pending else []
+            self.condition.notify_all()
+            return items, expired
+
+    def _wait_for_token(self):
+        """Block until the token bucket allows another post."""
+        if self.rate <= 0:
+            return
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            time.sleep((1 - self.tokens) / self.rate)
+
+    def _run(self):
+        while True:
+            items, expired = self._take()
+            if expired:
+                self.stats.drop(len(expired))
+                self._report(expired, False)
+            if not items:
+                continue
+            chatroom_id, channel_slug = items[0][0], items[0][1]
+            message = MERGE_SEPARATOR.join(item[2] for item in items)
+            if len(items) > 1:
+                log.info("📦 Merged %d queued translations into one message", len(items))
+
+            if not self._send_with_retry(chatroom_id, channel_slug, message):
+                self.stats.drop(len(items))
+                self._report(items, False)
+                continue
+            now = time.monotonic()
+            for item in items:
+                self.stats.record(now - item[3])
+            self._report(items, True)
+
+    def _send_with_retry(self, chatroom_id, channel_slug: str, message: str) -> bool:
+        """Post one message, backing off on 429/5xx and connection errors."""
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_token()
+            if self.may_post and not self.may_post(channel_slug):
+                log.info("🧩 Not posting to %s - another worker owns it now: %s", channel_slug, message)
+                return False
+            retry_after = None
+            try:
+                resp = self.post(chatroom_id, channel_slug, message)
+            except Exception as e:
+                log.warning("⚠️ Error sending message: %s", e)
+            else:
+                if resp.status_code == 200:
+                    log.info("✅ Translation sent: %s", message)
+                    return True
+                if resp.status_code != 429 and resp.status_code < 500:
+                    log.warning("⚠️ Failed to send message. Status: %s, Response: %s", resp.status_code, resp.text)
+                    return False
+                retry_after = parse_retry_after(resp.headers.get('Retry-After'))
+                log.info("⏱️ Kick returned %s while sending", resp.status_code)
+
+            if attempt < self.max_retries:
+                delay = retry_after if retry_after is not None else min(SEND_MAX_BACKOFF, SEND_BASE_BACKOFF * 2 ** attempt)
+                log.info("   🔁 Retrying send in %.1fs (attempt %d/%d)", delay, attempt + 2, self.max_retries + 1)
+                time.sleep(delay)
+
+        log.warning("⚠️ Giving up on message after %d attempts: %s", self.max_retries + 1, message)
+        return False
+
+    def snapshot(self) -> dict:
+        """Current backlog plus throughput, drop and latency counters."""
+        with self.condition:
+            depth = len(self.pending)
+        return self.stats.snapshot(depth, self.queue_size)
+
+
+@dataclass
+class ChannelConfig:
+    """Per-channel settings; anything left unset falls back to the global configuration."""
+    slug: str
+    chatroom_id: Optional[int] = None
+    target_languages: Tuple[str, ...] = tuple(TARGET_LANGUAGES)
+    allowed_languages: frozenset = frozenset(ALLOWED_LANGUAGES)
+    bot_username: str = BOT_USERNAME
+    output: str = TRANSLATION_OUTPUT
+    formats: Dict[str, str] = field(default_factory=lambda: dict(TRANSLATION_FORMATS))
+
+    @property
+    def target_language(self) -> str:
+        """Primary target language."""
+        return self.target_languages[0]
+
+    @property
+    def subscription(self) -> str:
+        """Pusher channel carrying this chatroom's messages."""
+        return f"chatrooms.{self.chatroom_id}.v2"
+
+    @property
+    def subscribe_frame(self) -> str:
+        return SUBSCRIBE_FRAME_TEMPLATE % json.dumps(self.subscription)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'ChannelConfig':
+        """Build a config from one CHANNELS_CONFIG entry."""
+        allowed = data.get('allowed_languages')
+        if isinstance(allowed, str):
+            allowed = [lang.strip() for lang in allowed.split(',') if lang.strip()]
+        targets = data.get('target_languages', data.get('target_language'))
+        if isinstance(targets, str):
+            targets = [lang.strip() for lang in targets.split(',') if lang.strip()]
+        return cls(
+            slug=data['slug'],
+            chatroom_id=int(data['chatroom_id']) if data.get('chatroom_id') else None,
+            target_languages=tuple(targets) if targets else tuple(TARGET_LANGUAGES),
+            allowed_languages=frozenset(allowed) if allowed else frozenset(ALLOWED_LANGUAGES),
+            bot_username=data.get('bot_username', BOT_USERNAME).lower(),
+            output=data.get('output', TRANSLATION_OUTPUT),
+            formats={**TRANSLATION_FORMATS, **data.get('formats', {})},
+        )
+
+
+@dataclass
+class ChatMessage:
+    """One incoming chat message and the timestamps it collects on its way through the pipeline."""
+    username: str
+    content: str
+    channel: ChannelConfig
+    received_at: float = field(default_factory=time.monotonic)
+    marks: Dict[str, float] = field(default_factory=dict)
+    pending_posts: int = 1  # Chat lines still with the sender when one message fans out to several targets
+    delivered: bool = False
+    badges: Tuple[str, ...] = ()  # Sender's badge types (subscriber, moderator, ...)
+    priority: int = 0  # Send-queue priority, set once the language is known
+
+    def mark(self, stage: str):
+        """Record when the message finished a pipeline stage (detected, translated, sent)."""
+        self.marks[stage] = time.monotonic()
+
+
+class MessageView(NamedTuple):
+    """A chat message tokenized once; every filter rule reads the same view."""
+    username: str            # lowercased
+    clean: str               # emotes removed, whitespace collapsed
+    words: List[str]         # lowercase whitespace tokens of clean
+
+
+class MessageFilter:
+    """Pre-detection filter chain compiled once from config; check() returns the first matching skip reason."""
+
+    def __init__(self, min_length: int = MIN_MESSAGE_LENGTH, common_phrases=COMMON_ENGLISH_PHRASES,
+                 translation_prefix: str = TRANSLATION_PREFIX, bot_names=TRANSLATION_BOT_NAMES):
+        self.min_length = min_length
+        self.common_words = frozenset(phrase.lower() for phrase in common_phrases)
+        self.bot_names = frozenset(name.lower() for name in bot_names)
+
+        # (reason, rule) in evaluation order; rules that don't apply to this config are left out entirely
+        self.rules: List[Tuple[str, Callable[[MessageView, ChannelConfig], bool]]] = [
+            ('own_message', lambda view, channel: view.username == channel.bot_username),
+            ('known_bot', lambda view, channel: view.username in self.bot_names),
+            ('empty', lambda view, channel: not view.clean),
+        ]
+        if min_length > 1:
+            self.rules.append(('too_short', lambda view, channel: len(view.clean) < min_length))
+        self.rules += [
+            ('common_english', lambda view, channel: self.is_common_english(view.clean)),
+            ('command', lambda view, channel: view.clean[0] == '!'),
+        ]
+        if translation_prefix:
+            # Our own (or another bot's) translations - avoid translation loops
+            self.rules.append(('translation_prefix', lambda view, channel: view.clean.startswith(translation_prefix)))
+
+    def view(self, username: str, message: str) -> MessageView:
+        """Clean and tokenize a message once for all rules."""
+        clean = clean_chat_text(message)
+        return MessageView(username.lower(), clean, clean.lower().split())
+
+    def is_common_english(self, text: str) -> bool:
+        """Every word is a common English chat phrase (lol, gg, thanks, ...); emoji and punctuation are ignored."""
+        words = WORD_PATTERN.findall(text.lower())
+        # all() stops at the first non-English word, which is usually the first one
+        return bool(words) and all(word in self.common_words for word in words)
+
+    def check(self, view: MessageView, channel: ChannelConfig) -> Optional[str]:
+        for reason, rule in self.rules:
+            if rule(view, channel):
+                return reason
+        return None
+
+
+class ReconnectSupervisor:
+    """Exponential back-off with jitter and time-to-reconnect metrics for one Pusher connection."""
+
+    def __init__(self, base_delay: float, max_delay: float, healthy_after: float):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.healthy_after = healthy_after
+        self.lock = threading.Lock()
+        self.attempt = 0
+        self.connected_at: Optional[float] = None
+        self.disconnected_at: Optional[float] = None
+        self.last_frame_at: Optional[float] = None
+        self.error_code: Optional[int] = None
+        self.confirmed = set()
+        self.disconnects = 0
+        self.reconnect_times = deque(maxlen=100)
+
+    def observe(self, msg: dict, channel_count: int):
+        """Track handshake, subscription and error frames from Pusher."""
+        ev = msg.get("event")
+        if ev == "pusher:connection_established":
+            self.confirmed = set()
+            self.error_code = None
+        elif ev == "pusher_internal:subscription_succeeded":
+            self.confirmed.add(msg.get("channel"))
+            if len(self.confirmed) >= channel_count:
+                self._connected()
+        elif ev == "pusher:error":
+            data = msg.get("data") or {}
+            if isinstance(data, str):
+                data = json.loads(data or '{}')
+            self.error_code = data.get("code")
+            log.warning("⚠️ Pusher error %s: %s", self.error_code, data.get('message'))
+
+    def frame_received(self):
+        self.last_frame_at = time.monotonic()
+
+    def _connected(self):
+        """All subscriptions are live again - record how long chat was interrupted."""
+        now = time.monotonic()
+        with self.lock:
+            self.connected_at = now
+            if self.disconnected_at is None:
+                return
+            outage = now - self.disconnected_at
+            self.reconnect_times.append(outage)
+            self.disconnected_at = None
+        log.info("♻️ Resubscribed after %.1fs without chat", outage)
+
+    def disconnected(self, close_code: Optional[int]) -> Optional[float]:
+        """Record a disconnect; return the delay before reconnecting, or None to stop for good."""
+        now = time.monotonic()
+        code = close_code or self.error_code
+        with self.lock:
+            self.disconnects += 1
+            if self.disconnected_at is None:
+                self.disconnected_at = self.last_frame_at or now
+
+            if self.connected_at and now - self.connected_at >= self.healthy_after:
+                self.attempt = 0  # the last connection was healthy - start the back-off over
+            self.connected_at = None
+
+            # Pusher close codes: 4000-4099 fatal, 4100-4199 back off, 4200-4299 reconnect right away
+            if code == 1000 or (code and 4000 <= code < 4100):
+                return None
+            if code and 4200 <= code < 4300 and self.attempt == 0:
+                self.attempt = 1
+                return 0.0
+
+            delay = min(self.max_delay, self.base_delay * 2 ** self.attempt)
+            self.attempt += 1
+        # Jitter spreads reconnects out so many bots don't stampede a recovering cluster
+        return random.uniform(delay / 2, delay)
+
+    def stats(self) -> dict:
+        with self.lock:
+            times = sorted(self.reconnect_times)
+            return {
+                'disconnects': self.disconnects,
+                'reconnects': len(times),
+                'connected': self.connected_at is not None,
+                'reconnect_s_p50': round(times[len(times) // 2], 2) if times else 0.0,
+                'reconnect_s_max': round(times[-1], 2) if times else 0.0,
+            }
+
+
+class PusherConnection:
+    """One Pusher websocket carrying the chat subscriptions for a group of channels."""
+
+    def __init__(self, translator: 'KickChatTranslator', channels: List[ChannelConfig]):
+        self.translator = translator
+        self.channels = channels
+        self.ws_url = WS_URL_TEMPLATE.format(cluster=CLUSTER, key=APP_KEY)
+        self.supervisor = ReconnectSupervisor(RECONNECT_BASE_DELAY, RECONNECT_MAX_DELAY, RECONNECT_HEALTHY_AFTER)
+        self.close_code = None
+        # Set once the handshake is done, so channels can be (un)subscribed while the connection is up
+        self.lock = threading.Lock()
+        self.send: Optional[Callable[[str], object]] = None
+
+    def run(self):
+        """Connect, and keep reconnecting with back-off until a normal or fatal close."""
+        while True:
+            self.close_code = None
+            ws = websocket.WebSocketApp(
+                self.ws_url,
+                on_open=self.on_open,
+                on_message=self.on_message,
+                on_error=self.on_error,
+                on_close=self.on_close
+            )
+            log.info("📡 Connecting to %s for %s channel(s)…", self.ws_url, len(self.channels))
+            if PUSHER_PING_INTERVAL > 0:
+                ws.run_forever(ping_interval=PUSHER_PING_INTERVAL, ping_timeout=min(30, PUSHER_PING_INTERVAL - 1) or None)
+            else:
+                ws.run_forever()
+
+            delay = self.supervisor.disconnected(self.close_code)
+            if delay is None:
+                return
+            log.warning("⚠️ Unexpected closure - reconnecting in %.1fs (attempt %s)...", delay, self.supervisor.attempt)
+            time.sleep(delay)
+
+    def on_open(self, ws):
+        log.info("🔗 Connection opened, waiting for handshake…")
+
+    def on_message(self, ws, raw):
+        self.supervisor.frame_received()
+        # Pusher control frames (handshake, ping) are rare and cheap - answer them right here so
+        # they can never be dropped or delayed behind a backed-up parse queue
+        event = peek_event(raw)
+        if event == PING_EVENT:
+            ws.send(PONG_FRAME)
+        elif event.startswith("pusher"):
+            self.handle_control(ws, json_loads(raw))
+        else:
+            self.translator.on_message(ws, raw, event)
+
+    def handle_control(self, ws, msg: dict):
+        """Answer Pusher handshake and subscription frames."""
+        self.supervisor.observe(msg, len(self.channels))
+        if self.supervisor.connected_at is not None:
+            self.translator.startup.milestone('subscribed')
+        for reply in self.control_replies(msg, ws.send):
+            ws.send(reply)
+
+    def control_replies(self, msg: dict, send: Callable[[str], object]) -> List[str]:
+        """pusher_control_replies for this connection's channels; after the handshake, send is kept for subscribe()."""
+        with self.lock:
+            if msg.get("event") == "pusher:connection_established":
+                self.send = send
+            return pusher_control_replies(msg, self.channels)
+
+    def subscribe(self, channel: ChannelConfig):
+        """Add a channel; it is subscribed now if the connection is up, otherwise on the next handshake."""
+        with self.lock:
+            self.channels.append(channel)
+            self._send(channel.subscribe_frame)
+
+    def unsubscribe(self, channel: ChannelConfig):
+        with self.lock:
+            self.channels.remove(channel)
+            self._send(UNSUBSCRIBE_FRAME_TEMPLATE % json.dumps(channel.subscription))
+
+    def _send(self, frame: str):
+        if self.send is None:
+            return
+        try:
+            self.send(frame)
+        except Exception as e:
+            # The connection just dropped - the next handshake subscribes from self.channels
+            log.debug("Could not send %s: %s", frame, e)
+
+    def on_error(self, ws, err):
+        log.warning("⚠️ WebSocket Error: %s", err)
+
+    def on_close(self, ws, code, reason):
+        # Reconnecting is left to run() so the callback never recurses or sleeps
+        log.info("🔌 Connection closed: %s %s", code, reason)
+        self.close_code = code
+        self.send = None
+
+
+class StartupTimer:
+    """Startup breakdown: how long each warm-up took, and when each milestone was reached after process start."""
+
+    def __init__(self, started_at: float):
+        self.started_at = started_at
+        self.phases: Dict[str, float] = {}
+        self.milestones: Dict[str, float] = {}
+        self.lock = threading.Lock()
+
+    def timed(self, name: str, task: Callable[[], object]):
+        """Run one warm-up task; a failed warm-up only costs the first real request its setup time."""
+        started = time.monotonic()
+        try:
+            task()
+        except Exception as e:
+            log.debug("Warm-up %s failed: %s", name, e)
+        self.phases[name] = time.monotonic() - started
+
+    async def timed_async(self, name: str, task):
+        started = time.monotonic()
+        try:
+            await task
+        except Exception as e:
+            log.debug("Warm-up %s failed: %s", name, e)
+        self.phases[name] = time.monotonic() - started
+
+    def milestone(self, name: str) -> bool:
+        """Record a milestone the first time it is reached; returns True only then."""
+        if name in self.milestones:
+            return False
+        with self.lock:
+            if name in self.milestones:
+                return False
+            self.milestones[name] = time.monotonic() - self.started_at
+            return True
+
+    def report(self) -> str:
+        milestones = ", ".join(f"{name} at {seconds:.2f}s" for name, seconds in self.milestones.items())
+        phases = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.phases.items())
+        return f"{milestones} (warm-up: {phases or 'off'})"
+
+
 class KickChatTranslator:
-    def __init__(self, channel_slug: str, auth_token: str):
-        self.channel_slug = channel_slug
+    def __init__(self, channel_slug: str, auth_token: str, channels: Optional[List[ChannelConfig]] = None):
+        # One translator can serve many channels; the first one is the primary channel
+        self.channels = channels or [ChannelConfig(channel_slug)]
+        self.channel_slug = self.channels[0].slug
+        self.subscriptions: Dict[str, ChannelConfig] = {}
+        self.connections: List[PusherConnection] = []
         self.auth_token = auth_token
-        self.chatroom_id = None
         self.azure_translator_key = AZURE_TRANSLATOR_KEY
         self.azure_translator_endpoint = AZURE_TRANSLATOR_ENDPOINT
         self.azure_translator_region = AZURE_TRANSLATOR_REGION
-        self.last_translation_time = 0
-        self.translated_messages = set()  # Track translated messages to avoid loops
+        self.dedup = DedupWindow(DEDUP_WINDOW, DEDUP_MAX_ENTRIES) if DEDUP_WINDOW > 0 else None
+        self.metrics = Metrics()
+        self.metrics.collectors.append(self.collect_metrics)
+        self.startup = StartupTimer(STARTED_AT)
+        self.resolver = ChannelResolver(CHANNEL_CACHE_FILE, ttl=CHANNEL_CACHE_TTL, negative_ttl=CHANNEL_NOT_FOUND_TTL,
+                                        forbidden_ttl=CHANNEL_FORBIDDEN_TTL, workers=CHANNEL_LOOKUP_WORKERS)
+        self.shard = None
+        if SHARD_BACKEND:
+            self.shard = ShardCoordinator(create_shard_backend(SHARD_BACKEND), SHARD_WORKER_ID,
+                                          [channel.slug for channel in self.channels], heartbeat=SHARD_HEARTBEAT,
+                                          lease_ttl=SHARD_LEASE_TTL, vnodes=SHARD_VNODES)
         
         # Create persistent HTTP session for faster requests
         self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
-            "Accept": "application/json",
-            "Content-Type": "application/json",
-            "Origin": "https://kick.com",
-            "Sec-Fetch-Dest": "empty",
-            "Sec-Fetch-Mode": "cors",
-            "Sec-Fetch-Site": "same-origin"
-        })
+        self.session.headers.update(SESSION_HEADERS)
+
+        # Cheap script/English rules resolve most messages before the (pluggable) detection backend,
+        # and per-text results are memoized (the LRU cache works for any key/value)
+        classifier = FastLanguageClassifier(
+            load_slang(),
+            allowed_languages=frozenset().union(*(channel.allowed_languages for channel in self.channels))
+        )
+        self.fast_classifier = classifier if FAST_DETECT else None
+        self.detector = create_detector(LANGUAGE_DETECTOR, classifier)
+        self.shadow_detectors = [
+            create_detector(name, classifier) for name in DETECTOR_SHADOW
+            if name not in (self.detector.name, 'azure')
+        ]
+        self.detection_memo = TranslationCache(DETECTOR_CACHE_SIZE, ttl=0)
+        log.info("🧭 Language detector: %s", self.detector.name)
+        self.quality = QualityScorer(classifier, QUALITY_MIN_SCORE, QUALITY_MAX_SIMILARITY, QUALITY_LOG_FILE)
+
+        # Translations of repeated phrases are served from memory, then from the shared on-disk store
+        store = None
+        if TRANSLATION_CACHE_DB:
+            store = TranslationStore(
+                TRANSLATION_CACHE_DB,
+                max_entries=TRANSLATION_CACHE_DB_MAX_ENTRIES,
+                ttl=TRANSLATION_CACHE_DB_TTL,
+                compact_interval=TRANSLATION_CACHE_DB_COMPACT_INTERVAL
+            )
+        elif self.shard:
+            # Sharded workers share their translations through the coordination backend
+            store = self.shard.backend.translation_store(TRANSLATION_CACHE_DB_MAX_ENTRIES, TRANSLATION_CACHE_DB_TTL,
+                                                         TRANSLATION_CACHE_DB_COMPACT_INTERVAL)
+        self.cache = TranslationCache(TRANSLATION_CACHE_SIZE, TRANSLATION_CACHE_TTL, store)
+        self.filters = MessageFilter()
+        # Raw (JSON-escaped) event name -> frame handler; anything else is ignored undecoded
+        self.routes: Dict[str, Callable[[str, float], None]] = {CHAT_MESSAGE_EVENT: self.handle_chat_frame}
+        self.ignored_frames = 0
+        self.fanout_lock = threading.Lock()
+        self.scheduler = DeliveryScheduler(
+            deadline=DELIVERY_DEADLINE,
+            slo=DELIVERY_SLO,
+            badge_weights=PRIORITY_BADGES,
+            language_weights=PRIORITY_LANGUAGES,
+            short_message=PRIORITY_SHORT_MESSAGE
+        )
+        self.governor = QuotaGovernor(
+            per_second=AZURE_CHARS_PER_SECOND,
+            per_hour=AZURE_CHARS_PER_HOUR,
+            per_month=AZURE_CHARS_PER_MONTH,
+            channel_per_hour=CHANNEL_CHARS_PER_HOUR,
+            shed_at=QUOTA_SHED_AT,
+            shed_max_chars=QUOTA_SHED_MAX_CHARS,
+            low_priority_languages=QUOTA_LOW_PRIORITY_LANGUAGES,
+            shed_batch_factor=QUOTA_SHED_BATCH_FACTOR,
+            state_file=QUOTA_STATE_FILE
+        )
+
+        self._build_pipeline()
+
+        if PIPELINE_STATS_INTERVAL > 0:
+            threading.Thread(target=self._report_pipeline_stats, name='pipeline-stats', daemon=True).start()
+        if METRICS_PORT > 0:
+            try:
+                start_metrics_server(self.metrics)
+            except OSError as e:
+                log.warning("⚠️ Could not serve metrics on port %s: %s", METRICS_PORT, e)
+
+    def _build_pipeline(self):
+        # Staged pipeline: receive/parse → filter/detect → translate → send, each with its own
+        # bounded queue and workers so slow Azure/Kick calls never stall the websocket thread
+        self.parse_stage = PipelineStage('parse', self.handle_frame, **stage_config('parse', workers=1))
+        self.detect_stage = PipelineStage(
+            'detect', lambda chat: self.process_message(chat.username, chat.content, chat.channel, chat),
+            on_drop=self.message_dropped,
+            **stage_config('detect', workers=2)
+        )
+        self.batcher = TranslationBatcher(
+            self.translate_batch,
+            window=TRANSLATION_BATCH_WINDOW_MS / 1000.0,
+            max_items=TRANSLATION_BATCH_MAX_ITEMS,
+            max_chars=TRANSLATION_BATCH_MAX_CHARS,
+            auto_detect=TRANSLATION_AUTO_DETECT,
+            governor=self.governor,
+            on_drop=self.message_dropped,
+            **stage_config('translate', workers=4)
+        )
+        self.sender = ChatSender(
+            self.post_chat_message,
+            rate=SEND_RATE_PER_SEC,
+            burst=SEND_BURST,
+            max_retries=SEND_MAX_RETRIES,
+            merge_backlog=SEND_MERGE_BACKLOG,
+            max_message_length=SEND_MAX_MESSAGE_LENGTH,
+            on_result=self.message_sent,
+            may_post=self.may_post,
+            schedule=self.scheduler.reorder,
+            on_drop=self.message_dropped,
+            **stage_config('send')
+        )
+
+    @property
+    def chatroom_id(self) -> Optional[int]:
+        """Chatroom ID of the primary channel."""
+        return self.channels[0].chatroom_id
+
+    @chatroom_id.setter
+    def chatroom_id(self, value: Optional[int]):
+        self.channels[0].chatroom_id = value
+
+    def pipeline_stats(self) -> dict:
+        """Queue depth, drops and latency for every pipeline stage (none before the stages are built)."""
+        stages = {'parse': self.parse_stage, 'detect': self.detect_stage, 'translate': self.batcher, 'send': self.sender}
+        return {name: stage.snapshot() for name, stage in stages.items() if stage is not None}
+
+    def collect_metrics(self) -> List[Tuple[str, str, str, dict, float]]:
+        """Scrape-time samples for queues, caches, detection and websocket connections."""
+        samples = []
+        for name, stats in self.pipeline_stats().items():
+            stage = {'stage': name}
+            samples += [
+                ('stage_queue_depth', 'gauge', 'Items waiting in each pipeline stage', stage, stats['depth']),
+                ('stage_processed_total', 'counter', 'Items each pipeline stage finished', stage, stats['processed']),
+                ('stage_dropped_total', 'counter', 'Items each pipeline stage shed on overflow', stage, stats['dropped']),
+            ]
+        caches = [('translation', self.cache.stats()), ('detection', self.detection_memo.stats())]
+        for name, cache in caches:
+            labels = {'cache': name}
+            samples += [
+                ('cache_hits_total', 'counter', 'Cache lookups answered from memory', labels, cache['hits']),
+                ('cache_misses_total', 'counter', 'Cache lookups that missed', labels, cache['misses']),
+                ('cache_evictions_total', 'counter', 'Entries evicted to stay within capacity', labels, cache['evictions']),
+                ('cache_entries', 'gauge', 'Entries currently cached', labels, cache['size']),
+            ]
+        quota = self.governor.stats()
+        samples += [
+            ('quota_pressure', 'gauge', 'Highest fraction of any Azure character budget in use', {}, quota['pressure']),
+            ('quota_month_characters', 'gauge', 'Characters sent to Azure this calendar month', {}, quota['month_chars']),
+            ('azure_throttled_total', 'counter', 'Azure 429 responses that paused translation', {}, quota['throttles']),
+        ]
+        for window, used in quota['windows'].items():
+            samples.append(('quota_window_characters', 'gauge', 'Characters used in each budget window',
+                            {'window': window}, used))
+        for reason, count in quota['shed'].items():
+            samples.append(('quota_shed_total', 'counter', 'Messages shed by the quota governor',
+                            {'reason': reason}, count))
+        if self.shard:
+            shard = self.shard.stats()
+            samples += [
+                ('shard_workers', 'gauge', 'Live workers in the shard', {}, shard['workers']),
+                ('shard_leader', 'gauge', 'Whether this worker is the shard leader', {}, int(shard['leader'])),
+                ('shard_channels_owned', 'gauge', 'Chatrooms this worker holds the posting lease for', {}, shard['owned']),
+                ('shard_rebalances_total', 'counter', 'Channel assignments published by this worker as leader', {},
+                 shard['rebalances']),
+                ('shard_handovers_total', 'counter', 'Chatroom leases taken over or given up', {'direction': 'acquired'},
+                 shard['acquired']),
+                ('shard_handovers_total', 'counter', 'Chatroom leases taken over or given up', {'direction': 'released'},
+                 shard['released']),
+            ]
+        delivery = self.scheduler.stats()
+        samples.append(('delivery_slo_ratio', 'gauge', 'Fraction of translations posted within DELIVERY_SLO (stale drops count as misses)',
+                        {}, delivery['slo_ratio']))
+        for result in ('within_slo', 'late', 'stale'):
+            samples.append(('deliveries_total', 'counter', 'Translations posted within the SLO, posted late, or dropped as stale',
+                            {'result': result}, delivery[result]))
+        samples.append(('frames_ignored_total', 'counter', 'Websocket frames dropped by event name without decoding',
+                        {}, self.ignored_frames))
+        for milestone, seconds in self.startup.milestones.items():
+            samples.append(('startup_milestone_seconds', 'gauge', 'Seconds from process start to each startup milestone',
+                            {'milestone': milestone}, round(seconds, 3)))
+        for phase, seconds in self.startup.phases.items():
+            samples.append(('startup_warm_up_seconds', 'gauge', 'Duration of each startup warm-up task',
+                            {'task': phase}, round(seconds, 3)))
+        if self.dedup:
+            dedup = self.dedup.stats()
+            samples += [
+                ('dedup_entries', 'gauge', 'Distinct messages inside the duplicate window', {}, dedup['entries']),
+                ('dedup_suppressed_total', 'counter', 'Duplicate messages not translated', {}, dedup['suppressed']),
+            ]
+        store = self.cache.stats().get('store')
+        if store:
+            samples += [
+                ('store_hits_total', 'counter', 'Translations served from the SQLite store', {}, store['hits']),
+                ('store_writes_total', 'counter', 'Translations written to the SQLite store', {}, store['writes']),
+            ]
+        if self.fast_classifier:
+            for tier, count in self.fast_classifier.stats().items():
+                samples.append(('detection_tier_total', 'counter', 'Messages resolved by each detection tier',
+                                {'tier': tier}, count))
+        for detector in [self.detector] + self.shadow_detectors:
+            samples.append(('detector_calls_total', 'counter', 'Calls to each language detection backend',
+                            {'detector': detector.name}, detector.stats()['calls']))
+        for i, connection in enumerate(self.connections):
+            conn = connection.supervisor.stats()
+            labels = {'connection': str(i)}
+            samples += [
+                ('websocket_connected', 'gauge', 'Whether the Pusher websocket is up', labels, int(conn['connected'])),
+                ('websocket_disconnects_total', 'counter', 'Pusher websocket disconnects', labels, conn['disconnects']),
+                ('websocket_reconnects_total', 'counter', 'Pusher websocket reconnects', labels, conn['reconnects']),
+            ]
+        return samples
+
+    def _report_pipeline_stats(self):
+        while True:
+            time.sleep(PIPELINE_STATS_INTERVAL)
+            for name, stats in self.pipeline_stats().items():
+                log.info("📊 %s: depth %s/%s, processed %s, dropped %s, p50 %sms, p95 %sms",
+                         name, stats['depth'], stats['capacity'], stats['processed'], stats['dropped'],
+                         stats['latency_ms_p50'], stats['latency_ms_p95'])
+            cache = self.cache.stats()
+            log.info("📊 cache: %s/%s entries, hit rate %.0f%%, %s evicted, %s expired",
+                     cache['size'], cache['capacity'], cache['hit_rate'] * 100, cache['evictions'],
+                     cache['expirations'])
+            if self.fast_classifier:
+                tiers = self.fast_classifier.stats()
+                log.info("📊 detection: %s", ", ".join(f"{tier} {count}" for tier, count in tiers.items()))
+            for detector in [self.detector] + self.shadow_detectors:
+                stats = detector.stats()
+                log.info("📊 detector %s: %s calls, avg %sms", detector.name, stats['calls'], stats['avg_ms'])
+            for i, connection in enumerate(self.connections):
+                conn = connection.supervisor.stats()
+                log.info("📊 connection %s: %s, %s disconnects, reconnect p50 %ss, max %ss",
+                         i, 'up' if conn['connected'] else 'down', conn['disconnects'], conn['reconnect_s_p50'],
+                         conn['reconnect_s_max'])
+            if 'store' in cache:
+                store = cache['store']
+                log.info("📊 store: %s hits, %s misses, %s writes, %s compactions",
+                         store['hits'], store['misses'], store['writes'], store['compactions'])
+            quota = self.governor.stats()
+            log.info("📊 quota: %.0f%% of budget, %s chars this month, shed %s, %s throttles",
+                     quota['pressure'] * 100, quota['month_chars'], sum(quota['shed'].values()),
+                     quota['throttles'])
+            delivery = self.scheduler.stats()
+            log.info("📊 delivery: %.1f%% within %gs, %s late, %s dropped as stale",
+                     delivery['slo_ratio'] * 100, DELIVERY_SLO, delivery['late'], delivery['stale'])
+            if self.shard:
+                shard = self.shard.stats()
+                log.info("📊 shard: %s chatroom(s) of %s on %s%s, %s worker(s), %s acquired, %s released",
+                         shard['owned'], len(self.shard.slugs), shard['worker'],
+                         ' (leader)' if shard['leader'] else '', shard['workers'], shard['acquired'],
+                         shard['released'])
+            if self.dedup:
+                dedup = self.dedup.stats()
+                log.info("📊 dedup: %s/%s tracked, %s duplicates suppressed",
+                         dedup['entries'], dedup['capacity'], dedup['suppressed'])
         
-    def fetch_channel_info(self):
-        """Fetch channel information including chatroom ID and broadcaster user ID."""
-        print(f"🔍 Checking channel: {self.channel_slug}")
+    def fetch_channel_info(self, channel: Optional[ChannelConfig] = None, info: Optional[ChannelInfo] = None) -> bool:
+        """Fetch channel information including chatroom ID and broadcaster user ID.
+
+        info is a lookup already made by ChannelResolver.resolve_many, so a failure isn't retried here.
+        """
+        channel = channel or self.channels[0]
+        log.info("🔍 Checking channel: %s", channel.slug)
+        if channel.chatroom_id:
+            log.info("💬 Chatroom ID (configured): %s", channel.chatroom_id)
+            return True
         
         # Try multiple methods to get channel info
         methods = [
-            self._fetch_via_api,
-            self._fetch_via_manual_config
+            lambda: self._fetch_via_api(channel, info),
+            lambda: self._fetch_via_manual_config(channel)
         ]
         
         for method in methods:
             try:
                 if method():
-                    return
+                    return True
             except Exception as e:
-                print(f"⚠️ Method failed: {e}")
-                continue
-        
-        print(f"❌ Could not access channel '{self.channel_slug}' using any method.")
-        print("💡 Possible solutions:")
-        print("   1. Wait a few minutes and try again (Kick may be rate limiting)")
-        print("   2. Try a different channel")
-        print("   3. Use manual configuration (set CHATROOM_ID and BROADCASTER_ID env vars)")
-        sys.exit(1)
-    
-    def _fetch_via_api(self):
-        """Try to fetch channel info via API."""
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
-            "Accept": "application/json",
-            "Referer": "https://kick.com/",
-            "Origin": "https://kick.com"
-        }
-        
-        url = CHANNEL_INFO_URL.format(slug=self.channel_slug)
-        resp = requests.get(url, headers=headers, timeout=10)
+                log.warning("⚠️ Method failed: %s", e)
+                continue
         
-        if resp.status_code == 403:
-            error_data = resp.json() if resp.content else {}
-            if "security policy" in error_data.get("error", "").lower():
-                print("🚫 Kick API blocked by security policy - trying alternative method...")
-                return False
-            else:
-                print(f"🚫 Access forbidden to channel '{self.channel_slug}'")
-                return False
-        elif resp.status_code == 404:
-            print(f"❌ Channel '{self.channel_slug}' not found via API")
+        log.error("❌ Could not access channel '%s' using any method.", channel.slug)
+        log.info("💡 Possible solutions:")
+        log.info("   1. Wait a few minutes and try again (Kick may be rate limiting)")
+        log.info("   2. Try a different channel")
+        log.info("   3. Use manual configuration (set CHATROOM_ID and BROADCASTER_ID env vars,")
+        log.info("      or chatroom_id in CHANNELS_CONFIG)")
+        return False
+    
+    def _fetch_via_api(self, channel: ChannelConfig, info: Optional[ChannelInfo] = None):
+        """Try to fetch channel info via API (through the shared resolver and its cache)."""
+        info = info or self.resolver.resolve(channel.slug)
+        if info.error == 'forbidden':
+            log.warning("🚫 Kick API blocked by security policy - trying alternative method...")
             return False
-        elif resp.status_code == 429:
-            print("⏱️ Rate limited by Kick API")
+        elif info.error == 'not_found':
+            log.error("❌ Channel '%s' not found via API", channel.slug)
             return False
-        
-        resp.raise_for_status()
-        data = resp.json()
-        
-        if "chatroom" not in data or "user" not in data:
-            print(f"⚠️ Unexpected API response structure")
+        elif info.error == 'rate_limited':
+            log.info("⏱️ Rate limited by Kick API")
+            return False
+        elif not info.found:
+            log.warning("⚠️ Channel lookup failed: %s", info.error)
             return False
         
-        self.chatroom_id = data["chatroom"]["id"]
-        print(f"✅ Channel found via API: {data['user']['username']} (ID: {data['user']['id']})")
-        print(f"💬 Chatroom ID: {self.chatroom_id}")
+        channel.chatroom_id = info.chatroom_id
+        if info.cached:
+            log.info("💬 Chatroom ID (cached): %s", channel.chatroom_id)
+        else:
+            log.info("✅ Channel found via API: %s (ID: %s)", info.username, info.broadcaster_id)
+            log.info("💬 Chatroom ID: %s", channel.chatroom_id)
         return True
     
-    def _fetch_via_manual_config(self):
-        """Try to use manual configuration from environment variables."""
+    def _fetch_via_manual_config(self, channel: ChannelConfig):
+        """Try to use manual configuration from environment variables (single-channel mode only)."""
         manual_chatroom_id = os.getenv('CHATROOM_ID')
         manual_broadcaster_id = os.getenv('BROADCASTER_ID')
         
-        if manual_chatroom_id and manual_broadcaster_id:
-            self.chatroom_id = int(manual_chatroom_id)
-            print(f"✅ Using manual configuration:")
-            print(f"💬 Chatroom ID: {self.chatroom_id}")
-            print(f"📺 Broadcaster ID: {manual_broadcaster_id}")
+        if manual_chatroom_id and manual_broadcaster_id and len(self.channels) == 1:
+            channel.chatroom_id = int(manual_chatroom_id)
+            log.info("✅ Using manual configuration:")
+            log.info("💬 Chatroom ID: %s", channel.chatroom_id)
+            log.info("📺 Broadcaster ID: %s", manual_broadcaster_id)
             return True
         
         return False
         
     def detect_language(self, text: str) -> Optional[str]:
         """Detect the language of the given text."""
+        return self.detect_language_scored(text)[0]
+
+    def detect_language_scored(self, text: str) -> Tuple[Optional[str], float]:
+        """Detect the language of the given text, with the detector's confidence (0-1)."""
         try:
             # Remove common chat elements that might confuse detection
             clean_text = text.strip()
             if len(clean_text) < MIN_MESSAGE_LENGTH:
-                return None
+                return None, 0.0
                 
             # Skip if text is mostly emojis or special characters
             alpha_chars = sum(c.isalpha() for c in clean_text)
             if alpha_chars < 1:  # Allow single character words
-                return None
+                return None, 0.0
                 
             # Skip Kick emotes format [emote:id:name]
             if clean_text.startswith('[emote:') and clean_text.endswith(']'):
-                return 'en'  # Treat emotes as English to skip translation
+                return 'en', 1.0  # Treat emotes as English to skip translation
             
             # For all-caps text, convert to lowercase for better language detection
             detection_text = clean_text.lower() if clean_text.isupper() else clean_text
-            lang = detect(detection_text)
-            
-            return lang
+
+            # Same text, same answer - skip detection entirely for repeats
+            memo = self.detection_memo.get(detection_text)
+            if memo:
+                if self.fast_classifier:
+                    self.fast_classifier.record('memo')
+                return memo
+
+            # Obvious cases (non-Latin scripts, plain English) never reach the detection backend
+            lang, tier, confidence = None, None, 1.0
+            if self.fast_classifier:
+                lang, tier = self.fast_classifier.classify(detection_text)
+            if not lang:
+                lang, confidence = self.detector.detect_scored(detection_text)
+                tier = self.detector.name
+                for shadow in self.shadow_detectors:
+                    shadow.detect(detection_text)
+            if self.fast_classifier:
+                self.fast_classifier.record(tier)
+
+            # The memo never expires, so only answers from a fully loaded backend go in
+            if lang and (tier != self.detector.name or self.detector.ready.is_set()):
+                self.detection_memo.put(detection_text, (lang, confidence))
+            return lang, confidence
         except Exception as e:
-            print(f"⚠️ Language detection error: {e}")
-            return None
+            log.warning("⚠️ Language detection error: %s", e)
+            return None, 0.0
             
     def clean_text_for_translation(self, text: str) -> str:
         """Clean text by removing emotes and other non-translatable content."""
-        # Remove Kick emotes [emote:id:name]
-        cleaned = re.sub(r'\[emote:\d+:[^\]]+\]', '', text)
-        
-        # Remove extra whitespace
-        cleaned = ' '.join(cleaned.split())
-        
-        return cleaned.strip()
+        return clean_chat_text(text)
     
     def normalize_text(self, text: str) -> str:
         """Normalize text for comparison: lowercase, remove accents, strip whitespace."""
@@ -208,108 +2765,167 @@ class KickChatTranslator:
         text = ''.join(c for c in text if not unicodedata.combining(c))
         return text
     
-    def translate_text(self, text: str, source_lang: str) -> Optional[str]:
+    def translate_text(self, text: str, source_lang: str, target_lang: str = TARGET_LANGUAGE) -> Optional[str]:
         """Translate text from source language to target language using Azure Translator."""
+        # Clean the text before translation to save on character costs
+        clean_text = self.clean_text_for_translation(text)
+        
+        # Don't translate if nothing left after cleaning
+        if not clean_text:
+            return None
+        
+        key = self.cache_key(clean_text, source_lang, target_lang)
+        result = self.cache.get(key)
+        if result is None:
+            results = self.translate_batch([clean_text], source_lang, (target_lang,))[0]
+            result = results.get(target_lang) if results else None
+            if result:
+                self.cache.put(key, result)
+        return result[0] if result else None
+
+    def cache_key(self, clean_text: str, source_lang: Optional[str], target_lang: str) -> tuple:
+        """Cache key for a translation: normalized text plus language pair."""
+        return (self.normalize_text(clean_text), source_lang, target_lang)
+
+    def request_translation(self, clean_text: str, source_lang: Optional[str], targets: Tuple[str, ...],
+                            callback: Callable[[Optional[Translations]], None],
+                            channel: Optional[ChannelConfig] = None,
+                            chat: Optional[ChatMessage] = None) -> Optional[str]:
+        """Answer each target from the cache when possible, and queue the rest as one batched Azure call.
+
+        Returns the reason when the quota governor sheds the message or a full translate queue rejects it
+        (the callback is then never called). A queued chat evicted later is finished through message_dropped.
+        """
+        found: Translations = {}
+        for target in targets:
+            cached = self.cache.get(self.cache_key(clean_text, source_lang, target))
+            if cached is not None:
+                found[target] = cached
+        missing = tuple(target for target in targets if target not in found)
+        if not missing:
+            log.debug("   💾 Cache hit")
+            callback(found)
+            return None
+
+        # Only Azure calls cost quota - cache hits above are free; every target is billed separately
+        channel = channel or self.channels[0]
+        shed = self.governor.admit(len(clean_text) * len(missing), channel.slug, source_lang)
+        if shed:
+            if not found:
+                return shed
+            callback(found)  # The cached targets still go out
+            return None
+
+        def store_and_forward(results: Optional[Translations]):
+            for target, result in (results or {}).items():
+                self.cache.put(self.cache_key(clean_text, source_lang, target), result)
+            found.update(results or {})
+            callback(found or None)
+
+        if not self.batcher.submit(clean_text, source_lang, missing, store_and_forward, chat):
+            # Rejected by a full translate queue - the cached targets still go out
+            if not found:
+                return 'dropped'
+            callback(found)
+        return None
+
+    def translate_batch(self, texts: List[str], source_lang: Optional[str],
+                        targets: Tuple[str, ...] = (TARGET_LANGUAGE,)) -> List[Optional[Translations]]:
+        """Translate several texts into every target in one Azure request; source_lang=None lets Azure detect it."""
+        if not self.azure_translator_key:
+            log.warning("⚠️ Azure Translator key not provided - cannot translate")
+            return [None] * len(texts)
+        
+        started, status = time.monotonic(), 'error'
         try:
-            # Clean the text before translation to save on character costs
-            clean_text = self.clean_text_for_translation(text)
-            
-            # Don't translate if nothing left after cleaning
-            if not clean_text:
-                return None
-            
-            if not self.azure_translator_key:
-                print("⚠️ Azure Translator key not provided - cannot translate")
-                return None
-            
-            # Azure Translator API endpoint
-            path = '/translate'
-            constructed_url = self.azure_translator_endpoint + path
-            
-            params = {
-                'api-version': '3.0',
-                'from': source_lang,
-                'to': TARGET_LANGUAGE
-            }
-            
-            headers = {
-                'Ocp-Apim-Subscription-Key': self.azure_translator_key,
-                'Ocp-Apim-Subscription-Region': self.azure_translator_region,
-                'Content-type': 'application/json',
-                'X-ClientTraceId': str(uuid.uuid4())
-            }
-            
-            # Request body
-            body = [{
-                'text': clean_text
-            }]
-            
             # Make the translation request using the persistent session
-            response = self.session.post(constructed_url, params=params, headers=headers, json=body, timeout=10)
+            url, params, headers, body = self.azure_translate_request(texts, source_lang, targets)
+            response = self.session.post(url, params=params, headers=headers, json=body, timeout=10)
+            status = response.status_code
+            if status == 429:
+                self.governor.throttle(parse_retry_after(response.headers.get('Retry-After')))
             response.raise_for_status()
             
             # Parse response
             translation_result = response.json()
-            if translation_result and len(translation_result) > 0:
-                translated_text = translation_result[0]['translations'][0]['text']
-                # Decode HTML entities (like &#39; -> ')
-                translated_text = html.unescape(translated_text)
-                return translated_text
-            else:
-                print("⚠️ Empty translation response from Azure")
-                return None
-                
         except Exception as e:
-            print(f"⚠️ Translation error: {e}")
-            return None
-            
-    def should_translate(self, text: str, detected_lang: str, username: str = "") -> bool:
-        """Determine if a message should be translated."""
-        # Don't translate if already in target language
-        if detected_lang == TARGET_LANGUAGE:
-            print(f"   🔍 should_translate: Already in target language ({TARGET_LANGUAGE})")
-            return False
-            
-        # Don't translate very short messages
-        if len(text.strip()) < MIN_MESSAGE_LENGTH:
-            print(f"   🔍 should_translate: Too short ({len(text.strip())} < {MIN_MESSAGE_LENGTH})")
-            return False
-            
-        # Don't translate if message starts with translation prefix (avoid loops)
-        if text.strip().startswith(TRANSLATION_PREFIX):
-            print(f"   🔍 should_translate: Starts with translation prefix")
-            return False
-            
-        # Don't translate messages from known translation bots (including our own bot)
-        bot_names = ['chattranslator', 'aitranslatorbot', 'translator', 'translate_bot', 'kickbot']
-        if username.lower() in bot_names:
-            print(f"   🔍 should_translate: Known translation bot: {username}")
-            return False
-            
-        # Rate limiting
-        if RATE_LIMIT_DELAY > 0:  # Only check rate limiting if delay is set
-            current_time = time.time()
-            time_since_last = current_time - self.last_translation_time
-            if time_since_last < RATE_LIMIT_DELAY:
-                print(f"   🔍 should_translate: Rate limited ({time_since_last:.2f}s < {RATE_LIMIT_DELAY}s)")
-                return False
-            
-        print(f"   ✅ should_translate: All checks passed - will translate")
-        return True
+            log.warning("⚠️ Translation error: %s", e)
+            return [None] * len(texts)
+        finally:
+            self.record_request('azure', started, status, sum(len(text) for text in texts) * len(targets))
+        
+        return parse_azure_translations(translation_result, len(texts), source_lang)
+
+    def record_request(self, api: str, started: float, status, characters: int = 0):
+        """Count one Azure or Kick HTTP call; status is 'error' when no response came back."""
+        self.metrics.observe(f'{api}_request_seconds', time.monotonic() - started)
+        self.metrics.inc(f'{api}_requests_total', {'status': str(status)})
+        if characters and status == 200:
+            self.metrics.inc('azure_characters_total', amount=characters)
+
+    def azure_translate_request(self, texts: List[str], source_lang: Optional[str], targets: Tuple[str, ...]) -> tuple:
+        """Build (url, params, headers, body) for one Azure /translate call."""
+        # Azure Translator API endpoint
+        path = '/translate'
+        constructed_url = self.azure_translator_endpoint + path
+        
+        # One 'to' parameter per target language - Azure answers all of them in the same response
+        params = [('api-version', '3.0')] + [('to', target) for target in targets]
+        if source_lang:
+            params.append(('from', source_lang))
         
+        headers = {
+            'Ocp-Apim-Subscription-Key': self.azure_translator_key,
+            'Content-type': 'application/json',
+            'X-ClientTraceId': str(uuid.uuid4())
+        }
+        if self.azure_translator_region:
+            headers['Ocp-Apim-Subscription-Region'] = self.azure_translator_region
+        
+        # Request body - one element per message, results come back in the same order
+        body = [{'text': text} for text in texts]
+        return constructed_url, params, headers, body
+            
     def send_chat_message(self, message: str):
         """Send a message to the chat using Kick API."""
         if not self.auth_token:
-            print("⚠️ No auth token provided - cannot send messages")
+            log.warning("⚠️ No auth token provided - cannot send messages")
             return False
             
+        try:
+            resp = self.post_chat_message(self.chatroom_id, self.channel_slug, message)
+            if resp.status_code == 200:
+                log.info("✅ Translation sent: %s", message)
+                return True
+            else:
+                log.warning("⚠️ Failed to send message. Status: %s, Response: %s", resp.status_code, resp.text)
+                return False
+        except Exception as e:
+            log.warning("⚠️ Error sending message: %s", e)
+            return False
+
+    def post_chat_message(self, chatroom_id, channel_slug: str, message: str) -> requests.Response:
+        """POST one chat message and return the raw response (errors are left to the caller)."""
+        api_url, headers, payload = self.chat_message_request(chatroom_id, channel_slug, message)
+        
+        # Use persistent session for faster requests with longer timeout
+        started, status = time.monotonic(), 'error'
+        try:
+            response = self.session.post(api_url, headers=headers, json=payload, timeout=10)
+            status = response.status_code
+            return response
+        finally:
+            self.record_request('kick', started, status)
+
+    def chat_message_request(self, chatroom_id, channel_slug: str, message: str) -> tuple:
+        """Build (url, headers, payload) for one Kick chat message."""
         # Use the correct API endpoint format
-        api_url = CHAT_API_URL_TEMPLATE.format(chatroom_id=self.chatroom_id)
+        api_url = CHAT_API_URL_TEMPLATE.format(chatroom_id=chatroom_id)
         
         # Add auth and referer headers to the session for this request
         headers = {
             "Authorization": f"Bearer {self.auth_token}",
-            "Referer": f"https://kick.com/{self.channel_slug}"
+            "Referer": f"https://kick.com/{channel_slug}"
         }
         
         # Use the correct payload format based on your request
@@ -317,190 +2933,962 @@ class KickChatTranslator:
             "content": message,
             "type": "message"
         }
-        
-        try:
-            # Use persistent session for faster requests with longer timeout
-            resp = self.session.post(api_url, headers=headers, json=payload, timeout=10)
-            if resp.status_code == 200:
-                print(f"✅ Translation sent: {message}")
-                self.last_translation_time = time.time()
-                return True
-            else:
-                print(f"⚠️ Failed to send message. Status: {resp.status_code}, Response: {resp.text}")
-                return False
-        except Exception as e:
-            print(f"⚠️ Error sending message: {e}")
-            return False
+        return api_url, headers, payload
             
-    def process_message(self, username: str, message: str):
+    def process_message(self, username: str, message: str, channel: Optional[ChannelConfig] = None,
+                        chat: Optional[ChatMessage] = None):
         """Process an incoming chat message for translation."""
-        # Skip messages from the bot itself
-        if BOT_USERNAME and username.lower() == BOT_USERNAME:
-            return
-            
-        # Skip very short messages
-        if len(message.strip()) < MIN_MESSAGE_LENGTH:
-            return
-            
-        # Clean message for language detection (remove emotes)
-        clean_message = self.clean_text_for_translation(message)
-        if not clean_message:
-            return
-            
-        # Skip common English chat phrases
-        if is_mostly_common_english(clean_message):
-            print(f"   ⏭️ Skipped: Message is only common English phrases")
-            return
-            
-        # Skip messages that start with '!'
-        if clean_message.startswith('!'):
-            print(f"   ⏭️ Skipped: Command message '{clean_message}'")
-            return
+        channel = channel or self.channels[0]
+        chat = chat or ChatMessage(username, message, channel)
+        # Chat that waited past the delivery deadline isn't worth detecting, let alone translating
+        if self.scheduler.expired(chat):
+            log.debug("   ⏭️ Skipped: stale (%.1fs old) '%s'", time.monotonic() - chat.received_at, message)
+            return self.message_finished(chat, 'stale')
+
+        # Clean and tokenize once, then run the compiled rules (bots, too short, common English, commands, ...)
+        view = self.filters.view(username, message)
+        reason = self.filters.check(view, channel)
+        if reason:
+            log.debug("   ⏭️ Skipped: %s '%s'", reason, message)
+            return self.message_finished(chat, reason)
+        clean_message = view.clean
+
+        # Pasted copies of a message are counted but only the first one per window is translated
+        if self.dedup and self.dedup.seen(self.dedup_key(clean_message, channel)) > 1:
+            log.debug("   ⏭️ Skipped: duplicate '%s'", clean_message)
+            return self.message_finished(chat, 'duplicate')
             
         # Detect language
-        detected_lang = self.detect_language(clean_message)
+        detected_lang, confidence = self.detect_language_scored(clean_message)
+        chat.mark('detected')
         if not detected_lang:
-            return
+            return self.message_finished(chat, 'undetected')
+        if detected_lang != AUTO_DETECT:
+            self.metrics.inc('detected_language_total', {'language': detected_lang})
             
-        print(f"👤 {username} [{detected_lang}]: {message}")
+        log.info("👤 %s [%s]: %s", username, detected_lang, message)
         
-        # Debug: Show why messages aren't being translated
-        if detected_lang == TARGET_LANGUAGE:
-            print(f"   ⏭️ Skipped: Already in {TARGET_LANGUAGE}")
-            return
+        # Debug: Show why messages aren't being translated - each target is skipped on its own
+        targets = tuple(target for target in channel.target_languages if target != detected_lang)
+        if not targets:
+            log.debug("   ⏭️ Skipped: Already in %s", detected_lang)
+            return self.message_finished(chat, 'target_language')
             
-        # Only allow top 20 most spoken languages (allow regional variants)
-        if not any(
-            detected_lang == lang or detected_lang.startswith(f"{lang}-")
-            for lang in ALLOWED_LANGUAGES
-        ):
-            print(f"   ⏭️ Skipped: Language {detected_lang} not in allowed list")
-            return
+        # Only allow top 20 most spoken languages (Azure-detected messages are checked after translation)
+        if detected_lang != AUTO_DETECT and not is_allowed_language(detected_lang, channel.allowed_languages):
+            log.debug("   ⏭️ Skipped: Language %s not in allowed list", detected_lang)
+            return self.message_finished(chat, 'language_not_allowed')
+
+        # Names, emote text and mostly-English slang score low - drop them before they cost Azure characters
+        if self.quality.min_score > 0 and detected_lang != AUTO_DETECT:
+            score, features = self.quality.score(clean_message, view.words, detected_lang, confidence)
+            keep = score >= self.quality.min_score
+            self.quality.record('detect', channel.slug, clean_message, detected_lang, 'translate' if keep else 'skip',
+                                score=round(score, 3), **features)
+            if not keep:
+                log.debug("   ⏭️ Skipped: low quality score %.2f (%s)", score, features)
+                return self.message_finished(chat, 'low_quality')
         
-        # Check if translation is needed
-        should_translate_result = self.should_translate(clean_message, detected_lang, username)
-        if not should_translate_result:
-            # More detailed debugging
-            print(f"   ⏭️ Skipped: should_translate() returned False")
-            print(f"   📝 Debug info - Text: '{clean_message}', Lang: {detected_lang}, User: {username}")
-            return
-            
-        # Translate the cleaned message
-        translated = self.translate_text(clean_message, detected_lang)
-        if not translated:
-            return
-            
-        # Skip if translation is essentially the same as the original
-        if is_redundant_translation(clean_message, translated):
-            print(f"   ⏭️ Skipped: Translation is redundant (same as original)")
-            return
+        # Translate the cleaned message - from cache, or via the batcher once its Azure request returns
+        chat.priority = self.scheduler.priority(chat.badges, detected_lang, len(clean_message))
+        shed = self.request_translation(
+            clean_message, None if detected_lang == AUTO_DETECT else detected_lang, targets,
+            lambda results: self.handle_translation(username, clean_message, detected_lang, results, channel, chat),
+            channel, chat
+        )
+        if shed == 'dropped':
+            log.debug("   ⏭️ Skipped: translate queue full")
+            return self.message_finished(chat, shed)
+        if shed:
+            log.debug("   ⏭️ Skipped: %s (Azure quota at %.0f%%)", shed, self.governor.pressure * 100)
+            return self.message_finished(chat, shed)
+
+    def dedup_key(self, clean_message: str, channel: ChannelConfig) -> tuple:
+        return channel.slug, self.normalize_text(clean_message)
+
+    def handle_translation(self, username: str, clean_message: str, detected_lang: str,
+                           results: Optional[Translations], channel: Optional[ChannelConfig] = None,
+                           chat: Optional[ChatMessage] = None):
+        """Post a finished translation back to chat, one line per target language or a combined one."""
+        channel = channel or self.channels[0]
+        chat = chat or ChatMessage(username, clean_message, channel)
+        chat.mark('translated')
+        if not results:
+            return self.message_finished(chat, 'translation_failed')
+        if self.scheduler.expired(chat):
+            log.debug("   ⏭️ Skipped: translated %.1fs after the message", chat.marks['translated'] - chat.received_at)
+            return self.message_finished(chat, 'stale')
+
+        # With auto-detect Azure has the final say on the source language (the same for every target)
+        source_lang = next(iter(results.values()))[1]
+        if detected_lang == AUTO_DETECT and source_lang:
+            self.metrics.inc('detected_language_total', {'language': source_lang})
+        if source_lang:
+            detected_lang = source_lang
+        targets = [target for target in channel.target_languages if target in results and target != detected_lang]
+        if not targets:
+            log.debug("   ⏭️ Skipped: Azure detected %s", detected_lang)
+            return self.message_finished(chat, 'target_language')
+        if not is_allowed_language(detected_lang, channel.allowed_languages):
+            log.debug("   ⏭️ Skipped: Azure detected %s, not in allowed list", detected_lang)
+            return self.message_finished(chat, 'language_not_allowed')
             
-        # Create translation message with new format
-        translation_msg = f"[by {username}] {translated} ({detected_lang} > {TARGET_LANGUAGE})"
-        
-        # Send translation to chat immediately (no artificial delay)
-        def send_async():
-            self.send_chat_message(translation_msg)
+        # Skip targets whose translation is essentially the same as the original
+        translations = {}
+        for target in targets:
+            translated = results[target][0]
+            if is_redundant_translation(clean_message, translated):
+                continue
+            similarity = self.quality.similarity(clean_message, translated)
+            keep = similarity < self.quality.max_similarity
+            self.quality.record('translate', channel.slug, clean_message, detected_lang, 'post' if keep else 'drop',
+                                target=target, translation=translated, similarity=round(similarity, 3))
+            if keep:
+                translations[target] = translated
+        if not translations:
+            log.debug("   ⏭️ Skipped: Translation is redundant (same as original)")
+            return self.message_finished(chat, 'redundant')
             
-        threading.Thread(target=send_async, daemon=True).start()
+        messages = self.format_translations(username, detected_lang, translations, channel)
+        if self.dedup and DEDUP_SHOW_COUNT:
+            # Copies that arrived while this one was being translated
+            copies = self.dedup.count(self.dedup_key(clean_message, channel))
+            if copies > 1:
+                messages = [f"{message} (×{copies})" for message in messages]
         
-    # WebSocket event handlers
-    def on_open(self, ws):
-        print("🔗 Connection opened, waiting for handshake…")
+        # Hand off to the outbound sender (ordered, rate limited, retried)
+        if not self.auth_token:
+            for message in messages:
+                log.info("📝 Translation (read-only): %s", message)
+            return self.message_finished(chat, 'read_only')
+        chat.pending_posts = len(messages)
+        for message in messages:
+            self.sender.enqueue(channel.chatroom_id, channel.slug, message, chat)
 
-    def on_message(self, ws, raw):
-        msg = json.loads(raw)
-        ev = msg.get("event")
+    def format_translations(self, username: str, source_lang: str, translations: Dict[str, str],
+                            channel: ChannelConfig) -> List[str]:
+        """Chat lines for one message: a line per target language, or a single combined line."""
+        if channel.output == 'combined' and len(translations) > 1:
+            joined = TRANSLATION_COMBINED_SEPARATOR.join(f"{target}: {text}" for target, text in translations.items())
+            return [TRANSLATION_COMBINED_FORMAT.format(username=username, translations=joined, source=source_lang,
+                                                       targets='/'.join(translations))]
+        return [channel.formats.get(target, TRANSLATION_FORMAT).format(username=username, translation=text,
+                                                                       source=source_lang, target=target)
+                for target, text in translations.items()]
 
-        # 1) Handshake → subscribe to v2 channel
-        if ev == "pusher:connection_established":
-            data = json.loads(msg["data"])
-            socket_id = data["socket_id"]
-            channel = f"chatrooms.{self.chatroom_id}.v2"
-            sub = {
-                "event": "pusher:subscribe",
-                "data": {
-                    "auth": "",
-                    "channel": channel
-                }
-            }
-            ws.send(json.dumps(sub))
-            print(f"✅ Subscribed to {channel}")
-
-        # 2) Keep-alive - respond to ping immediately
-        elif ev == "pusher:ping":
-            pong_response = {"event": "pusher:pong", "data": {}}
-            ws.send(json.dumps(pong_response))
-            print("💓 Pong sent")
-
-        # 3) Chat message event
-        elif ev == "App\\Events\\ChatMessageEvent":
-            payload = json.loads(msg["data"])
-            user = payload["sender"]["username"]
-            text = payload["content"]
-            
-            # Process message for translation
-            self.process_message(user, text)
+    def message_dropped(self, chat: Optional[ChatMessage]):
+        """Stage callback for a message shed on queue overflow."""
+        if chat is None:
+            return
+        if 'translated' not in chat.marks:
+            return self.message_finished(chat, 'dropped')
+        # Shed by the sender: only the last of a fanned-out message's lines finishes it
+        self.message_sent(chat, False, failure='dropped')
 
-    def on_error(self, ws, err):
-        print("⚠️ WebSocket Error:", err)
+    def message_sent(self, chat: Optional[ChatMessage], sent: bool, failure: str = 'send_failed'):
+        """Sender callback for every message it posted or gave up on."""
+        if chat is None:
+            return
+        # A fanned-out message finishes with its last line, and counts as sent if any line went out
+        with self.fanout_lock:
+            chat.pending_posts -= 1
+            chat.delivered = chat.delivered or sent
+            if chat.pending_posts > 0:
+                return
+        chat.mark('sent')
+        if chat.delivered:
+            self.message_finished(chat, 'sent')
+        else:
+            self.message_finished(chat, 'stale' if self.scheduler.expired(chat) else failure)
 
-    def on_close(self, ws, code, reason):
-        print(f"🔌 Connection closed: {code} {reason}")
-        if code != 1000:  # 1000 = normal closure
-            print("⚠️ Unexpected closure - will attempt to reconnect in 5 seconds...")
-            time.sleep(5)
-            self.start()  # Auto-reconnect
+    def message_finished(self, chat: ChatMessage, outcome: str):
+        """Called exactly once per message with its outcome ('sent' or the reason it stopped)."""
+        self.metrics.inc('messages_total', {'channel': chat.channel.slug, 'outcome': outcome})
+        self.scheduler.record(chat, outcome)
+        if outcome in ('sent', 'read_only') and self.startup.milestone('first_translation'):
+            log.info("🚀 Startup: %s", self.startup.report())
+        previous = chat.received_at
+        for mark, stage in (('detected', 'detect'), ('translated', 'translate'), ('sent', 'send')):
+            if mark in chat.marks:
+                self.metrics.observe('stage_seconds', chat.marks[mark] - previous, {'stage': stage})
+                previous = chat.marks[mark]
+        if outcome == 'sent':
+            self.metrics.observe('stage_seconds', chat.marks['sent'] - chat.received_at, {'stage': 'end_to_end'})
+        
+    # WebSocket event handlers (connection-level frames are handled by PusherConnection)
+    def on_message(self, ws, raw, event: Optional[str] = None):
+        # Hand the frame off immediately so the receive thread only reads frames and pings;
+        # events without a route are dropped after a string scan, without ever being decoded
+        handler = self.routes.get(peek_event(raw) if event is None else event)
+        if handler:
+            self.parse_stage.put((raw, time.monotonic(), handler))
+        else:
+            self.ignored_frames += 1
+
+    def handle_frame(self, item: Tuple[str, float, Callable[[str, float], None]]):
+        """Parse one websocket frame with the handler routed for its event."""
+        raw, received_at, handler = item
+        handler(raw, received_at)
+
+    def handle_chat_frame(self, raw: str, received_at: float):
+        """Decode a chat message event (Pusher double-encodes data) and route it to its channel."""
+        msg = json_loads(raw)
+        channel = self.subscriptions.get(msg.get("channel"))
+        if channel is None:
+            if self.shard:
+                # A late frame from a chatroom this worker has just handed over
+                self.ignored_frames += 1
+                return
+            channel = self.channels[0]
+        payload = json_loads(msg["data"])
+        sender = payload["sender"]
+        badges = tuple(badge.get("type") for badge in (sender.get("identity") or {}).get("badges") or ())
         
+        # Hand off to the filter/detect stage - only the sender's name, badges and the text are kept
+        self.detect_stage.put(ChatMessage(sender["username"], payload["content"], channel, received_at, badges=badges))
+
     def start(self):
         """Start the translator bot."""
-        print(f"🤖 Starting Kick Chat Translator for channel: {self.channel_slug}")
-        
-        # Fetch channel information
-        self.fetch_channel_info()
+        if WARM_START:
+            for name, task in self.warm_up_tasks().items():
+                threading.Thread(target=self.startup.timed, args=(name, task), name=f'warm-up-{name}', daemon=True).start()
+        groups = self._prepare_start()
+        if self.shard:
+            return self.follow_shard()
+        self.connections = [PusherConnection(self, group) for group in groups]
+        for connection in self.connections[1:]:
+            self.open_connection(connection)
+        self.connections[0].run()
+
+    def open_connection(self, connection: PusherConnection):
+        threading.Thread(target=connection.run, name='pusher-connection', daemon=True).start()
+
+    def may_post(self, channel_slug: str) -> bool:
+        """Sharded workers only post to chatrooms they hold the lease for."""
+        return self.shard is None or self.shard.owns(channel_slug)
+
+    def follow_shard(self):
+        """Sharded mode: heartbeat and follow the channel assignment until the process stops."""
+        try:
+            while True:
+                started = time.monotonic()
+                self.apply_shard(self.shard.tick())
+                time.sleep(max(0.0, self.shard.heartbeat - (time.monotonic() - started)))
+        finally:
+            self.apply_shard(set())
+            self.shard.stop()
+
+    def apply_shard(self, owned: Set[str]):
+        """Subscribe to the chatrooms this worker was just given and unsubscribe from the ones it gave up."""
+        current = {channel.slug for channel in self.subscriptions.values()}
+        for channel in self.channels:
+            if channel.slug in current and channel.slug not in owned:
+                # Frames still arriving for it are dropped from here on; queued posts stop at may_post()
+                del self.subscriptions[channel.subscription]
+                for connection in self.connections:
+                    if channel in connection.channels:
+                        connection.unsubscribe(channel)
+                log.info("🧩 Handed over %s", channel.slug)
+            elif channel.slug in owned and channel.slug not in current:
+                self.subscriptions[channel.subscription] = channel
+                per_connection = max(1, CHANNELS_PER_CONNECTION)
+                connection = next((c for c in self.connections if len(c.channels) < per_connection), None)
+                if connection is None:
+                    connection = PusherConnection(self, [])
+                    self.connections.append(connection)
+                    self.open_connection(connection)
+                connection.subscribe(channel)
+                log.info("🧩 Took over %s", channel.slug)
+
+    def warm_up_tasks(self) -> Dict[str, Callable[[], object]]:
+        """Startup work that can overlap channel lookup and the websocket handshake."""
+        # langdetect reads its profiles on the first detect; HEAD requests leave a TLS connection in the pool
+        tasks = {'detector': self.detector.warm_up}
+        if self.azure_translator_key:
+            tasks['azure'] = lambda: self.session.head(self.azure_translator_endpoint, timeout=5)
+        if self.auth_token:
+            tasks['kick'] = lambda: self.session.head(kick_origin(), timeout=5)
+        return tasks
+
+    def _prepare_start(self) -> List[List[ChannelConfig]]:
+        """Resolve chatroom IDs and split channels into groups of CHANNELS_PER_CONNECTION."""
+        slugs = ", ".join(channel.slug for channel in self.channels)
+        log.info("🤖 Starting Kick Chat Translator for channel: %s", slugs)
         
-        # Setup WebSocket connection
-        ws_url = WS_URL_TEMPLATE.format(cluster=CLUSTER, key=APP_KEY)
+        # Fetch channel information - in multi-channel mode unreachable channels are skipped
+        # Every unknown chatroom is looked up in one concurrent, cached batch first
+        lookups = self.resolver.resolve_many(channel.slug for channel in self.channels if not channel.chatroom_id)
+        resolved = [channel for channel in self.channels if self.fetch_channel_info(channel, lookups.get(channel.slug))]
+        if not resolved:
+            sys.exit(1)
+        if len(resolved) < len(self.channels):
+            log.warning("⚠️ Skipping %s channel(s) without a chatroom ID", len(self.channels) - len(resolved))
+        self.channels = resolved
+        self.startup.milestone('channels')
         
-        ws = websocket.WebSocketApp(
-            ws_url,
-            on_open=self.on_open,
-            on_message=self.on_message,
-            on_error=self.on_error,
-            on_close=self.on_close
-        )
         
-        print(f"📡 Connecting to {ws_url}…")
-        print(f"🌐 Translation enabled: Non-English → English")
+        for channel in self.channels:
+            targets = ', '.join(channel.target_languages)
+            log.info("🌐 Translation enabled for %s: Non-%s → %s", channel.slug, channel.target_language, targets)
         
+        log.debug("Frame decoding with %s", JSON_BACKEND)
         if self.auth_token:
-            print("✅ Auth token provided - translations will be posted to chat")
+            log.info("✅ Auth token provided - translations will be posted to chat")
         else:
-            print("⚠️ No auth token - will only display translations (not post them)")
-            
-        ws.run_forever()
+            log.warning("⚠️ No auth token - will only display translations (not post them)")
+        
+        if self.shard:
+            # Chatrooms are subscribed as the shard assigns them (see apply_shard)
+            self.shard.slugs = [channel.slug for channel in self.channels]
+            log.info("🧩 Sharded mode: worker %s, backend %s", self.shard.worker_id, SHARD_BACKEND)
+            return []
+
+        # One websocket per CHANNELS_PER_CONNECTION chatrooms
+        self.subscriptions = {channel.subscription: channel for channel in self.channels}
+        per_connection = max(1, CHANNELS_PER_CONNECTION)
+        return [self.channels[i:i + per_connection] for i in range(0, len(self.channels), per_connection)]
+
+class AsyncStage:
+    """asyncio counterpart of PipelineStage: a bounded queue drained by worker tasks on the event loop."""
+
+    def __init__(self, name: str, handler: Callable, workers: int = 1, queue_size: int = 1000,
+                 overflow: str = 'drop_oldest', on_drop: Optional[Callable] = None):
+        self.name = name
+        self.handler = handler
+        self.on_drop = on_drop
+        # The event loop must never block, so 'block' degrades to dropping the newest item
+        self.overflow = 'drop_newest' if overflow == 'block' else overflow
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.stats = StageStats()
+        self.tasks = [asyncio.ensure_future(self._worker()) for _ in range(workers)]
+
+    def put(self, item) -> bool:
+        """Enqueue an item, applying the overflow policy when the queue is full."""
+        entry = (time.monotonic(), item)
+        try:
+            self.queue.put_nowait(entry)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        if self.overflow == 'drop_oldest':
+            self._dropped(self.queue.get_nowait()[1])
+            self.queue.put_nowait(entry)
+            return True
+
+        self._dropped(item)
+        return False
+
+    def _dropped(self, item):
+        self.stats.drop()
+        if self.on_drop:
+            self.on_drop(item)
+
+    async def _worker(self):
+        while True:
+            queued_at, item = await self.queue.get()
+            try:
+                result = self.handler(item)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                log.warning("⚠️ %s stage error: %s", self.name, e)
+            self.stats.record(time.monotonic() - queued_at)
+            # Yield between items so a burst of cheap work can't starve the websocket reader
+            await asyncio.sleep(0)
+
+    def snapshot(self) -> dict:
+        """Current queue depth plus throughput, drop and latency counters."""
+        return self.stats.snapshot(self.queue.qsize(), self.queue.maxsize)
+
+
+class AsyncTranslationBatcher:
+    """asyncio counterpart of TranslationBatcher; flushes are timer callbacks instead of a thread."""
+
+    def __init__(self, translate_batch: Callable, window: float, max_items: int, max_chars: int,
+                 auto_detect: bool = False, workers: int = 4, queue_size: int = 1000, overflow: str = 'drop_oldest',
+                 governor: Optional[QuotaGovernor] = None, on_drop: Optional[Callable] = None):
+        self.translate_batch = translate_batch
+        self.window = window
+        self.governor = governor
+        self.on_drop = on_drop
+        self.max_items = max(1, max_items)
+        self.max_chars = max(1, max_chars)
+        self.auto_detect = auto_detect
+        self.queue_size = queue_size
+        self.overflow = 'drop_newest' if overflow == 'block' else overflow
+        self.stats = StageStats()
+
+        self.pending: Dict[Tuple[Optional[str], Tuple[str, ...]], List[Tuple[str, Callable, float, object]]] = {}
+        self.timers: Dict[Tuple[Optional[str], Tuple[str, ...]], asyncio.TimerHandle] = {}
+        self.pending_count = 0
+        self.slots = asyncio.Semaphore(workers)
+        self.tasks = set()
+
+    def submit(self, text: str, source_lang: Optional[str], targets: Tuple[str, ...],
+               callback: Callable[[Optional[Translations]], None], context=None) -> bool:
+        """Queue text for translation; callback receives the result (or None) once its batch returns."""
+        if self.pending_count >= self.queue_size:
+            if self.overflow != 'drop_oldest' or not self.pending:
+                self.stats.drop()
+                return False
+            oldest = next(iter(self.pending))
+            evicted = self.pending[oldest].pop(0)
+            self.pending_count -= 1
+            if not self.pending[oldest]:
+                self._forget(oldest)
+            self.stats.drop()
+            if self.on_drop and evicted[3] is not None:
+                self.on_drop(evicted[3])
+            else:
+                self._deliver(evicted, None)
+
+        key = (None if self.auto_detect else source_lang, targets)
+        items = self.pending.setdefault(key, [])
+        items.append((text, callback, time.monotonic(), context))
+        self.pending_count += 1
+
+        if len(items) >= self.max_items or sum(len(item[0]) for item in items) >= self.max_chars:
+            self._flush(key)
+        elif key not in self.timers:
+            window = self.window * (self.governor.window_factor() if self.governor else 1.0)
+            self.timers[key] = asyncio.get_running_loop().call_later(window, self._flush, key)
+        return True
+
+    def _forget(self, key: Tuple[Optional[str], Tuple[str, ...]]):
+        self.pending.pop(key, None)
+        timer = self.timers.pop(key, None)
+        if timer:
+            timer.cancel()
+
+    def _flush(self, key: Tuple[Optional[str], Tuple[str, ...]]):
+        """Split a group into request-sized batches and dispatch each as its own task."""
+        items = self.pending.get(key, [])
+        self._forget(key)
+        self.pending_count -= len(items)
+
+        batch, chars = [], 0
+        for item in items:
+            if batch and (len(batch) >= self.max_items or chars + len(item[0]) > self.max_chars):
+                self._spawn(key, batch)
+                batch, chars = [], 0
+            batch.append(item)
+            chars += len(item[0])
+        if batch:
+            self._spawn(key, batch)
+
+    def _spawn(self, key: Tuple[Optional[str], Tuple[str, ...]], batch: list):
+        task = asyncio.ensure_future(self._dispatch(key, batch))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _dispatch(self, key: Tuple[Optional[str], Tuple[str, ...]], batch: List[Tuple[str, Callable, float, object]]):
+        """Send one batch to Azure and hand each result back to its originating message."""
+        async with self.slots:
+            hold = self.governor.hold_for() if self.governor else 0.0
+            if hold > 0:
+                await asyncio.sleep(hold)
+            try:
+                results = await self.translate_batch([item[0] for item in batch], *key)
+            except Exception as e:
+                log.warning("⚠️ Batch translation error: %s", e)
+                results = []
+
+        for i, item in enumerate(batch):
+            self._deliver(item, results[i] if i < len(results) else None)
+
+    def _deliver(self, item: Tuple[str, Callable, float, object], result: Optional[Translations]):
+        _, callback, queued_at, _ = item
+        try:
+            callback(result)
+        except Exception as e:
+            log.warning("⚠️ Translation callback error: %s", e)
+        self.stats.record(time.monotonic() - queued_at)
+
+    def snapshot(self) -> dict:
+        """Current pending depth plus throughput, drop and latency counters."""
+        return self.stats.snapshot(self.pending_count, self.queue_size)
+
+
+class AsyncChatSender:
+    """asyncio counterpart of ChatSender: one task posting in order behind a token bucket."""
+
+    def __init__(self, post: Callable, rate: float, burst: int, max_retries: int, merge_backlog: int,
+                 max_message_length: int, queue_size: int = 1000, overflow: str = 'drop_oldest',
+                 on_result: Optional[Callable] = None, may_post: Optional[Callable[[str], bool]] = None,
+                 schedule: Optional[Callable[[deque], List[Tuple]]] = None, on_drop: Optional[Callable] = None):
+        self.post = post
+        self.on_result = on_result
+        self.may_post = may_post
+        self.schedule = schedule
+        self.on_drop = on_drop
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_retries = max_retries
+        self.merge_backlog = merge_backlog
+        self.max_message_length = max_message_length
+        self.queue_size = queue_size
+        self.overflow = 'drop_newest' if overflow == 'block' else overflow
+        self.stats = StageStats()
+
+        self.pending = deque()  # (chatroom_id, channel_slug, message, queued_at, context)
+        self.ready = asyncio.Event()
+        self.tokens = float(self.burst)
+        self.last_refill = time.monotonic()
+        self.task = asyncio.ensure_future(self._run())
+
+    def enqueue(self, chatroom_id, channel_slug: str, message: str, context=None) -> bool:
+        """Queue a message for posting; messages go out in the order they were queued."""
+        if len(self.pending) >= self.queue_size:
+            if self.overflow != 'drop_oldest':
+                self._dropped((chatroom_id, channel_slug, message, 0, context))
+                return False
+            self._dropped(self.pending.popleft())
+        self.pending.append((chatroom_id, channel_slug, message, time.monotonic(), context))
+        self.ready.set()
+        return True
+
+    def _report(self, items: List[Tuple], sent: bool):
+        if self.on_result:
+            for item in items:
+                self.on_result(item[4], sent)
+
+    def _dropped(self, item: Tuple):
+        self.stats.drop()
+        if self.on_drop:
+            self.on_drop(item[4])
+        else:
+            self._report([item], False)
+
+    async def _wait_for_token(self):
+        if self.rate <= 0:
+            return
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    async def _run(self):
+        while True:
+            while not self.pending:
+                self.ready.clear()
+                await self.ready.wait()
+            expired = self.schedule(self.pending) if self.schedule else []
+            if expired:
+                self.stats.drop(len(expired))
+                self._report(expired, False)
+            if not self.pending:
+                continue
+            items = take_mergeable(self.pending, self.merge_backlog, self.max_message_length)
+            chatroom_id, channel_slug = items[0][0], items[0][1]
+            message = MERGE_SEPARATOR.join(item[2] for item in items)
+            if len(items) > 1:
+                log.info("📦 Merged %d queued translations into one message", len(items))
+
+            if not await self._send_with_retry(chatroom_id, channel_slug, message):
+                self.stats.drop(len(items))
+                self._report(items, False)
+                continue
+            now = time.monotonic()
+            for item in items:
+                self.stats.record(now - item[3])
+            self._report(items, True)
+
+    async def _send_with_retry(self, chatroom_id, channel_slug: str, message: str) -> bool:
+        """Post one message, backing off on 429/5xx and connection errors."""
+        for attempt in range(self.max_retries + 1):
+            await self._wait_for_token()
+            if self.may_post and not self.may_post(channel_slug):
+                log.info("🧩 Not posting to %s - another worker owns it now: %s", channel_slug, message)
+                return False
+            retry_after = None
+            try:
+                status, retry_after_header, text = await self.post(chatroom_id, channel_slug, message)
+            except Exception as e:
+                log.warning("⚠️ Error sending message: %s", e)
+            else:
+                if status == 200:
+                    log.info("✅ Translation sent: %s", message)
+                    return True
+                if status != 429 and status < 500:
+                    log.warning("⚠️ Failed to send message. Status: %s, Response: %s", status, text)
+                    return False
+                retry_after = parse_retry_after(retry_after_header)
+                log.info("⏱️ Kick returned %s while sending", status)
 
-def is_mostly_common_english(msg: str) -> bool:
-    words = re.findall(r"\b\w+\b", msg.lower())
-    if not words:
+            if attempt < self.max_retries:
+                delay = retry_after if retry_after is not None else min(SEND_MAX_BACKOFF, SEND_BASE_BACKOFF * 2 ** attempt)
+                log.info("   🔁 Retrying send in %.1fs (attempt %d/%d)", delay, attempt + 2, self.max_retries + 1)
+                await asyncio.sleep(delay)
+
+        log.warning("⚠️ Giving up on message after %d attempts: %s", self.max_retries + 1, message)
         return False
-    common_count = sum(word in COMMON_ENGLISH_PHRASES for word in words)
-    return common_count >= len(words) - 0
+
+    def snapshot(self) -> dict:
+        """Current backlog plus throughput, drop and latency counters."""
+        return self.stats.snapshot(len(self.pending), self.queue_size)
+
+
+class AsyncKickChatTranslator(KickChatTranslator):
+    """asyncio engine: websocket, Azure and Kick traffic share one event loop and one pooled HTTP client."""
+
+    def _build_pipeline(self):
+        # asyncio stages need a running event loop, so they are built in run(); the stats reporter
+        # and /metrics may look before that
+        self.http = None
+        self.parse_stage = self.detect_stage = self.batcher = self.sender = None
+
+    async def detect_chat(self, chat: ChatMessage):
+        """Detect stage handler; until the detectors have loaded, it waits for them on a thread, not the loop."""
+        detectors = [self.detector] + self.shadow_detectors
+        if not all(detector.ready.is_set() for detector in detectors):
+            # initialize() blocks on the warm-up's init_lock (or loads the profiles itself without WARM_START),
+            # which on the loop would stall websocket reads and pings
+            await asyncio.to_thread(lambda: [detector.initialize() for detector in detectors])
+        self.process_message(chat.username, chat.content, chat.channel, chat)
+
+    def _build_async_pipeline(self):
+        # One keep-alive connection pool shared by Azure, Kick and the Pusher websocket(s)
+        connector = aiohttp.TCPConnector(limit=ASYNC_HTTP_POOL_SIZE, keepalive_timeout=60, ttl_dns_cache=300)
+        self.http = aiohttp.ClientSession(
+            connector=connector,
+            headers=SESSION_HEADERS,
+            timeout=aiohttp.ClientTimeout(total=10)
+        )
+        self.parse_stage = AsyncStage('parse', self.handle_frame, **stage_config('parse', workers=1))
+        self.detect_stage = AsyncStage(
+            'detect', self.detect_chat,
+            on_drop=self.message_dropped,
+            **stage_config('detect', workers=1)
+        )
+        self.batcher = AsyncTranslationBatcher(
+            self.translate_batch_async,
+            window=TRANSLATION_BATCH_WINDOW_MS / 1000.0,
+            max_items=TRANSLATION_BATCH_MAX_ITEMS,
+            max_chars=TRANSLATION_BATCH_MAX_CHARS,
+            auto_detect=TRANSLATION_AUTO_DETECT,
+            governor=self.governor,
+            on_drop=self.message_dropped,
+            **stage_config('translate', workers=4)
+        )
+        self.sender = AsyncChatSender(
+            self.post_chat_message_async,
+            rate=SEND_RATE_PER_SEC,
+            burst=SEND_BURST,
+            max_retries=SEND_MAX_RETRIES,
+            merge_backlog=SEND_MERGE_BACKLOG,
+            max_message_length=SEND_MAX_MESSAGE_LENGTH,
+            on_result=self.message_sent,
+            may_post=self.may_post,
+            schedule=self.scheduler.reorder,
+            on_drop=self.message_dropped,
+            **stage_config('send')
+        )
+
+    async def translate_batch_async(self, texts: List[str], source_lang: Optional[str],
+                                    targets: Tuple[str, ...]) -> List[Optional[Translations]]:
+        """Non-blocking translate_batch over the shared aiohttp pool."""
+        if not self.azure_translator_key:
+            log.warning("⚠️ Azure Translator key not provided - cannot translate")
+            return [None] * len(texts)
+
+        url, params, headers, body = self.azure_translate_request(texts, source_lang, targets)
+        started, status = time.monotonic(), 'error'
+        try:
+            async with self.http.post(url, params=params, headers=headers, json=body) as response:
+                status = response.status
+                if status == 429:
+                    self.governor.throttle(parse_retry_after(response.headers.get('Retry-After')))
+                response.raise_for_status()
+                translation_result = await response.json(content_type=None)
+        except Exception as e:
+            log.warning("⚠️ Translation error: %s", e)
+            return [None] * len(texts)
+        finally:
+            self.record_request('azure', started, status, sum(len(text) for text in texts) * len(targets))
+        return parse_azure_translations(translation_result, len(texts), source_lang)
+
+    async def _head(self, url: str):
+        async with self.http.head(url, timeout=aiohttp.ClientTimeout(total=5)):
+            pass
+
+    async def post_chat_message_async(self, chatroom_id, channel_slug: str, message: str) -> Tuple[int, Optional[str], str]:
+        """POST one chat message; returns (status, Retry-After header, body)."""
+        api_url, headers, payload = self.chat_message_request(chatroom_id, channel_slug, message)
+        started, status = time.monotonic(), 'error'
+        try:
+            async with self.http.post(api_url, headers=headers, json=payload) as resp:
+                status = resp.status
+                return resp.status, resp.headers.get('Retry-After'), await resp.text()
+        finally:
+            self.record_request('kick', started, status)
+
+    def start(self):
+        """Start the translator bot on a single asyncio event loop."""
+        if aiohttp is None:
+            log.error("❌ ENGINE=async needs aiohttp - install it with: pip install aiohttp")
+            sys.exit(1)
+        groups = self._prepare_start()
+        asyncio.run(self.run(groups))
+
+    def open_connection(self, connection: PusherConnection):
+        asyncio.ensure_future(self._run_connection(connection))
+
+    async def run(self, groups: List[List[ChannelConfig]]):
+        """Run one websocket task per channel group until they all close normally."""
+        self._build_async_pipeline()
+        if WARM_START:
+            # HTTP warm-ups go through the shared pool on the loop; detector profiles load on a thread meanwhile
+            warm_ups = [asyncio.ensure_future(self.startup.timed_async('detector', asyncio.to_thread(self.detector.warm_up)))]
+            if self.azure_translator_key:
+                warm_ups.append(asyncio.ensure_future(self.startup.timed_async('azure', self._head(self.azure_translator_endpoint))))
+            if self.auth_token:
+                warm_ups.append(asyncio.ensure_future(self.startup.timed_async('kick', self._head(kick_origin()))))
+        self.connections = [PusherConnection(self, group) for group in groups]
+        try:
+            if self.shard:
+                await self.follow_shard_async()
+            else:
+                await asyncio.gather(*(self._run_connection(connection) for connection in self.connections))
+        finally:
+            await self.http.close()
+
+    async def follow_shard_async(self):
+        """follow_shard on the event loop; backend calls block, so they run on a thread."""
+        try:
+            while True:
+                started = time.monotonic()
+                self.apply_shard(await asyncio.to_thread(self.shard.tick))
+                await asyncio.sleep(max(0.0, self.shard.heartbeat - (time.monotonic() - started)))
+        finally:
+            self.apply_shard(set())
+            await asyncio.to_thread(self.shard.stop)
+
+    async def _run_connection(self, connection: PusherConnection):
+        channels = connection.channels
+        supervisor = connection.supervisor
+        while True:
+            log.info("📡 Connecting to %s for %s channel(s)…", connection.ws_url, len(channels))
+            close_code = None
+            try:
+                heartbeat = PUSHER_PING_INTERVAL if PUSHER_PING_INTERVAL > 0 else None
+                async with self.http.ws_connect(connection.ws_url, heartbeat=heartbeat,
+                                                timeout=aiohttp.ClientWSTimeout(ws_close=10)) as ws:
+                    log.info("🔗 Connection opened, waiting for handshake…")
+                    async for frame in ws:
+                        if frame.type != aiohttp.WSMsgType.TEXT:
+                            continue
+                        raw = frame.data
+                        supervisor.frame_received()
+                        # Control frames are answered inline, everything else goes to the parse stage
+                        event = peek_event(raw)
+                        if event == PING_EVENT:
+                            await ws.send_str(PONG_FRAME)
+                        elif event.startswith("pusher"):
+                            msg = json_loads(raw)
+                            supervisor.observe(msg, len(channels))
+                            if supervisor.connected_at is not None:
+                                self.startup.milestone('subscribed')
+                            send = lambda frame, ws=ws: asyncio.ensure_future(ws.send_str(frame))
+                            for reply in connection.control_replies(msg, send):
+                                await ws.send_str(reply)
+                        else:
+                            self.on_message(ws, raw, event)
+                    close_code = ws.close_code
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                log.warning("⚠️ WebSocket Error: %s", e)
+            connection.send = None
+
+            log.info("🔌 Connection closed: %s", close_code)
+            delay = supervisor.disconnected(close_code)
+            if delay is None:
+                return
+            log.warning("⚠️ Unexpected closure - reconnecting in %.1fs (attempt %s)...", delay, supervisor.attempt)
+            await asyncio.sleep(delay)
+
+
+def is_allowed_language(detected_lang: str, allowed_languages=ALLOWED_LANGUAGES) -> bool:
+    """Check a detected language against the allowed languages, allowing regional variants."""
+    # Set lookups on the code and each of its '-' prefixes (zh-Hant-TW → zh-Hant → zh)
+    while detected_lang not in allowed_languages:
+        dash = detected_lang.rfind('-')
+        if dash <= 0:
+            return False
+        detected_lang = detected_lang[:dash]
+    return True
+
+def clean_chat_text(text: str) -> str:
+    """Remove Kick emotes and collapse whitespace."""
+    if '[emote:' in text:
+        text = EMOTE_PATTERN.sub('', text)
+    return ' '.join(text.split())
+
+def load_slang() -> List[str]:
+    """Collect user-supplied English slang from ENGLISH_SLANG and ENGLISH_SLANG_FILE."""
+    slang = list(ENGLISH_SLANG)
+    if ENGLISH_SLANG_FILE:
+        try:
+            with open(ENGLISH_SLANG_FILE, encoding='utf-8') as f:
+                slang.extend(line.strip().lower() for line in f if line.strip() and not line.startswith('#'))
+        except OSError as e:
+            log.warning("⚠️ Could not read slang file %s: %s", ENGLISH_SLANG_FILE, e)
+    return slang
+
+def pusher_control_replies(msg: dict, channels: List[ChannelConfig]) -> List[str]:
+    """Frames to send back for a Pusher control frame (subscriptions on handshake, pong on ping)."""
+    ev = msg.get("event")
+    replies = []
+
+    # 1) Handshake → (re)subscribe to the v2 channel of every chatroom on this connection
+    if ev == "pusher:connection_established":
+        for channel in channels:
+            replies.append(channel.subscribe_frame)
+            log.info("✅ Subscribed to %s (%s)", channel.subscription, channel.slug)
+
+    # 2) Keep-alive - respond to ping immediately (the connections answer pings before decoding)
+    elif ev == PING_EVENT:
+        replies.append(PONG_FRAME)
+        log.debug("💓 Pong sent")
+
+    return replies
+
+def peek_event(raw: str) -> str:
+    """Event name of a Pusher frame, still JSON-escaped, read with a string scan instead of decoding."""
+    if raw.startswith('{"event":"'):
+        # Pusher puts the event first - one find() for the usual compact frame
+        return raw[10:raw.find('"', 10)]
+    if raw.startswith('{"event": "'):
+        return raw[11:raw.find('"', 11)]
+    # Quotes inside the double-encoded data are escaped, so the first bare "event" key is the frame's own
+    start = raw.find('"event"')
+    if start < 0:
+        return ''
+    start = raw.find('"', start + 7) + 1
+    end = raw.find('"', start)
+    return raw[start:end] if start > 0 and end > 0 else ''
+
+def take_mergeable(pending: deque, merge_backlog: int, max_length: int) -> list:
+    """Pop the next queued message, plus following ones for the same chatroom once merge_backlog are waiting."""
+    items = [pending.popleft()]
+    if merge_backlog > 0 and len(pending) + 1 >= merge_backlog:
+        length = len(items[0][2])
+        while pending and pending[0][0] == items[0][0]:
+            next_length = length + len(MERGE_SEPARATOR) + len(pending[0][2])
+            if next_length > max_length:
+                break
+            items.append(pending.popleft())
+            length = next_length
+    return items
+
+def parse_azure_translations(translation_result, count: int,
+                             source_lang: Optional[str]) -> List[Optional[Translations]]:
+    """Turn an Azure /translate response into {target: (translation, detected language)} per input text."""
+    if not translation_result:
+        log.warning("⚠️ Empty translation response from Azure")
+        return [None] * count
+    
+    results = []
+    for i in range(count):
+        try:
+            item = translation_result[i]
+            detected_lang = item.get('detectedLanguage', {}).get('language', source_lang)
+            # Decode HTML entities (like &#39; -> ')
+            results.append({translation['to']: (html.unescape(translation['text']), detected_lang)
+                            for translation in item['translations']})
+        except (IndexError, KeyError, TypeError):
+            results.append(None)
+    return results
+
+def kick_origin() -> str:
+    """Scheme and host the chat messages are posted to."""
+    url = urlparse(CHAT_API_URL_TEMPLATE)
+    return f"{url.scheme}://{url.netloc}/"
+
+def normalize_for_comparison(s: str) -> str:
+    s = s.strip().lower()
+    s = unicodedata.normalize('NFKD', s)
+    s = ''.join(c for c in s if not unicodedata.combining(c))
+    return s
+
+def ring_hash(key: str) -> int:
+    """Stable 64-bit hash (Python's hash() differs between processes)."""
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big')
+
+def connect_sqlite(path: str) -> sqlite3.Connection:
+    """Autocommit connection in WAL mode, so readers in other processes proceed during writes."""
+    conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    return conn
 
 def is_redundant_translation(original: str, translated: str) -> bool:
-    def normalize(s):
-        s = s.strip().lower()
-        s = unicodedata.normalize('NFKD', s)
-        s = ''.join(c for c in s if not unicodedata.combining(c))
-        return s
-    return normalize(original) == normalize(translated)
+    return normalize_for_comparison(original) == normalize_for_comparison(translated)
+
+def format_labels(labels: tuple) -> str:
+    """Render ((name, value), ...) as a Prometheus label set."""
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + '}'
+
+def format_metric_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+def start_metrics_server(metrics: Metrics, host: str = METRICS_HOST, port: int = METRICS_PORT) -> ThreadingHTTPServer:
+    """Serve /metrics from a daemon thread."""
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    server.metrics = metrics
+    threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+    log.info("📈 Metrics on http://%s:%s/metrics", host, server.server_address[1])
+    return server
+
+def setup_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT, rate_limit: float = LOG_RATE_LIMIT):
+    """Send the bot's log lines to stdout at the configured level, format and rate."""
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonLogFormatter() if fmt == 'json' else TextLogFormatter('%(message)s'))
+    if rate_limit > 0:
+        handler.addFilter(RateLimitFilter(rate_limit))
+    log.handlers[:] = [handler]
+    log.setLevel(getattr(logging, level, logging.INFO))
+    log.propagate = False
+
+def load_channel_configs(slugs: List[str]) -> List[ChannelConfig]:
+    """Merge channel slugs with per-channel overrides from CHANNELS_CONFIG."""
+    configs: Dict[str, ChannelConfig] = {}
+    if CHANNELS_CONFIG:
+        try:
+            with open(CHANNELS_CONFIG, encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            log.error("❌ Could not read %s: %s", CHANNELS_CONFIG, e)
+            sys.exit(1)
+        # Either a list of {"slug": ..., ...} objects or a {slug: {...}} mapping
+        if isinstance(entries, dict):
+            entries = [dict(overrides, slug=slug) for slug, overrides in entries.items()]
+        for entry in entries:
+            config = ChannelConfig.from_dict(entry)
+            configs[config.slug] = config
+    for slug in slugs:
+        configs.setdefault(slug, ChannelConfig(slug))
+    return list(configs.values())
 
 def main():
+    setup_logging()
     channel = os.getenv("KICK_CHANNEL")
     if not channel and len(sys.argv) >= 2:
         channel = sys.argv[1]
-    if not channel:
-        print("Usage: python kick-chat-translator.py <channel> [auth_token]")
+
+    # Several channels (comma-separated, KICK_CHANNELS or CHANNELS_CONFIG) run in multi-channel mode
+    slugs = [slug.strip() for slug in (channel or '').split(',') if slug.strip()] + KICK_CHANNELS
+    channels = load_channel_configs(list(dict.fromkeys(slugs)))
+    if not channels:
+        print("Usage: python kick-chat-translator.py <channel>[,<channel>...] [auth_token]")
         sys.exit(1)
 
     auth_token = None
@@ -510,15 +3898,20 @@ def main():
         auth_token = KICK_AUTH_TOKEN
 
     if auth_token:
-        print("🗝️  Auth token provided – translations will be posted to chat.")
+        log.info("🗝️  Auth token provided – translations will be posted to chat.")
     else:
-        print("👀 No auth token – read-only mode.")
+        log.info("👀 No auth token – read-only mode.")
 
     if not AZURE_TRANSLATOR_KEY:
-        print("⚠️ Azure Translator key not found. Please set AZURE_TRANSLATOR_KEY in your .env file.")
+        log.warning("⚠️ Azure Translator key not found. Please set AZURE_TRANSLATOR_KEY in your .env file.")
         sys.exit(1)
 
-    translator = KickChatTranslator(channel, auth_token)
+    if SHARD_BACKEND:
+        # Exit through the normal unwinding so a stopped worker hands its chatrooms over right away
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    engine = AsyncKickChatTranslator if ENGINE == 'async' else KickChatTranslator
+    translator = engine(channels[0].slug, auth_token, channels)
     translator.start()
 
 if __name__ == "__main__":
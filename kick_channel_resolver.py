@@ -0,0 +1,210 @@
+"""Kick channel metadata (chatroom and broadcaster IDs) shared by the bot and get_kick_channel_info.py.
+
+Lookups run concurrently over one pooled session, results are kept in a JSON file with a TTL
+(404s and 403s are remembered too), and a 429, 5xx or failed request pauses every worker, not just the one
+that got it.
+A 403 is Kick's security policy refusing this client, so it is final rather than retried.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+CHANNEL_INFO_URL = "https://kick.com/api/v2/channels/{slug}"
+
+KICK_API_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
+    "Accept": "application/json",
+    "Referer": "https://kick.com/",
+    "Origin": "https://kick.com"
+}
+
+log = logging.getLogger('kick-chat-translator.resolver')
+
+
+@dataclass
+class ChannelInfo:
+    """What Kick knows about one channel; error is set instead of the IDs when the lookup failed."""
+    slug: str
+    chatroom_id: Optional[int] = None
+    broadcaster_id: Optional[int] = None
+    username: Optional[str] = None
+    error: Optional[str] = None  # not_found, forbidden, rate_limited or a request error
+    fetched_at: float = 0.0
+    cached: bool = False
+
+    @property
+    def found(self) -> bool:
+        return self.chatroom_id is not None
+
+
+class KickBackOff:
+    """Pause shared by every lookup worker: one 429 slows the whole batch down instead of each retrying alone."""
+
+    def __init__(self, base_delay: float = 2.0, max_delay: float = 60.0):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lock = threading.Lock()
+        self.blocked_until = 0.0
+        self.strikes = 0
+
+    def wait(self):
+        delay = self.blocked_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def blocked(self, retry_after: Optional[float] = None) -> float:
+        """Kick pushed back: double the shared delay (or use Retry-After) and return it."""
+        with self.lock:
+            self.strikes += 1
+            delay = retry_after if retry_after else min(self.max_delay, self.base_delay * 2 ** (self.strikes - 1))
+            self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+            return delay
+
+    def succeeded(self):
+        with self.lock:
+            self.strikes = 0
+
+
+class ChannelResolver:
+    """Bulk, cached channel lookups against the Kick API."""
+
+    def __init__(self, cache_file: str = '', ttl: float = 7 * 86400, negative_ttl: float = 600,
+                 forbidden_ttl: float = 60, workers: int = 4, retries: int = 3,
+                 session: Optional[requests.Session] = None):
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.forbidden_ttl = forbidden_ttl
+        self.workers = max(1, workers)
+        self.retries = max(1, retries)
+        self.backoff = KickBackOff()
+        self.lock = threading.Lock()
+        self.entries: Dict[str, ChannelInfo] = self._load()
+
+        self.session = session or requests.Session()
+        self.session.headers.update(KICK_API_HEADERS)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _load(self) -> Dict[str, ChannelInfo]:
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, encoding='utf-8') as f:
+                data = json.load(f)
+            return {slug: ChannelInfo(**{**entry, 'slug': slug, 'cached': True}) for slug, entry in data.items()}
+        except (OSError, ValueError, TypeError) as e:
+            log.warning("⚠️ Could not read channel cache %s: %s", self.cache_file, e)
+            return {}
+
+    def _save(self):
+        """Write the cache (caller holds the lock); only found channels, 404s and 403s are worth keeping.
+
+        Other processes share the file, so it is re-read first and the newer entry of each channel wins.
+        """
+        if not self.cache_file:
+            return
+        for slug, info in self._load().items():
+            current = self.entries.get(slug)
+            if current is None or info.fetched_at > current.fetched_at:
+                self.entries[slug] = info
+        keep = {slug: {k: v for k, v in asdict(info).items() if k not in ('slug', 'cached')}
+                for slug, info in self.entries.items() if info.found or info.error in ('not_found', 'forbidden')}
+        tmp = f"{self.cache_file}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(keep, f, indent=2)
+            os.replace(tmp, self.cache_file)
+        except OSError as e:
+            log.warning("⚠️ Could not save channel cache %s: %s", self.cache_file, e)
+
+    def cached(self, slug: str) -> Optional[ChannelInfo]:
+        """A cache entry that is still fresh: found channels for ttl, 404s for negative_ttl, 403s for forbidden_ttl."""
+        info = self.entries.get(slug)
+        if info is None:
+            return None
+        ttl = {None: self.ttl, 'not_found': self.negative_ttl, 'forbidden': self.forbidden_ttl}.get(info.error)
+        if ttl is None or time.time() - info.fetched_at > ttl:
+            return None
+        return info
+
+    def resolve(self, slug: str) -> ChannelInfo:
+        return self.resolve_many([slug])[slug]
+
+    def resolve_many(self, slugs: Iterable[str]) -> Dict[str, ChannelInfo]:
+        """Look up every slug, answering from the cache where possible and fetching the rest concurrently."""
+        slugs = list(dict.fromkeys(slug.strip() for slug in slugs if slug.strip()))
+        results = {}
+        missing: List[str] = []
+        for slug in slugs:
+            info = self.cached(slug)
+            if info:
+                results[slug] = info
+            else:
+                missing.append(slug)
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(missing)), thread_name_prefix='kick-lookup') as pool:
+                fetched = list(pool.map(self._fetch, missing))
+            with self.lock:
+                for info in fetched:
+                    self.entries[info.slug] = info
+                    results[info.slug] = info
+                self._save()
+        return results
+
+    def _fetch(self, slug: str) -> ChannelInfo:
+        """One channel, retried through the shared back-off while Kick rate-limits, errors or can't be reached."""
+        error = None
+        for attempt in range(self.retries):
+            self.backoff.wait()
+            try:
+                resp = self.session.get(CHANNEL_INFO_URL.format(slug=slug), timeout=10)
+            except requests.RequestException as e:
+                error = f"request failed: {e}"
+                delay = self.backoff.blocked()
+                log.info("⏱️ Kick API request for %s failed (%s) - backing off %.0fs", slug, e, delay)
+                continue
+
+            if resp.status_code == 404:
+                return ChannelInfo(slug, error='not_found', fetched_at=time.time())
+            if resp.status_code == 403:
+                # The security policy blocks this client outright - retrying only delays the fallbacks
+                return ChannelInfo(slug, error='forbidden', fetched_at=time.time())
+            if resp.status_code == 429:
+                error = 'rate_limited'
+                delay = self.backoff.blocked(parse_retry_after(resp.headers.get('Retry-After')))
+                log.info("⏱️ Kick API answered %s for %s - backing off %.0fs", resp.status_code, slug, delay)
+                continue
+            if resp.status_code != 200:
+                error = f"HTTP {resp.status_code}"
+                delay = self.backoff.blocked()
+                log.info("⏱️ Kick API answered %s for %s - backing off %.0fs", resp.status_code, slug, delay)
+                continue
+
+            try:
+                data = resp.json()
+                info = ChannelInfo(slug, chatroom_id=int(data["chatroom"]["id"]), broadcaster_id=int(data["user"]["id"]),
+                                   username=data["user"].get("username"), fetched_at=time.time())
+            except (ValueError, KeyError, TypeError):
+                return ChannelInfo(slug, error='unexpected response', fetched_at=time.time())
+            self.backoff.succeeded()
+            return info
+        return ChannelInfo(slug, error=error, fetched_at=time.time())
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds; HTTP dates are ignored."""
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
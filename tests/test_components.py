@@ -0,0 +1,241 @@
+"""Unit tests for the bot's self-contained building blocks (no network, no websocket)."""
+import importlib.util
+import os
+from collections import deque
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='module')
+def kct():
+    """kick-chat-translator.py, imported the way benchmark.py does (its file name is not a valid module name)."""
+    spec = importlib.util.spec_from_file_location('kick_chat_translator', os.path.join(ROOT, 'kick-chat-translator.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def clock(kct, monkeypatch):
+    """A time.monotonic() the test moves by hand."""
+    now = [1000.0]
+    monkeypatch.setattr(kct.time, 'monotonic', lambda: now[0])
+    return now
+
+
+# ─── DedupWindow ──────────────────────────────────────────────────────────────
+def test_dedup_counts_copies_within_window(kct, clock):
+    dedup = kct.DedupWindow(window=10, max_entries=100)
+    assert dedup.seen(('chan', 'hola')) == 1
+    assert dedup.seen(('chan', 'hola')) == 2
+    assert dedup.seen(('other', 'hola')) == 1
+    assert dedup.count(('chan', 'hola')) == 2
+    assert dedup.stats() == {'entries': 2, 'capacity': 100, 'suppressed': 1}
+
+
+def test_dedup_forgets_after_window(kct, clock):
+    dedup = kct.DedupWindow(window=10, max_entries=100)
+    dedup.seen(('chan', 'hola'))
+    clock[0] += 10
+    assert dedup.count(('chan', 'hola')) == 0
+    assert dedup.seen(('chan', 'hola')) == 1
+
+
+def test_dedup_evicts_oldest_when_full(kct, clock):
+    dedup = kct.DedupWindow(window=60, max_entries=2)
+    for key in ('a', 'b', 'c'):
+        dedup.seen((key,))
+    assert dedup.count(('a',)) == 0
+    assert dedup.count(('b',)) == 1 and dedup.count(('c',)) == 1
+    assert dedup.stats()['entries'] == 2
+
+
+# ─── QuotaGovernor ────────────────────────────────────────────────────────────
+def test_quota_admits_within_budget(kct, clock):
+    governor = kct.QuotaGovernor(per_hour=1000)
+    assert governor.admit(100, 'chan', 'es') is None
+    stats = governor.stats()
+    assert stats['admitted_chars'] == 100 and stats['month_chars'] == 100
+    assert stats['pressure'] == 0.1
+
+
+def test_quota_sheds_long_and_low_priority_near_limit(kct, clock):
+    governor = kct.QuotaGovernor(per_hour=1000, shed_at=0.5, shed_max_chars=80, low_priority_languages=('ru',))
+    # Pressure counts the characters about to be sent: (480 + 20) / 1000 reaches shed_at
+    assert governor.admit(480, 'chan', 'es') is None
+    assert governor.admit(20, 'chan', 'ru') == 'quota_low_priority'
+    assert governor.admit(100, 'chan', 'es') == 'quota_long_message'
+    assert governor.admit(50, 'chan', 'es') is None
+    assert governor.window_factor() == governor.shed_batch_factor
+    assert governor.stats()['shed'] == {'quota_low_priority': 1, 'quota_long_message': 1}
+
+
+def test_quota_refuses_over_budget(kct, clock):
+    governor = kct.QuotaGovernor(per_hour=100, shed_at=1.0, shed_max_chars=100)
+    assert governor.admit(100, 'chan', 'es') is None
+    assert governor.admit(1, 'chan', 'es') == 'quota_exceeded'
+
+
+def test_quota_channel_budget_is_per_channel(kct, clock):
+    governor = kct.QuotaGovernor(channel_per_hour=100)
+    assert governor.admit(80, 'a', 'es') is None
+    assert governor.admit(30, 'a', 'es') == 'channel_quota'
+    assert governor.admit(30, 'b', 'es') is None
+
+
+def test_quota_throttle_holds_translations(kct, clock):
+    governor = kct.QuotaGovernor()
+    governor.throttle(5)
+    assert governor.hold_for() == 5
+    clock[0] += 5
+    assert governor.hold_for() == 0
+
+
+def test_quota_month_survives_restart(kct, clock, tmp_path):
+    state = str(tmp_path / 'quota.json')
+    governor = kct.QuotaGovernor(per_month=1_000_000, state_file=state)
+    assert governor.admit(1500, 'chan', 'es') is None
+    assert kct.QuotaGovernor(per_month=1_000_000, state_file=state).month_chars == 1500
+
+
+# ─── HashRing ─────────────────────────────────────────────────────────────────
+def test_hash_ring_is_stable_and_balanced(kct):
+    slugs = [f"channel{i}" for i in range(2000)]
+    ring = kct.HashRing(['w1', 'w2', 'w3', 'w4'])
+    owners = {slug: ring.owner(slug) for slug in slugs}
+    assert owners == {slug: kct.HashRing(['w4', 'w3', 'w2', 'w1']).owner(slug) for slug in slugs}
+    for worker in ('w1', 'w2', 'w3', 'w4'):
+        assert 0.15 < sum(owner == worker for owner in owners.values()) / len(slugs) < 0.35
+
+
+def test_hash_ring_moves_only_the_leavers_share(kct):
+    slugs = [f"channel{i}" for i in range(2000)]
+    before = kct.HashRing(['w1', 'w2', 'w3', 'w4'])
+    after = kct.HashRing(['w1', 'w2', 'w3'])
+    moved = [slug for slug in slugs if before.owner(slug) != after.owner(slug)]
+    assert all(before.owner(slug) == 'w4' for slug in moved)
+    assert len(moved) == sum(before.owner(slug) == 'w4' for slug in slugs)
+
+
+def test_hash_ring_without_workers(kct):
+    assert kct.HashRing([]).owner('channel') is None
+
+
+# ─── DeliveryScheduler.reorder ────────────────────────────────────────────────
+def sender_item(kct, text, received_at, priority=0, chatroom_id=1):
+    chat = kct.ChatMessage('user', text, None, received_at, priority=priority)
+    return (chatroom_id, 'chan', text, received_at, chat)
+
+
+def test_reorder_keeps_arrival_order_without_priorities(kct, clock):
+    scheduler = kct.DeliveryScheduler(slo=5)
+    pending = deque(sender_item(kct, text, clock[0] - age, priority)
+                    for text, age, priority in (('a', 9, 0), ('b', 0, 3), ('c', 1, 1)))
+    assert scheduler.reorder(pending) == []
+    assert [item[2] for item in pending] == ['a', 'b', 'c']
+
+
+def test_reorder_drops_expired_and_sorts_by_priority(kct, clock):
+    scheduler = kct.DeliveryScheduler(deadline=10, slo=5, badge_weights={'moderator': 3})
+    pending = deque([
+        sender_item(kct, 'stale', clock[0] - 11, 3),
+        sender_item(kct, 'late', clock[0] - 6, 3),
+        sender_item(kct, 'low', clock[0] - 1, 0),
+        sender_item(kct, 'high', clock[0] - 1, 3),
+        (1, 'chan', 'no context', clock[0], None),
+        sender_item(kct, 'low2', clock[0], 0),
+    ])
+    expired = scheduler.reorder(pending)
+    assert [item[2] for item in expired] == ['stale']
+    # Past the SLO goes last; otherwise higher priority first, ties (and items without a message) keep queue order
+    assert [item[2] for item in pending] == ['high', 'low', 'no context', 'low2', 'late']
+
+
+def test_priority_adds_badge_language_and_short_message(kct):
+    scheduler = kct.DeliveryScheduler(badge_weights={'vip': 2, 'moderator': 3}, language_weights={'es': 1},
+                                      short_message=10)
+    assert scheduler.priority(('vip', 'moderator'), 'es-MX', 5) == 5
+    assert scheduler.priority((), 'fr', 50) == 0
+
+
+# ─── MessageFilter ────────────────────────────────────────────────────────────
+@pytest.fixture
+def message_filter(kct):
+    return kct.MessageFilter(min_length=2, common_phrases=('lol', 'gg', 'wp', 'ok', 'no'),
+                             translation_prefix='[T]', bot_names=('Botrix',))
+
+
+@pytest.mark.parametrize('username, message, reason', [
+    ('translator', 'hola amigos', 'own_message'),
+    ('BotRix', 'hola amigos', 'known_bot'),
+    ('viewer', '[emote:123:KEKW]', 'empty'),
+    ('viewer', 'a', 'too_short'),
+    ('viewer', 'LOL gg', 'common_english'),
+    ('viewer', 'lol😂', 'common_english'),
+    ('viewer', 'gg,wp', 'common_english'),
+    ('viewer', 'gg/wp', 'common_english'),
+    ('viewer', 'no-no', 'common_english'),
+    ('viewer', '!discord', 'command'),
+    ('viewer', '[T] hello', 'translation_prefix'),
+    ('viewer', 'hola amigos', None),
+    ('viewer', 'lol que risa', None),
+])
+def test_message_filter_reasons(kct, message_filter, username, message, reason):
+    channel = kct.ChannelConfig('chan', chatroom_id=1, bot_username='translator')
+    assert message_filter.check(message_filter.view(username, message), channel) == reason
+
+
+def test_message_view_tokenizes_once(message_filter):
+    view = message_filter.view('Viewer', 'Hola  [emote:1:KEKW] Amigos')
+    assert view.username == 'viewer'
+    assert view.words == view.clean.lower().split()
+    assert 'emote' not in view.clean
+
+
+# ─── parse_azure_translations ─────────────────────────────────────────────────
+def test_parse_azure_translations(kct):
+    response = [
+        {'detectedLanguage': {'language': 'es', 'score': 1.0},
+         'translations': [{'text': 'it&#39;s good', 'to': 'en'}, {'text': "c'est bien", 'to': 'fr'}]},
+        {'translations': [{'text': 'hello', 'to': 'en'}]},
+        {'unexpected': True},
+    ]
+    assert kct.parse_azure_translations(response, 4, 'pt') == [
+        {'en': ("it's good", 'es'), 'fr': ("c'est bien", 'es')},
+        {'en': ('hello', 'pt')},
+        None,
+        None,
+    ]
+
+
+@pytest.mark.parametrize('response', [None, [], {}])
+def test_parse_azure_translations_empty(kct, response):
+    assert kct.parse_azure_translations(response, 2, 'es') == [None, None]
+
+
+# ─── take_mergeable ───────────────────────────────────────────────────────────
+def test_take_mergeable_below_backlog_takes_one(kct):
+    pending = deque([(1, 'a', 'one', 0, None), (1, 'a', 'two', 0, None)])
+    assert [item[2] for item in kct.take_mergeable(pending, 3, 500)] == ['one']
+    assert len(pending) == 1
+
+
+def test_take_mergeable_merges_same_chatroom_only(kct):
+    pending = deque([(1, 'a', 'one', 0, None), (1, 'a', 'two', 0, None), (2, 'b', 'other', 0, None),
+                     (1, 'a', 'three', 0, None)])
+    assert [item[2] for item in kct.take_mergeable(pending, 2, 500)] == ['one', 'two']
+    assert [item[2] for item in pending] == ['other', 'three']
+
+
+def test_take_mergeable_respects_max_length(kct):
+    pending = deque([(1, 'a', 'x' * 10, 0, None), (1, 'a', 'y' * 10, 0, None), (1, 'a', 'z' * 10, 0, None)])
+    # 10 + len(" | ") + 10 fits in 25, a third message would not
+    assert len(kct.take_mergeable(pending, 2, 25)) == 2
+    assert len(pending) == 1
+
+
+def test_take_mergeable_disabled(kct):
+    pending = deque([(1, 'a', 'one', 0, None)] * 5)
+    assert len(kct.take_mergeable(pending, 0, 500)) == 1